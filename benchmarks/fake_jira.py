@@ -0,0 +1,414 @@
+"""An in-process stand-in for the subset of the Jira REST API we use.
+
+Only the endpoints exercised by `csv-to-jira` are implemented, and only
+closely enough for the `jira` client library to be satisfied; this is
+for measuring our own overhead, not for validating Jira's behaviour.
+
+    with FakeJira(latency=0.01, throttle_rate=0.05) as jira:
+        ...  # point csv-to-jira at jira.url
+        print(jira.requests)
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+API_PREFIX = "/rest/api/2/"
+
+ISSUE_TYPES = [
+    {"id": "1", "name": "Story", "subtask": False},
+    {"id": "2", "name": "Task", "subtask": False},
+    {"id": "3", "name": "Bug", "subtask": False},
+    {"id": "4", "name": "Epic", "subtask": False},
+]
+FIELDS = [
+    {"id": "summary", "name": "Summary", "custom": False, "schema": {"type": "string"}},
+    {
+        "id": "description",
+        "name": "Description",
+        "custom": False,
+        "schema": {"type": "string"},
+    },
+    {
+        "id": "labels",
+        "name": "Labels",
+        "custom": False,
+        "schema": {"type": "array", "items": "string"},
+    },
+    {
+        "id": "issuetype",
+        "name": "Issue Type",
+        "custom": False,
+        "schema": {"type": "issuetype"},
+    },
+    {
+        "id": "issuelinks",
+        "name": "Linked Issues",
+        "custom": False,
+        "schema": {"type": "array", "items": "issuelinks"},
+    },
+    {
+        "id": "customfield_10069",
+        "name": "Story Points",
+        "custom": True,
+        "schema": {"type": "number"},
+    },
+]
+LINK_TYPES = [
+    {"id": "1", "name": "Blocks", "inward": "is blocked by", "outward": "blocks"},
+    {"id": "2", "name": "Relates", "inward": "relates to", "outward": "relates to"},
+]
+KEY_IN_RE = re.compile(r"key\s+in\s*\(([^)]*)\)", re.IGNORECASE)
+PROJECT_RE = re.compile(r"project\s*=\s*\"?([A-Z][A-Z0-9]*)\"?", re.IGNORECASE)
+
+
+class FakeJira:
+    """State and behaviour of the fake server.
+
+    `latency` is added to every request (in seconds) and `throttle_rate`
+    is the probability that any request is answered with `429 Too Many
+    Requests` and a `Retry-After` header of `retry_after` seconds.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 0.01,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.issues: Dict[str, Dict[str, Any]] = {}
+        self.requests: Counter = Counter()
+        self.throttled = 0
+        self._next_id = 10000
+        self._link_id = 1
+        self.projects: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        assert self._server is not None
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeJira":
+        fake = self
+
+        class Handler(_Handler):
+            server_state = fake
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeJira":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def should_throttle(self) -> bool:
+        with self._lock:
+            if self.throttle_rate and self._random.random() < self.throttle_rate:
+                self.throttled += 1
+                return True
+        return False
+
+    def count_request(self, method: str, endpoint: str) -> None:
+        parts = endpoint.split("/")
+        if parts[0] in ("issue", "project") and len(parts) == 2 and parts[1] != "bulk":
+            endpoint = f"{parts[0]}/{{key}}"
+        with self._lock:
+            self.requests[f"{method} {endpoint}"] += 1
+
+    def seed_issues(self, project: str, count: int) -> List[str]:
+        """Creates `count` issues in `project`, returning their keys."""
+        return [
+            self.add_issue(project, {"summary": f"Existing issue {index}"})["key"]
+            for index in range(1, count + 1)
+        ]
+
+    def project_id(self, key: str) -> str:
+        with self._lock:
+            for project_id, project_key in self.projects.items():
+                if project_key == key:
+                    return project_id
+            project_id = str(20000 + len(self.projects))
+            self.projects[project_id] = key
+            return project_id
+
+    def add_issue(self, project: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._next_id += 1
+            issue_id = str(self._next_id)
+            key = f"{project}-{self._next_id - 10000}"
+        issuetype = fields.get("issuetype") or {"name": "Story"}
+        if "id" in issuetype:
+            issuetype = next(t for t in ISSUE_TYPES if t["id"] == issuetype["id"])
+        issue = {
+            "id": issue_id,
+            "key": key,
+            "self": f"{self.url}{API_PREFIX}issue/{issue_id}",
+            "fields": {
+                "summary": fields.get("summary", ""),
+                "description": fields.get("description"),
+                "labels": list(fields.get("labels") or []),
+                "issuetype": dict(issuetype),
+                "project": {"key": project},
+                "status": {"name": "To Do"},
+                "issuelinks": [],
+            },
+        }
+        for name, value in fields.items():
+            if name not in ("project", "issuetype", "summary", "description", "labels"):
+                issue["fields"][name] = value
+        with self._lock:
+            self.issues[key] = issue
+            self.issues[issue_id] = issue
+        return issue
+
+    def link(self, type_name: str, inward: str, outward: str) -> bool:
+        link_type = next((t for t in LINK_TYPES if t["name"] == type_name), None)
+        inward_issue = self.issues.get(inward)
+        outward_issue = self.issues.get(outward)
+        if link_type is None or inward_issue is None or outward_issue is None:
+            return False
+        with self._lock:
+            link_id = str(self._link_id)
+            self._link_id += 1
+            inward_issue["fields"]["issuelinks"].append(
+                {
+                    "id": link_id,
+                    "type": link_type,
+                    "outwardIssue": _summarize(outward_issue),
+                }
+            )
+            outward_issue["fields"]["issuelinks"].append(
+                {
+                    "id": link_id,
+                    "type": link_type,
+                    "inwardIssue": _summarize(inward_issue),
+                }
+            )
+        return True
+
+    def search(self, jql: str) -> List[Dict[str, Any]]:
+        match = KEY_IN_RE.search(jql)
+        if match:
+            keys = [k.strip().strip('"') for k in match.group(1).split(",")]
+            return [self.issues[k] for k in keys if k in self.issues]
+        match = PROJECT_RE.search(jql)
+        seen = set()
+        results = []
+        for issue in self.issues.values():
+            if issue["key"] in seen:
+                continue
+            seen.add(issue["key"])
+            if match and issue["fields"]["project"]["key"] != match.group(1):
+                continue
+            results.append(issue)
+        return results
+
+
+def _summarize(issue: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": issue["id"],
+        "key": issue["key"],
+        "self": issue["self"],
+        "fields": {"summary": issue["fields"]["summary"]},
+    }
+
+
+def _select_fields(issue: Dict[str, Any], fields: Optional[str]) -> Dict[str, Any]:
+    if not fields or fields in ("*all", "*navigable"):
+        return issue
+    wanted = {f.strip() for f in fields.split(",")}
+    return {
+        **issue,
+        "fields": {k: v for k, v in issue["fields"].items() if k in wanted},
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_state: FakeJira
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def _reply(self, status: int, body: Any = None, headers: Dict[str, str] = None):
+        payload = b"" if body is None else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+    def _body(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+        return json.loads(self.rfile.read(length))
+
+    def _dispatch(self, method: str):
+        state = self.server_state
+        parsed = urlparse(self.path)
+        path = parsed.path
+        query = {k: ",".join(v) for k, v in parse_qs(parsed.query).items()}
+        body = self._body()
+
+        if not path.startswith(API_PREFIX):
+            return self._reply(404, {"errorMessages": ["Not found"]})
+        endpoint = path[len(API_PREFIX):].rstrip("/")
+        parts = endpoint.split("/")
+        state.count_request(method, endpoint)
+
+        if state.latency:
+            time.sleep(state.latency)
+        if state.should_throttle():
+            return self._reply(
+                429,
+                {"errorMessages": ["Rate limit exceeded"]},
+                {"Retry-After": str(state.retry_after)},
+            )
+
+        if endpoint == "serverInfo":
+            return self._reply(
+                200,
+                {
+                    "baseUrl": state.url,
+                    "version": "9.4.0",
+                    "versionNumbers": [9, 4, 0],
+                    "deploymentType": "Server",
+                },
+            )
+        if endpoint == "field":
+            return self._reply(200, FIELDS)
+        if endpoint == "issuetype":
+            return self._reply(200, ISSUE_TYPES)
+        if endpoint == "issueLinkType":
+            return self._reply(200, {"issueLinkTypes": LINK_TYPES})
+        if parts[0] == "project" and len(parts) == 2:
+            key = state.projects.get(parts[1], parts[1])
+            project_id = state.project_id(key)
+            return self._reply(
+                200,
+                {
+                    "id": project_id,
+                    "key": key,
+                    "name": parts[1],
+                    "issueTypes": ISSUE_TYPES,
+                },
+            )
+        if endpoint == "issue" and method == "POST":
+            fields = body["fields"]
+            issue = state.add_issue(_project_key(state, fields), fields)
+            return self._reply(201, _created(issue))
+        if endpoint == "issue/bulk" and method == "POST":
+            created = []
+            errors = []
+            for index, update in enumerate(body["issueUpdates"]):
+                fields = update["fields"]
+                if not fields.get("summary"):
+                    errors.append(
+                        {
+                            "status": 400,
+                            "failedElementNumber": index,
+                            "elementErrors": {
+                                "errorMessages": [],
+                                "errors": {"summary": "You must specify a summary."},
+                            },
+                        }
+                    )
+                    continue
+                created.append(
+                    _created(state.add_issue(_project_key(state, fields), fields))
+                )
+            return self._reply(
+                201 if created else 400, {"issues": created, "errors": errors}
+            )
+        if parts[0] == "issue" and len(parts) == 2:
+            issue = state.issues.get(parts[1])
+            if issue is None:
+                return self._reply(
+                    404, {"errorMessages": ["Issue does not exist"], "errors": {}}
+                )
+            if method == "GET":
+                return self._reply(200, _select_fields(issue, query.get("fields")))
+            if method == "PUT":
+                for name, value in (body.get("fields") or {}).items():
+                    issue["fields"][name] = value
+                return self._reply(204)
+        if endpoint == "search":
+            params = body if method == "POST" else query
+            jql = params.get("jql", "")
+            start = int(params.get("startAt", 0))
+            max_results = int(params.get("maxResults", 50))
+            fields = params.get("fields")
+            if isinstance(fields, list):
+                fields = ",".join(fields)
+            matches = state.search(jql)
+            page = matches[start : start + max_results] if max_results else []
+            return self._reply(
+                200,
+                {
+                    "startAt": start,
+                    "maxResults": max_results,
+                    "total": len(matches),
+                    "issues": [_select_fields(i, fields) for i in page],
+                },
+            )
+        if endpoint == "issueLink" and method == "POST":
+            ok = state.link(
+                body["type"]["name"],
+                body["inwardIssue"]["key"],
+                body["outwardIssue"]["key"],
+            )
+            if not ok:
+                return self._reply(404, {"errorMessages": ["No such issue"]})
+            return self._reply(201)
+        return self._reply(404, {"errorMessages": [f"Unhandled {method} {path}"]})
+
+
+def _project_key(state: FakeJira, fields: Dict[str, Any]) -> str:
+    project = fields.get("project")
+    if isinstance(project, dict):
+        return project.get("key") or state.projects.get(project.get("id"), "FAKE")
+    return str(project or "FAKE")
+
+
+def _created(issue: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": issue["id"], "key": issue["key"], "self": issue["self"]}
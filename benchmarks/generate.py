@@ -0,0 +1,110 @@
+"""Generates synthetic sheets for benchmarking.
+
+    python -m benchmarks.generate out.csv --rows 10000 --dependency-density 0.6
+"""
+import argparse
+import csv
+import random
+from typing import List, Optional
+
+
+WORDS = (
+    "the issue should allow users to update their account settings from "
+    "any page without losing unsaved changes while the service validates "
+    "input and reports errors clearly"
+).split()
+
+LABELS = ["frontend", "backend", "api", "infra", "ux", "docs"]
+
+ISSUE_TYPES = ["Story", "Task", "Bug"]
+
+EXTERNAL_PROJECT = "EXT"
+
+
+def generate_sheet(
+    path: str,
+    rows: int,
+    dependency_density: float = 0.5,
+    max_dependencies: int = 3,
+    dependency_window: int = 50,
+    description_words: int = 40,
+    external_keys: int = 0,
+    external_rate: float = 0.0,
+    blank_size_rate: float = 0.0,
+    seed: int = 0,
+) -> None:
+    """Writes a sheet of `rows` issues readable by the agile reader.
+
+    Each row depends, with probability `dependency_density`, upon up to
+    `max_dependencies` of the `dependency_window` rows preceding it (so
+    the dependency graph is always acyclic), and with probability
+    `external_rate` upon one of `external_keys` existing issues, keyed
+    `EXT-1` to `EXT-<external_keys>`.
+    """
+    rng = random.Random(seed)
+
+    with open(path, "w", newline="") as outf:
+        writer = csv.writer(outf)
+        writer.writerow(
+            ["ID", "Summary", "Size", "Description", "Labels", "Issuetype", "Depends"]
+        )
+        for index in range(1, rows + 1):
+            dependencies: List[str] = []
+            if index > 1 and rng.random() < dependency_density:
+                candidates = range(max(1, index - dependency_window), index)
+                count = min(len(candidates), rng.randint(1, max_dependencies))
+                dependencies.extend(
+                    str(candidate) for candidate in rng.sample(candidates, count)
+                )
+            if external_keys and rng.random() < external_rate:
+                dependencies.append(
+                    f"{EXTERNAL_PROJECT}-{rng.randint(1, external_keys)}"
+                )
+
+            size: Optional[int] = None
+            if rng.random() >= blank_size_rate:
+                size = rng.choice([1, 2, 3, 5, 8, 13])
+
+            writer.writerow(
+                [
+                    index,
+                    f"Synthetic issue {index}",
+                    size if size is not None else "",
+                    " ".join(rng.choices(WORDS, k=description_words)),
+                    " ".join(rng.sample(LABELS, rng.randint(0, 2))),
+                    rng.choice(ISSUE_TYPES),
+                    ",".join(dependencies),
+                ]
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--dependency-density", type=float, default=0.5)
+    parser.add_argument("--max-dependencies", type=int, default=3)
+    parser.add_argument("--dependency-window", type=int, default=50)
+    parser.add_argument("--description-words", type=int, default=40)
+    parser.add_argument("--external-keys", type=int, default=0)
+    parser.add_argument("--external-rate", type=float, default=0.0)
+    parser.add_argument("--blank-size-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate_sheet(
+        args.path,
+        args.rows,
+        dependency_density=args.dependency_density,
+        max_dependencies=args.max_dependencies,
+        dependency_window=args.dependency_window,
+        description_words=args.description_words,
+        external_keys=args.external_keys,
+        external_rate=args.external_rate,
+        blank_size_rate=args.blank_size_rate,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
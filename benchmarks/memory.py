@@ -0,0 +1,229 @@
+"""Measures how much memory csv-to-jira holds for a large sheet.
+
+    python -m benchmarks.memory --rows 100000
+
+Three structures dominate memory use for large sheets: the issue
+descriptors read from the sheet, the index of the Jira issues the sheet
+refers to, and the index of those issues' links used when linking them.
+Each is measured using `tracemalloc` as built now and as it was built
+before descriptors were slotted and interned, and while the indexes
+still held `jira.Issue` resources.
+"""
+import argparse
+import csv
+from dataclasses import dataclass
+import gc
+import json
+import os
+import shutil
+import tempfile
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from csv_to_jira.constants import JIRA_ID_FIELD, STREAM_WINDOW_SIZE
+from csv_to_jira.index import IssueIndex, LinkedIssueIndex
+from csv_to_jira.links import LinkIndex
+from csv_to_jira.readers.agile import Reader
+from csv_to_jira.sheet import SheetReader
+
+from .generate import generate_sheet
+
+
+LINK_TYPE = {
+    "id": "10000",
+    "name": "Blocks",
+    "inward": "is blocked by",
+    "outward": "blocks",
+}
+
+
+@dataclass
+class LegacyDescriptor:
+    id: str
+    summary: str
+    size: Optional[float]
+    description: str
+    labels: List[str]
+    issuetype: Optional[str]
+    jira_id: Optional[str]
+    dependency_ids: List[str]
+
+
+def read_legacy(path: str) -> List[LegacyDescriptor]:
+    """Reads the sheet as the agile reader did, a dictionary per row."""
+    records = []
+    with open(path, "r") as inf:
+        for row in csv.DictReader(inf):
+            description_fields = [
+                row[field]
+                for field in ["Story", "Description", "Details", "Notes"]
+                if row.get(field)
+            ]
+            records.append(
+                LegacyDescriptor(
+                    id=row["ID"],
+                    summary=row["Summary"],
+                    size=float(row["Size"]) if row.get("Size") else None,
+                    description="\n\n---\n\n".join(description_fields),
+                    labels=[x.strip() for x in row["Labels"].split(" ") if x.strip()]
+                    if row.get("Labels")
+                    else [],
+                    issuetype=row.get("Issuetype"),
+                    jira_id=row.get(JIRA_ID_FIELD),
+                    dependency_ids=[x for x in (row.get("Depends") or "").split(",") if x],
+                )
+            )
+    return records
+
+
+def read_current(path: str) -> List[Any]:
+    reader = Reader({}, argparse.Namespace())
+    records = []
+    with open(path, "r") as inf:
+        for batch in SheetReader(inf).batches(STREAM_WINDOW_SIZE):
+            records.extend(reader.process_batch(batch))
+    return records
+
+
+def get_issue_json(path: str, project: str = "BENCH") -> List[str]:
+    """Returns, for each row of the sheet, the JSON Jira would send for
+    its issue (with `summary` and `issuelinks` fields) once the sheet's
+    issues and links have all been created."""
+    keys: Dict[str, str] = {}
+    issues: List[Dict[str, Any]] = []
+    with open(path, "r") as inf:
+        for index, row in enumerate(csv.DictReader(inf), start=1):
+            key = f"{project}-{index}"
+            keys[row["ID"]] = key
+            issues.append(
+                {
+                    "id": str(10000 + index),
+                    "key": key,
+                    "self": f"http://localhost/rest/api/2/issue/{10000 + index}",
+                    "fields": {"summary": row["Summary"], "issuelinks": []},
+                    "depends": row["Depends"],
+                }
+            )
+
+    by_key = {issue["key"]: issue for issue in issues}
+
+    def summarize(issue: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": issue["id"],
+            "key": issue["key"],
+            "self": issue["self"],
+            "fields": {"summary": issue["fields"]["summary"]},
+        }
+
+    for issue in issues:
+        for name in filter(None, issue.pop("depends").split(",")):
+            dependency = by_key.get(keys.get(name, ""))
+            if dependency is None:
+                continue
+            issue["fields"]["issuelinks"].append(
+                {"id": "1", "type": LINK_TYPE, "inwardIssue": summarize(dependency)}
+            )
+            dependency["fields"]["issuelinks"].append(
+                {"id": "1", "type": LINK_TYPE, "outwardIssue": summarize(issue)}
+            )
+    return [json.dumps(issue) for issue in issues]
+
+
+def index_legacy(documents: List[str]) -> Dict[str, Any]:
+    """Indexes issues as `jira.Issue` resources, as the index did."""
+    from jira import JIRA, Issue
+
+    options = {**JIRA.DEFAULT_OPTIONS, "server": "http://localhost"}
+    issues = {}
+    for document in documents:
+        issue = Issue(options, None, raw=json.loads(document))
+        issues[issue.key] = issue
+    return issues
+
+
+def index_current(documents: List[str]) -> IssueIndex:
+    index = IssueIndex(None, fields=["summary", "issuelinks"])  # type: ignore
+    for document in documents:
+        index.add_raw(json.loads(document))
+    return index
+
+
+def index_links_legacy(documents: List[str]) -> Any:
+    """Indexes issues and their links as the link phase did."""
+    issues = index_legacy(documents)
+    return issues, LinkIndex(issues.values())
+
+
+def index_links_current(documents: List[str]) -> LinkedIssueIndex:
+    index = LinkedIssueIndex(None)  # type: ignore
+    for document in documents:
+        index.add_raw(json.loads(document))
+    return index
+
+
+def measure(build: Callable[[], Any]) -> float:
+    """Returns the MiB retained by the result of `build`."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dependency-density", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from rich.console import Console
+    from rich.table import Table
+
+    workdir = tempfile.mkdtemp(prefix="csv-to-jira-bench-")
+    try:
+        sheet = os.path.join(workdir, "sheet.csv")
+        generate_sheet(
+            sheet,
+            args.rows,
+            dependency_density=args.dependency_density,
+            seed=args.seed,
+        )
+        documents = get_issue_json(sheet)
+
+        results = [
+            (
+                "Issue descriptors",
+                measure(lambda: read_legacy(sheet)),
+                measure(lambda: read_current(sheet)),
+            ),
+            (
+                "Issue index",
+                measure(lambda: index_legacy(documents)),
+                measure(lambda: index_current(documents)),
+            ),
+            (
+                "Linked issue index",
+                measure(lambda: index_links_legacy(documents)),
+                measure(lambda: index_links_current(documents)),
+            ),
+        ]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    table = Table(title=f"Memory retained for {args.rows} rows")
+    table.add_column("Structure")
+    for column in ("Before (MiB)", "Now (MiB)", "Reduction"):
+        table.add_column(column, justify="right")
+    for name, before, now in results:
+        table.add_row(name, f"{before:.1f}", f"{now:.1f}", f"{before / now:.1f}x")
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
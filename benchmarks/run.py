@@ -0,0 +1,280 @@
+"""Runs csv-to-jira against a local fake Jira and records what it costs.
+
+    python -m benchmarks.run --rows 1000 10000 --output results.jsonl
+
+For each sheet size, a synthetic sheet is generated and each scenario
+runs the `csv-to-jira` command line in a child process pointed at a
+`FakeJira` server.  Recorded for each scenario are the wall time, the
+requests the server received, and the child's peak resident set size.
+"""
+import argparse
+from dataclasses import asdict, dataclass, field
+from importlib.metadata import PackageNotFoundError, version
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from .fake_jira import FakeJira
+from .generate import generate_sheet
+
+
+SIZES = [1000, 10000, 100000]
+
+EXTERNAL_KEYS = 100
+
+
+@dataclass
+class Scenario:
+    name: str
+    args: List[str]
+    global_args: List[str] = field(default_factory=list)
+    description: str = ""
+
+
+# Run in order against the same sheet and server; later scenarios see
+# the issues (and sheet keys) created by earlier ones.
+SCENARIOS = [
+    Scenario(
+        "digraph",
+        ["digraph", "{sheet}", "{workdir}/out.dot"],
+        description="Read the sheet and render its dependency graph.",
+    ),
+    Scenario(
+        "create",
+        ["create-issues", "{sheet}", "BENCH", "--bulk"],
+        description="Create every issue and link in bulk.",
+    ),
+    Scenario(
+        "resync",
+        ["create-issues", "{sheet}", "BENCH", "--bulk", "--full"],
+        description="Re-run against the unchanged sheet using the issue cache.",
+    ),
+    Scenario(
+        "resync-cold",
+        ["create-issues", "{sheet}", "BENCH", "--bulk", "--full"],
+        global_args=["--no-cache"],
+        description="Re-run against the unchanged sheet without the issue cache.",
+    ),
+    Scenario(
+        "resync-incremental",
+        ["create-issues", "{sheet}", "BENCH", "--bulk"],
+        global_args=["--no-cache"],
+        description="Re-run against the unchanged sheet, skipping unchanged rows.",
+    ),
+]
+
+
+@dataclass
+class Result:
+    scenario: str
+    rows: int
+    returncode: int
+    wall_seconds: float
+    peak_rss_mib: float
+    requests: Dict[str, int]
+    total_requests: int
+    throttled: int
+    metrics: Dict[str, Any]
+
+
+def get_version() -> Optional[str]:
+    try:
+        return version("csv-to-jira")
+    except PackageNotFoundError:
+        return None
+
+
+def run_scenario(
+    scenario: Scenario,
+    rows: int,
+    sheet: str,
+    workdir: str,
+    fake: FakeJira,
+    rate_limit: float,
+    verbose: bool,
+) -> Result:
+    metrics_path = os.path.join(workdir, f"{scenario.name}.metrics.json")
+    command = [
+        sys.executable,
+        "-c",
+        "from csv_to_jira.cmdline import main; main()",
+        "--config",
+        os.path.join(workdir, "config.yaml"),
+        "--instance-url",
+        fake.url,
+        "--username",
+        "bench",
+        "--password",
+        "bench",
+        "--rate-limit",
+        str(rate_limit),
+        "--metrics-out",
+        metrics_path,
+        *scenario.global_args,
+        *(arg.format(sheet=sheet, workdir=workdir) for arg in scenario.args),
+    ]
+    # Keep the issue cache (which lives in the configuration directory)
+    # apart from the user's own.
+    env = {**os.environ, "XDG_CONFIG_HOME": os.path.join(workdir, "config")}
+
+    fake.requests.clear()
+    fake.throttled = 0
+    output = None if verbose else subprocess.DEVNULL
+
+    started = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stdout=output, stderr=output)
+    _, status, usage = os.wait4(process.pid, 0)
+    wall_seconds = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    # `ru_maxrss` is in kibibytes on Linux, but bytes on macOS.
+    peak_rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+    metrics: Dict[str, Any] = {}
+    if os.path.exists(metrics_path):
+        with open(metrics_path) as inf:
+            metrics = json.load(inf)
+
+    return Result(
+        scenario=scenario.name,
+        rows=rows,
+        returncode=process.returncode,
+        wall_seconds=wall_seconds,
+        peak_rss_mib=peak_rss / 2**20,
+        requests=dict(fake.requests),
+        total_requests=sum(fake.requests.values()),
+        throttled=fake.throttled,
+        metrics=metrics,
+    )
+
+
+def print_results(results: List[Result]) -> None:
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title="Benchmarks")
+    table.add_column("Scenario")
+    for column in ("Rows", "Wall (s)", "Requests", "Throttled", "Peak RSS (MiB)"):
+        table.add_column(column, justify="right")
+    for result in results:
+        table.add_row(
+            result.scenario if not result.returncode else f"{result.scenario} (failed)",
+            str(result.rows),
+            f"{result.wall_seconds:.2f}",
+            str(result.total_requests),
+            str(result.throttled),
+            f"{result.peak_rss_mib:.1f}",
+        )
+    Console().print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=SIZES,
+        help="Sheet sizes to benchmark.",
+    )
+    parser.add_argument(
+        "--scenario",
+        choices=[scenario.name for scenario in SCENARIOS],
+        nargs="+",
+        default=None,
+        help="Scenarios to run; by default all of them, in order.",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Seconds of latency the fake server adds to each request.",
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests the fake server answers with a 429.",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0,
+        help="Passed to csv-to-jira's --rate-limit; by default unpaced.",
+    )
+    parser.add_argument("--dependency-density", type=float, default=0.5)
+    parser.add_argument("--external-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output",
+        help="Path to a JSON-lines file to which to append the results.",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Show the output of the commands being benchmarked.",
+    )
+    args = parser.parse_args()
+
+    scenarios = [
+        scenario
+        for scenario in SCENARIOS
+        if args.scenario is None or scenario.name in args.scenario
+    ]
+
+    results: List[Result] = []
+    for rows in args.rows:
+        workdir = tempfile.mkdtemp(prefix="csv-to-jira-bench-")
+        try:
+            sheet = os.path.join(workdir, "sheet.csv")
+            generate_sheet(
+                sheet,
+                rows,
+                dependency_density=args.dependency_density,
+                external_keys=EXTERNAL_KEYS,
+                external_rate=args.external_rate,
+                seed=args.seed,
+            )
+            with FakeJira(
+                latency=args.latency, throttle_rate=args.throttle_rate, seed=args.seed
+            ) as fake:
+                fake.seed_issues("EXT", EXTERNAL_KEYS)
+                for scenario in scenarios:
+                    results.append(
+                        run_scenario(
+                            scenario,
+                            rows,
+                            sheet,
+                            workdir,
+                            fake,
+                            args.rate_limit,
+                            args.verbose,
+                        )
+                    )
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(results)
+
+    if args.output:
+        context = {
+            "version": get_version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "latency": args.latency,
+            "throttle_rate": args.throttle_rate,
+        }
+        with open(args.output, "a") as outf:
+            for result in results:
+                outf.write(json.dumps({**context, **asdict(result)}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
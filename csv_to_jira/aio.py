@@ -0,0 +1,299 @@
+"""An asyncio-based client for the Jira REST calls this tool makes.
+
+Unlike `jira.JIRA`, this works with raw issue JSON rather than resource
+objects, and lets a single process have many requests in flight at once
+over a pooled, kept-alive HTTP session.  It requires `aiohttp`; install
+it with `pip install csv-to-jira[async]`.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import ssl
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from jira import JIRAError
+
+from .constants import JIRA_BULK_CREATE_LIMIT
+from .exceptions import ConfigurationError
+from .governor import RequestGovernor
+from .metrics import metrics
+from .transport import TransportSettings
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None  # type: ignore
+
+
+DEFAULT_CONCURRENCY = 10
+
+JsonDict = Dict[str, Any]
+
+
+class AsyncJira:
+    """Issues REST requests to a Jira instance from asyncio code.
+
+    At most `concurrency` requests are in flight at once; callers are
+    free to start as many coroutines as they like.  The HTTP session is
+    created on first use, so that it belongs to the running event loop.
+    If given a `governor`, requests are paced and retried by it.  If
+    given `transport` settings, their certificate verification, timeouts,
+    proxies and compression take the place of `verify` and `timeout`.
+    """
+
+    def __init__(
+        self,
+        server: str,
+        basic_auth: Tuple[str, str],
+        verify: Union[str, bool] = True,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        rest_path: str = "/rest/api/2",
+        governor: Optional[RequestGovernor] = None,
+        transport: Optional[TransportSettings] = None,
+    ):
+        if aiohttp is None:
+            raise ConfigurationError(
+                "The asyncio Jira client requires aiohttp; "
+                "please install csv-to-jira[async]."
+            )
+
+        self.server = server.rstrip("/")
+        self.base_url = self.server + rest_path
+        self.concurrency = concurrency or DEFAULT_CONCURRENCY
+        self._auth = aiohttp.BasicAuth(*basic_auth)
+        self._verify = verify
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._headers: Dict[str, str] = {}
+        self._proxy: Optional[str] = None
+        if transport is not None:
+            self._verify = transport.verify
+            self._timeout = aiohttp.ClientTimeout(
+                sock_connect=transport.connect_timeout,
+                sock_read=transport.read_timeout,
+            )
+            self._headers = transport.headers
+            self._proxy = transport.get_proxy(self.server)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.governor = governor
+
+    async def __aenter__(self) -> AsyncJira:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _get_ssl(self) -> Union[bool, ssl.SSLContext]:
+        if self._verify is False:
+            return False
+        if isinstance(self._verify, str):
+            return ssl.create_default_context(cafile=self._verify)
+        return True
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._session = aiohttp.ClientSession(
+                auth=self._auth,
+                timeout=self._timeout,
+                headers={"Accept": "application/json", **self._headers},
+                connector=aiohttp.TCPConnector(
+                    limit=self.concurrency, ssl=self._get_ssl()
+                ),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Any] = None,
+        allowed_statuses: Tuple[int, ...] = (),
+    ) -> Any:
+        """Makes a request, returning its decoded JSON body (if any).
+
+        Raises `JIRAError` for error responses, except those having a
+        status listed in `allowed_statuses`.
+        """
+        session = self._get_session()
+        assert self._semaphore is not None
+        url = self.base_url + path
+        sent = len(json.dumps(data)) if data is not None else 0
+        attempt = 0
+        while True:
+            if self.governor is not None:
+                await asyncio.sleep(self.governor.reserve())
+            async with self._semaphore:
+                started = time.perf_counter()
+                try:
+                    async with session.request(
+                        method,
+                        url,
+                        params=params,
+                        json=data,
+                        proxy=self._proxy,
+                    ) as response:
+                        status = response.status
+                        retry_after = response.headers.get("Retry-After")
+                        text = await response.text()
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    metrics.record_request(
+                        method, url, None, time.perf_counter() - started, sent
+                    )
+                    if self.governor is None:
+                        raise
+                    delay = self.governor.observe(method, None, None, attempt)
+                    if delay is None:
+                        raise
+                else:
+                    metrics.record_request(
+                        method,
+                        url,
+                        status,
+                        time.perf_counter() - started,
+                        sent,
+                        len(text.encode()),
+                    )
+                    delay = (
+                        self.governor.observe(method, status, retry_after, attempt)
+                        if self.governor is not None
+                        else None
+                    )
+                    if delay is None:
+                        break
+            metrics.record_retry(method, url)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        if status >= 400 and status not in allowed_statuses:
+            raise JIRAError(
+                status_code=status,
+                text=text,
+                url=url,
+                request=None,
+                response=None,
+            )
+        return json.loads(text) if text else None
+
+    async def issue(self, key: str, fields: Optional[List[str]] = None) -> JsonDict:
+        params = {"fields": ",".join(fields)} if fields else None
+        return await self.request("GET", f"/issue/{key}", params=params)
+
+    async def create_issue(self, fields: JsonDict) -> JsonDict:
+        """Creates an issue, returning its `id`, `key` and `self` URL."""
+        return await self.request("POST", "/issue", data={"fields": fields})
+
+    async def update_issue(
+        self, key: str, fields: JsonDict, notify: bool = True
+    ) -> None:
+        params = None if notify else {"notifyUsers": "false"}
+        await self.request(
+            "PUT", f"/issue/{key}", params=params, data={"fields": fields}
+        )
+
+    async def create_issues(self, field_list: List[JsonDict]) -> List[JsonDict]:
+        """Creates up to 50 issues using Jira's bulk-create endpoint.
+
+        Returns one result per entry of `field_list`, in the same order
+        and having the same shape as `jira.JIRA.create_issues`'s, except
+        that `issue` is the created issue's `id`, `key` and `self` URL.
+        """
+        if len(field_list) > JIRA_BULK_CREATE_LIMIT:
+            raise ValueError(
+                f"At most {JIRA_BULK_CREATE_LIMIT} issues can be created at once."
+            )
+
+        response = await self.request(
+            "POST",
+            "/issue/bulk",
+            data={"issueUpdates": [{"fields": fields} for fields in field_list]},
+            # Returned when none of the issues could be created.
+            allowed_statuses=(400,),
+        )
+        errors = {
+            error["failedElementNumber"]: error["elementErrors"]["errors"]
+            for error in response.get("errors", [])
+        }
+        created = iter(response.get("issues", []))
+
+        results: List[JsonDict] = []
+        for index, fields in enumerate(field_list):
+            if index in errors:
+                results.append(
+                    {
+                        "status": "Error",
+                        "error": errors[index],
+                        "issue": None,
+                        "input_fields": fields,
+                    }
+                )
+            else:
+                results.append(
+                    {
+                        "status": "Success",
+                        "error": None,
+                        "issue": next(created),
+                        "input_fields": fields,
+                    }
+                )
+        return results
+
+    async def search_issues(
+        self,
+        jql: str,
+        fields: Optional[List[str]] = None,
+        start_at: int = 0,
+        max_results: int = 50,
+    ) -> JsonDict:
+        """Returns one page of search results, including the `total`."""
+        data: JsonDict = {"jql": jql, "startAt": start_at, "maxResults": max_results}
+        if fields:
+            data["fields"] = fields
+        return await self.request("POST", "/search", data=data)
+
+    async def search_all_issues(
+        self, jql: str, fields: Optional[List[str]] = None, page_size: int = 100
+    ) -> List[JsonDict]:
+        """Returns every matching issue, fetching pages concurrently.
+
+        The first page reveals how many issues match; the remaining
+        pages are then requested all at once.
+        """
+        first = await self.search_issues(jql, fields, 0, page_size)
+        issues: List[JsonDict] = list(first["issues"])
+        page_size = first.get("maxResults") or page_size
+
+        pages = await asyncio.gather(
+            *(
+                self.search_issues(jql, fields, start_at, page_size)
+                for start_at in range(len(issues), first["total"], page_size)
+            )
+        )
+        for page in pages:
+            issues.extend(page["issues"])
+        return issues
+
+    async def create_issue_link(
+        self,
+        type: str,
+        inwardIssue: str,
+        outwardIssue: str,
+        comment: Optional[JsonDict] = None,
+    ) -> None:
+        data: JsonDict = {
+            "type": {"name": type},
+            "inwardIssue": {"key": inwardIssue},
+            "outwardIssue": {"key": outwardIssue},
+        }
+        if comment:
+            data["comment"] = comment
+        await self.request("POST", "/issueLink", data=data)
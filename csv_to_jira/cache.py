@@ -0,0 +1,199 @@
+import json
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import config
+
+
+ALL_FIELDS = "*all"
+
+DEFAULT_TTL = 3600
+
+# Fields and issue types change far less often than issues do.
+DEFAULT_METADATA_TTL = 86400
+
+
+def get_default_path() -> Path:
+    return Path(os.path.join(config.get_dir(), "cache.sqlite3"))
+
+
+def _fields_key(fields: Optional[Iterable[str]]) -> str:
+    if not fields:
+        return ALL_FIELDS
+    return ",".join(sorted(set(fields)))
+
+
+def _covers(cached: str, requested: str) -> bool:
+    if cached == ALL_FIELDS:
+        return True
+    if requested == ALL_FIELDS:
+        return False
+    return set(requested.split(",")) <= set(cached.split(","))
+
+
+class IssueCache:
+    """Single-file store of raw issue JSON, keyed by instance and issue key.
+
+    Each entry records which fields were fetched so that an issue
+    cached with only a few fields is never used to answer a request
+    for more of them.  Entries older than `ttl` seconds are ignored;
+    with `refresh` set, existing entries are ignored but fresh ones
+    are still written.
+    """
+
+    def __init__(
+        self,
+        instance_url: str,
+        path: Optional[Path] = None,
+        ttl: float = DEFAULT_TTL,
+        refresh: bool = False,
+    ):
+        self.instance_url = instance_url.rstrip("/")
+        self.ttl = ttl
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(path or get_default_path()), check_same_thread=False
+        )
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS issues (
+                    instance TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    fields TEXT NOT NULL,
+                    raw TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (instance, key)
+                )
+                """
+            )
+
+    def get_many(
+        self, keys: Iterable[str], fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Returns raw issue JSON for each fresh cached issue among `keys`."""
+        if self.refresh:
+            return {}
+
+        requested = _fields_key(fields)
+        oldest = time.time() - self.ttl
+        keys = list(keys)
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            # Stay under SQLite's default limit on bound parameters.
+            for offset in range(0, len(keys), 500):
+                chunk = keys[offset : offset + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                for key, cached_fields, raw in self._connection.execute(
+                    "SELECT key, fields, raw FROM issues "
+                    f"WHERE instance = ? AND fetched_at >= ? AND key IN ({placeholders})",
+                    [self.instance_url, oldest, *chunk],
+                ):
+                    if _covers(cached_fields, requested):
+                        found[key] = json.loads(raw)
+        return found
+
+    def get(
+        self, key: str, fields: Optional[Iterable[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        return self.get_many([key], fields).get(key)
+
+    def put_many(
+        self, raws: Iterable[Dict[str, Any]], fields: Optional[Iterable[str]] = None
+    ) -> None:
+        fetched_fields = _fields_key(fields)
+        now = time.time()
+        rows: List[tuple] = [
+            (self.instance_url, raw["key"], fetched_fields, json.dumps(raw), now)
+            for raw in raws
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO issues "
+                "(instance, key, fields, raw, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def put(self, raw: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> None:
+        self.put_many([raw], fields)
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM issues WHERE instance = ? AND key = ?",
+                [(self.instance_url, key) for key in keys],
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM issues WHERE instance = ?", [self.instance_url]
+            )
+
+
+class MetadataCache:
+    """Store of an instance's metadata (e.g. its fields), by name.
+
+    Kept alongside cached issues, and fresh for `ttl` seconds; with
+    `refresh` set, existing entries are ignored but fresh ones are
+    still written.
+    """
+
+    def __init__(
+        self,
+        instance_url: str,
+        path: Optional[Path] = None,
+        ttl: float = DEFAULT_METADATA_TTL,
+        refresh: bool = False,
+    ):
+        self.instance_url = instance_url.rstrip("/")
+        self.ttl = ttl
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(path or get_default_path()), check_same_thread=False
+        )
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS metadata (
+                    instance TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (instance, name)
+                )
+                """
+            )
+
+    def get(self, name: str) -> Optional[Any]:
+        """Returns the named metadata, if it is cached and fresh."""
+        if self.refresh:
+            return None
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM metadata "
+                "WHERE instance = ? AND name = ? AND fetched_at >= ?",
+                [self.instance_url, name, time.time() - self.ttl],
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, name: str, value: Any) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO metadata "
+                "(instance, name, value, fetched_at) VALUES (?, ?, ?, ?)",
+                [self.instance_url, name, json.dumps(value), time.time()],
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM metadata WHERE instance = ?", [self.instance_url]
+            )
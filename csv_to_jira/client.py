@@ -0,0 +1,152 @@
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from jira import JIRA, Issue
+from jira.resources import IssueLinkType
+
+from .cache import IssueCache, MetadataCache
+from .governor import RequestGovernor
+from .metadata import Metadata
+from .transport import TransportSettings
+
+
+class JiraClient(JIRA):
+    """A `jira.JIRA` client that reads through a persistent issue cache.
+
+    `issue` consults the cache before asking Jira, and calls that modify
+    issues invalidate the affected entries.  Commands can use
+    `cached_issues` and `remember` to work with the cache directly when
+    loading issues in bulk.
+
+    If given a `governor`, every request is paced and retried by it
+    rather than by `jira`'s own retry logic.  Connections are pooled,
+    and timeouts, proxies and certificate verification configured, as
+    set out by `transport`.
+
+    Field and issue type definitions are available from `metadata`,
+    which reads through `metadata_cache` if given.
+    """
+
+    def __init__(
+        self,
+        *args,
+        cache: Optional[IssueCache] = None,
+        governor: Optional[RequestGovernor] = None,
+        transport: Optional[TransportSettings] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        **kwargs,
+    ):
+        self.cache = cache
+        self.metadata = Metadata(self, metadata_cache)
+        self.governor = governor
+        self.transport = transport or TransportSettings()
+        if governor is not None:
+            kwargs.setdefault("max_retries", 0)
+        if transport is not None:
+            options = dict(kwargs.get("options") or {})
+            options.setdefault("verify", transport.verify)
+            options["headers"] = {**transport.headers, **options.get("headers", {})}
+            kwargs["options"] = options
+            kwargs.setdefault("timeout", transport.timeout)
+            kwargs.setdefault("proxies", transport.proxies or None)
+        self._issue_link_types: Optional[List[IssueLinkType]] = None
+        self._issue_link_types_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def _add_ssl_cert_verif_strategy_to_session(self) -> None:
+        # Called by `JIRA.__init__` as soon as the session exists, and so
+        # before the first request is made.
+        super()._add_ssl_cert_verif_strategy_to_session()
+        adapter = self.transport.get_adapter(self.governor)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def issue_link_types(self, force: bool = False) -> List[IssueLinkType]:
+        # `create_issue_link` looks these up before every link it creates.
+        with self._issue_link_types_lock:
+            if self._issue_link_types is None or force:
+                self._issue_link_types = super().issue_link_types(force=True)
+            return self._issue_link_types
+
+    def fields(self) -> List[Dict[str, Any]]:
+        # `jira` fetches these again to translate field names whenever
+        # it has none cached, e.g. before every search.
+        return self.metadata.fields()
+
+    def _fields_list(self, fields: Optional[Union[str, Iterable[str]]]) -> List[str]:
+        if not fields or fields == "*all":
+            return []
+        if isinstance(fields, str):
+            return [field.strip() for field in fields.split(",")]
+        return list(fields)
+
+    def cached_issues(
+        self, keys: Iterable[str], fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, Issue]:
+        """Returns issues among `keys` that can be served from the cache."""
+        return {
+            key: Issue(self._options, self._session, raw=raw)
+            for key, raw in self.cached_raw(keys, fields).items()
+        }
+
+    def cached_raw(
+        self, keys: Iterable[str], fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Returns the JSON of issues among `keys` that are cached."""
+        if self.cache is None:
+            return {}
+        return self.cache.get_many(keys, fields)
+
+    def remember(
+        self, issues: Iterable[Issue], fields: Optional[Iterable[str]] = None
+    ) -> None:
+        """Writes the given freshly-fetched issues through to the cache."""
+        self.remember_raw((issue.raw for issue in issues), fields)
+
+    def remember_raw(
+        self, raws: Iterable[Dict[str, Any]], fields: Optional[Iterable[str]] = None
+    ) -> None:
+        """Writes the JSON of freshly-fetched issues through to the cache."""
+        if self.cache is not None:
+            self.cache.put_many(raws, fields)
+
+    def forget(self, *keys: str) -> None:
+        """Drops cached copies of the given issues."""
+        if self.cache is not None:
+            self.cache.invalidate(keys)
+
+    def issue(
+        self,
+        id: Union[Issue, str],
+        fields: Optional[str] = None,
+        expand: Optional[str] = None,
+        properties: Optional[str] = None,
+    ) -> Issue:
+        if isinstance(id, Issue) or expand or properties:
+            return super().issue(id, fields=fields, expand=expand, properties=properties)
+
+        field_list = self._fields_list(fields)
+        cached = self.cached_issues([id], field_list)
+        if id in cached:
+            return cached[id]
+
+        issue = super().issue(id, fields=fields)
+        self.remember([issue], field_list)
+        return issue
+
+    def create_issue_link(
+        self,
+        type: Any,
+        inwardIssue: str,
+        outwardIssue: str,
+        comment: Optional[Dict[str, Any]] = None,
+    ):
+        response = super().create_issue_link(
+            type=type,
+            inwardIssue=inwardIssue,
+            outwardIssue=outwardIssue,
+            comment=comment,
+        )
+        # Both issues' `issuelinks` have changed.
+        self.forget(inwardIssue, outwardIssue)
+        return response
@@ -1,16 +1,17 @@
 import argparse
 import logging
-
-from rich.console import Console
-from rich.traceback import install as enable_rich_traceback
+from typing import TYPE_CHECKING
 
 from .plugin import get_installed_commands
 from .exceptions import UserError
+from .metrics import span
 from . import config
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
 
 def main():
-    enable_rich_traceback()
     commands = get_installed_commands()
 
     default_config_path = config.get_default_path()
@@ -76,6 +77,65 @@ def main():
         default=False,
         help="Do not verify server certificate.  Generally not recommended.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=False,
+        help="Do not read issues from, or store issues in, the local issue cache.",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        default=False,
+        help=(
+            "Ignore issues stored in the local issue cache, but store "
+            "freshly-fetched issues in it for later use."
+        ),
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=None,
+        help=(
+            "Number of seconds for which cached issues are considered fresh; "
+            "by default the instance's 'cache_ttl' setting or one hour."
+        ),
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=None,
+        help=(
+            "Maximum number of requests per second to send to Jira; the rate "
+            "is lowered automatically while Jira is throttling requests.  By "
+            "default the instance's 'rate_limit' setting or 25; 0 sends "
+            "requests unpaced until Jira first throttles them."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Print the time spent in each phase, and the requests made to Jira.",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=str,
+        default=None,
+        help=(
+            "Path to which to write the time spent in each phase and the "
+            "requests made to Jira."
+        ),
+    )
+    parser.add_argument(
+        "--metrics-format",
+        choices=["json", "openmetrics"],
+        default=None,
+        help=(
+            "Format in which to write --metrics-out; by default JSON if its "
+            "name ends in '.json', or OpenMetrics text otherwise."
+        ),
+    )
     parser.add_argument(
         "--debugger",
         action="store_true",
@@ -115,15 +175,24 @@ def main():
         # Pause the program until a remote debugger is attached
         debugpy.wait_for_client()
 
-    config_data = config.get(path=args.config)
-
-    console = Console()
-
-    command = commands[args.command](config=config_data, options=args)
-
+    command = None
     try:
-        command.handle()
+        config_data = config.get(path=args.config)
+
+        command = commands[args.command](config=config_data, options=args)
+        with span(args.command):
+            command.handle()
     except UserError as e:
-        console.print(f"[red]{e}[/red]")
+        get_console().print(f"[red]{e}[/red]")
     except Exception:
-        console.print_exception()
+        get_console().print_exception()
+    finally:
+        if command is not None:
+            command.report()
+
+
+def get_console() -> "Console":
+    # Imported only when needed; `rich` is comparatively slow to import.
+    from rich.console import Console
+
+    return Console()
@@ -0,0 +1,237 @@
+import argparse
+from heapq import nlargest
+import json
+from pathlib import Path
+import sys
+from typing import Any, Dict, List
+
+from ..constants import STREAM_WINDOW_SIZE
+from ..graph import DependencyGraph
+from ..index import IssueIndex
+from ..metrics import span
+from ..plugin import (
+    BaseCommand,
+    BaseReader,
+    get_installed_reader,
+    get_installed_reader_names,
+)
+from ..sheet import read_sheet
+from ..types import Id, IssueDescriptor
+from ..utils import positive_int
+
+
+# Critical paths longer than this are abbreviated when printed.
+PRINTED_PATH_LENGTH = 20
+
+
+def is_done(status: Dict[str, Any]) -> bool:
+    return status.get("statusCategory", {}).get("key") == "done"
+
+
+class Command(BaseCommand):
+    @classmethod
+    def get_help(cls) -> str:
+        return """Analyze the critical path, levels, hotspots and cycles of
+        your CSV's issue dependencies."""
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser):
+        available_readers = get_installed_reader_names()
+
+        parser.add_argument(
+            "path",
+            type=Path,
+        )
+        parser.add_argument(
+            "--reader", type=str, choices=available_readers, default="default"
+        )
+        parser.add_argument(
+            "--status",
+            action="store_true",
+            default=False,
+            help=(
+                "Fetch the status of each row's issue from Jira; issues that "
+                "are done count for no points."
+            ),
+        )
+        parser.add_argument(
+            "--top",
+            type=positive_int,
+            default=10,
+            help="Number of fan-in and fan-out hotspots to list.",
+        )
+        parser.add_argument(
+            "--json",
+            type=str,
+            default=None,
+            metavar="PATH",
+            help="Write the analysis as JSON to this file, or to stdout if '-'.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=positive_int,
+            default=4,
+            help="Maximum number of requests to have in flight at once.",
+        )
+
+    def handle(self):
+        issue_reader: BaseReader = get_installed_reader(self.options.reader)(
+            self.config, self.options
+        )
+
+        with span("read_csv"):
+            records: Dict[Id, IssueDescriptor] = {
+                record.id: record
+                for batch in read_sheet(Path(self.options.path), STREAM_WINDOW_SIZE)
+                for record in issue_reader.process_batch(batch)
+            }
+        graph = DependencyGraph.from_records(issue_reader, records.values())
+
+        statuses: Dict[str, Dict[str, Any]] = {}
+        if self.options.status:
+            statuses = self.get_statuses(issue_reader, records)
+
+        with span("analyze_graph"):
+            analysis = self.analyze(graph, records, statuses)
+
+        if self.options.json == "-":
+            sys.stdout.write(json.dumps(analysis) + "\n")
+        elif self.options.json:
+            with open(self.options.json, "w") as outf:
+                outf.write(json.dumps(analysis) + "\n")
+        else:
+            self.print_analysis(analysis)
+
+    def get_statuses(
+        self, issue_reader: BaseReader, records: Dict[Id, IssueDescriptor]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetches the status of every row's issue and of every issue rows
+        depend upon, in a few batched searches."""
+        keys = {id: record.jira_id for id, record in records.items() if record.jira_id}
+        wanted = set(keys.values())
+        for record in records.values():
+            wanted.update(issue_reader.get_dependency_keys(record, keys))
+
+        index = IssueIndex(self.jira, fields=["status"])
+        index.prefetch(wanted, concurrency=self.options.concurrency)
+        return {
+            raw["key"]: raw.get("fields", {}).get("status") or {}
+            for raw in index.raw_issues()
+        }
+
+    def analyze(
+        self,
+        graph: DependencyGraph,
+        records: Dict[Id, IssueDescriptor],
+        statuses: Dict[str, Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        weights: Dict[Id, float] = {}
+        for id, record in records.items():
+            status = statuses.get(record.jira_id or "")
+            if record.size and not (status and is_done(status)):
+                weights[id] = record.size
+
+        nodes: Dict[Id, Dict[str, Any]] = {}
+        for id, record in records.items():
+            node: Dict[str, Any] = {
+                "id": id,
+                "key": record.jira_id or None,
+                "summary": record.summary,
+                "size": record.size,
+                "fan_in": len(graph.dependencies(id)),
+                "fan_out": len(graph.dependents(id)),
+                "level": None,
+                "earliest_start": None,
+                "critical": False,
+            }
+            if self.options.status:
+                status = statuses.get(record.jira_id or "")
+                node["status"] = status.get("name") if status else None
+                node["done"] = bool(status) and is_done(status)
+            nodes[id] = node
+
+        analysis: Dict[str, Any] = {
+            "sheet": str(self.options.path),
+            "issues": len(graph),
+            "dependencies": sum(node["fan_in"] for node in nodes.values()),
+            "points": sum(weights.values()),
+            "cycles": graph.cycles(),
+            "levels": None,
+            "critical_path": None,
+            "hotspots": {
+                "fan_in": self.get_hotspots(nodes, "fan_in"),
+                "fan_out": self.get_hotspots(nodes, "fan_out"),
+            },
+        }
+
+        # Levels and the critical path are only meaningful if the work
+        # can be ordered at all.
+        if not analysis["cycles"]:
+            waves = graph.waves()
+            for level, wave in enumerate(waves):
+                for id in wave:
+                    nodes[id]["level"] = level
+            starts, _ = graph.earliest_starts(weights)
+            for id, start in starts.items():
+                nodes[id]["earliest_start"] = start
+            points, path = graph.critical_path(weights)
+            for id in path:
+                nodes[id]["critical"] = True
+
+            analysis["levels"] = len(waves)
+            analysis["critical_path"] = {"points": points, "ids": path}
+
+        analysis["nodes"] = list(nodes.values())
+        return analysis
+
+    def get_hotspots(
+        self, nodes: Dict[Id, Dict[str, Any]], measure: str
+    ) -> List[Dict[str, Any]]:
+        return [
+            {"id": node["id"], "summary": node["summary"], measure: node[measure]}
+            for node in nlargest(
+                self.options.top, nodes.values(), key=lambda node: node[measure]
+            )
+            if node[measure]
+        ]
+
+    def print_analysis(self, analysis: Dict[str, Any]) -> None:
+        from rich.table import Table
+
+        points = "remaining points" if self.options.status else "points"
+        self.console.print(
+            f"{analysis['issues']} issues with {analysis['dependencies']} "
+            f"dependencies among them, totalling {analysis['points']:g} {points}."
+        )
+
+        for cycle in analysis["cycles"]:
+            self.console.print(
+                "[red]Dependency cycle among: " + ", ".join(cycle) + "[/red]"
+            )
+
+        critical_path = analysis["critical_path"]
+        if critical_path is not None:
+            path = critical_path["ids"]
+            if len(path) > PRINTED_PATH_LENGTH:
+                half = PRINTED_PATH_LENGTH // 2
+                path = path[:half] + [f"… {len(path) - 2 * half} more …"] + path[-half:]
+            self.console.print(
+                f"{analysis['levels']} levels; the critical path is "
+                f"{critical_path['points']:g} {points} through "
+                f"{len(critical_path['ids'])} issues: " + " → ".join(path)
+            )
+
+        for measure, title in (
+            ("fan_in", "Most dependencies"),
+            ("fan_out", "Most dependents"),
+        ):
+            hotspots = analysis["hotspots"][measure]
+            if not hotspots:
+                continue
+            table = Table(title=title)
+            table.add_column("ID")
+            table.add_column("Summary")
+            table.add_column("Count", justify="right")
+            for hotspot in hotspots:
+                table.add_row(hotspot["id"], hotspot["summary"], str(hotspot[measure]))
+            self.console.print(table)
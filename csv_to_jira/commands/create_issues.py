@@ -1,39 +1,145 @@
+from __future__ import annotations
+
 import argparse
-import csv
-import os
-import shutil
 
-from jira.resources import Issue
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-from rich.prompt import Confirm
-from typing import cast, Tuple, Dict, List, Any
-
-from ..exceptions import UserError, Abort
-from ..types import IssueDescriptor
-from ..constants import JIRA_ID_FIELD
-from ..plugin import BaseCommand, BaseReader, get_installed_readers
+from typing import cast, TYPE_CHECKING, Callable, Iterable, Tuple, Dict, List, Any, Optional, Set
 
+from ..exceptions import (
+    UserError,
+    Abort,
+    ConfigurationError,
+    InvalidField,
+    InvalidIssueType,
+    InvalidPlan,
+)
+from ..types import ConfigDict, Id, IssueDescriptor
+from ..constants import JIRA_BULK_CREATE_LIMIT, JIRA_ID_FIELD
+from ..diff import get_changed_fields
+from ..graph import DependencyGraph
+from ..index import IssueIndex, LinkedIssueIndex
+from ..journal import Journal, get_journal_path
+from ..links import Link, LinkIndex
+from ..metrics import Metrics, metrics, span
+from ..plan import (
+    Plan,
+    PlannedIssue,
+    PlannedLink,
+    get_referenced_row,
+    get_row_reference,
+)
+from ..plugin import (
+    BaseCommand,
+    BaseReader,
+    get_installed_reader,
+    get_installed_reader_names,
+)
+from ..scheduler import Scheduler
+from ..sheet import ParsedSheets, SheetSet, expand_paths, get_key_field
+from ..state import SyncState, get_row_digest, get_state_path
+from ..utils import chunked, positive_int
 
-class InvalidIssueType(UserError):
-    pass
+# `jira` and `rich` are imported where they are used so that they are
+# not loaded just to build the command-line parser.
+if TYPE_CHECKING:
+    from jira.resources import Issue
 
 
 def field_and_value(arg: str) -> Tuple[str, str]:
     return cast(Tuple[str, str], tuple(arg.split("=", 1)))
 
 
+@dataclass
+class InstanceResult:
+    """Outcome of syncing the sheets to one of several instances."""
+
+    # Each row's issue key, if the sync completed.
+    keys: Dict[Id, str]
+    # What was measured while syncing, to report with the rest.
+    metrics: Metrics
+    # Summary of the requests retried, if any; see `RequestGovernor`.
+    retries: str
+    error: Optional[UserError] = None
+
+
+def sync_instance(
+    config: ConfigDict, options: argparse.Namespace, instance_name: str
+) -> InstanceResult:
+    """Syncs the sheets to the named instance; run in a worker process by
+    `Command.sync_instances`.
+
+    A `UserError` is returned, along with what was measured up to it;
+    other errors are raised, so as to keep their tracebacks.
+    """
+    # A forked worker starts with whatever its parent had measured.
+    metrics.reset()
+    command = Command(
+        config,
+        argparse.Namespace(
+            **{**vars(options), "instance_name": instance_name, "instances": []}
+        ),
+    )
+    keys: Dict[Id, str] = {}
+    error: Optional[UserError] = None
+    try:
+        command.sync(instance_name)
+        keys = command.keys
+    except UserError as e:
+        error = e
+    governor = command._governor
+    return InstanceResult(
+        keys, metrics, governor.summary() if governor is not None else "", error
+    )
+
+
 class Command(BaseCommand):
+    index: IssueIndex
+    # Each sheet's journal, and state, is kept next to it; see `sync`.
+    journals: Dict[Path, Journal]
+    keys: Dict[Id, str]
+    # Name of the instance being synced, if several are; see `sync_instances`.
+    instance_name: Optional[str]
+    # Whether `keys` began with those of an interrupted run.
+    resumed: bool
+    # Records parsed from each sheet, if kept between syncs; see `SheetSet`.
+    parsed: Optional[ParsedSheets] = None
+    _issue_reader: Optional[BaseReader] = None
+    outcomes: Counter
+    skip_all: bool
+    # IDs of the fields set by `--setfield`, and of the story points
+    # field (if the instance has one); see `resolve_fields`.
+    setfields: List[Tuple[str, str]]
+    story_points_field_id: Optional[str]
+    # Each issue type named by a row, as the project spells it.
+    issue_types: Dict[str, str]
+    states: Dict[Path, SyncState]
+    # Rows to sync, if not all of them; see `check_rows`.
+    changed: Optional[Set[Id]]
+    # Digests of the rows found to be in sync, to record in `state`.
+    digests: Dict[Id, str]
+    # Rows that could not be synced, and issues that could not be linked.
+    unsynced: Set[Id]
+    unlinked: Set[str]
+
     @classmethod
     def get_help(cls) -> str:
         return """Generate a digraph showing calculated issue dependencies."""
 
     @classmethod
     def add_arguments(cls, parser: argparse.ArgumentParser):
-        available_readers = get_installed_readers()
+        available_readers = get_installed_reader_names()
 
         parser.add_argument(
-            "path",
-            type=Path,
+            "paths",
+            nargs="+",
+            metavar="path",
+            help=(
+                "Sheet to sync, or a glob matching sheets (e.g. 'teams/*.csv'); "
+                "can be given more than once."
+            ),
         )
         parser.add_argument(
             "project", type=str, help="Jira project within which to create new issues."
@@ -51,104 +157,940 @@ class Command(BaseCommand):
         )
         parser.add_argument("--issuetype", type=str, default="Story")
         parser.add_argument("--relationship", type=str, default="Blocks")
+        modes = parser.add_mutually_exclusive_group()
+        modes.add_argument(
+            "--bulk",
+            action="store_true",
+            default=False,
+            help=(
+                "Create, update and link issues without prompting; new issues "
+                "are created in batches using Jira's bulk-create endpoint."
+            ),
+        )
+        modes.add_argument(
+            "--parallel",
+            action="store_true",
+            default=False,
+            help=(
+                "Without prompting, create or update issues in dependency "
+                "order, with up to --concurrency at once, linking each issue "
+                "to its dependencies as soon as they exist."
+            ),
+        )
+        modes.add_argument(
+            "--plan",
+            type=Path,
+            default=None,
+            metavar="PLAN",
+            help=(
+                "Without changing anything in Jira, work out which issues "
+                "and links need to be created or updated, and write them to "
+                "this file for review."
+            ),
+        )
+        modes.add_argument(
+            "--apply",
+            type=Path,
+            default=None,
+            metavar="PLAN",
+            help=(
+                "Without prompting, make the changes listed in a plan written "
+                "by --plan, with up to --concurrency requests at once."
+            ),
+        )
+        modes.add_argument(
+            "--yes",
+            action="store_true",
+            default=False,
+            help=(
+                "Work out which changes need to be made as --plan would, then "
+                "make them without prompting as --apply would."
+            ),
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            default=False,
+            help=(
+                "Sync every row, including those that have not changed since "
+                "they were last synced."
+            ),
+        )
+        parser.add_argument(
+            "--instances",
+            nargs="+",
+            default=[],
+            metavar="NAME",
+            help=(
+                "Sync to each of these configured instances at once, instead "
+                "of to --instance-name; each instance's issue keys are kept "
+                f"in a column of their own ({JIRA_ID_FIELD}:NAME)."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=positive_int,
+            default=JIRA_BULK_CREATE_LIMIT,
+            help=(
+                "Number of issues to send per bulk-create request "
+                f"(at most {JIRA_BULK_CREATE_LIMIT})."
+            ),
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=positive_int,
+            default=4,
+            help="Maximum number of requests to have in flight at once.",
+        )
 
-    def handle(self):
-        available_readers = get_installed_readers()
-        issue_reader: BaseReader = available_readers[self.options.reader](
-            self.config, self.options
-        )
-
-        issues: Dict[str, Tuple[IssueDescriptor, Issue]] = {}
-        csv_records: List[Dict] = []
-        with open(self.options.path, "r") as inf:
-            reader = csv.DictReader(inf)
-            for row in reader:
-                csv_records.append(row)
-
-        temporary_path = Path(os.path.dirname(self.options.path)) / Path(
-            os.path.basename(self.options.path) + ".tmp"
-        )
-        skip_all = False
-        with open(temporary_path, "w") as outf:
-            final_fieldnames = reader.fieldnames
-            if JIRA_ID_FIELD not in final_fieldnames:
-                final_fieldnames.append(JIRA_ID_FIELD)
-
-            writer = csv.DictWriter(outf, fieldnames=final_fieldnames)
-            writer.writeheader()
-
-            for row in csv_records:
-                record = issue_reader.process_row(row)
-
-                fields: Dict[str, Any] = {
-                    "project": self.options.project,
-                    "summary": record.summary,
-                    "description": record.description,
-                    "labels": self.options.label + record.labels,
-                }
-                if record.issuetype:
-                    fields["issuetype"] = record.issuetype
-                elif self.options.issuetype:
-                    fields["issuetype"] = {"name": self.options.issuetype}
-                if record.size:
-                    fields["customfield_10069"] = record.size
-
-                for field, value in self.options.setfield:
-                    fields[field] = value
+    def get_fields(self, record: IssueDescriptor) -> Dict[str, Any]:
+        fields: Dict[str, Any] = {
+            "project": {"key": self.options.project},
+            "summary": record.summary,
+            "description": record.description,
+            "labels": self.options.label + record.labels,
+        }
+        issuetype = record.issuetype or self.options.issuetype
+        if issuetype:
+            fields["issuetype"] = {"name": self.get_issue_type_name(issuetype)}
+        if record.size:
+            fields[cast(str, self.story_points_field_id)] = record.size
 
-                try:
-                    if not skip_all:
-                        if not record.jira_id:
-                            if self.options.update_or_create_issues:
-                                if Confirm.ask(
-                                    f'Create issue for [u]"{record.summary}" ({record.id})[/u]?'
-                                ):
-                                    jira_issue = self.jira.create_issue(fields=fields)
-                                else:
-                                    raise Abort(f"Issue for {record.id} does not exist")
-                        else:
-                            jira_issue = self.jira.issue(record.jira_id)
-                            if self.options.update_or_create_issues and Confirm.ask(
-                                f'Update issue for [u]"{record.summary}" ({record.id})[/u]?'
-                            ):
-                                jira_issue.update(fields)
-                except (KeyboardInterrupt, Abort):
-                    skip_all = True
-
-                issues[record.id] = (record, jira_issue)
-
-                row[JIRA_ID_FIELD] = jira_issue.key if jira_issue else ""
-                writer.writerow(row)
-                outf.flush()
-
-        shutil.move(temporary_path, self.options.path)
-
-        for record, issue in issues.values():
-            dependencies = issue_reader.get_dependencies(self.jira, record, issues)
-            for jira_dep in dependencies:
-                found_link = False
-                for link in jira_dep.fields.issuelinks:
-                    # If there's no 'outwardIssue' field, we're looking
-                    # at the relationship from the other side; so we
-                    # can just skip these.
-                    if not hasattr(link, "outwardIssue"):
+        for field, value in self.setfields:
+            fields[field] = value
+
+        return fields
+
+    def get_fetched_fields(self) -> List[str]:
+        """Issue fields needed for updating issues and reconciling links."""
+        fields = ["summary", "description", "labels", "issuetype", "issuelinks"]
+        if self.story_points_field_id:
+            fields.append(self.story_points_field_id)
+        return fields + [field for field, _ in self.setfields]
+
+    def resolve_fields(self) -> None:
+        """Looks up the IDs of the fields named by `--setfield` and by the
+        instance's `story_points_field`."""
+        metadata = self.jira.metadata
+        self.setfields = [
+            (metadata.get_field_id(name), value) for name, value in self.options.setfield
+        ]
+        try:
+            self.story_points_field_id = metadata.find_field_id(
+                self.story_points_field
+            )
+        except InvalidField:
+            # Several fields share the name; that only matters if a row
+            # has a size to record, which `check_rows` refuses.
+            self.story_points_field_id = None
+        self.issue_types = {}
+
+    def get_issue_type_name(self, name: str) -> str:
+        if name not in self.issue_types:
+            issue_type = self.jira.metadata.get_issue_type(self.options.project, name)
+            self.issue_types[name] = issue_type["name"]
+        return self.issue_types[name]
+
+    def new_index(self) -> IssueIndex:
+        """Returns an index in which to look up the issues of the rows
+        about to be synced."""
+        return IssueIndex(self.jira, fields=self.get_fetched_fields())
+
+    def get_issue_reader(self) -> BaseReader:
+        if self._issue_reader is None:
+            self._issue_reader = get_installed_reader(self.options.reader)(
+                self.config, self.options
+            )
+        return self._issue_reader
+
+    def confirm(self, prompt: str) -> bool:
+        from rich.prompt import Confirm
+
+        with span("prompt"):
+            return Confirm.ask(prompt)
+
+    def check_rows(self, issue_reader: BaseReader) -> Optional[Set[Id]]:
+        """Checks, before anything is changed, that every row's issue type
+        exists and that its size can be recorded.
+
+        Returns the IDs of the rows that have changed since they were
+        last synced, and of every row depending upon them, directly or
+        not; or `None` if every row is to be synced.
+        """
+        previous: Dict[Id, str] = {}
+        if not self.options.full:
+            for state in self.states.values():
+                previous.update(state.load())
+
+        dependencies: Dict[Id, List[str]] = {}
+        changed: List[Id] = []
+        invalid: Dict[str, List[Id]] = {}
+        with span("check_rows"):
+            for record in self.sheets.records():
+                issuetype = record.issuetype or self.options.issuetype
+                if issuetype and issuetype not in self.issue_types:
+                    found = self.jira.metadata.find_issue_type(
+                        self.options.project, issuetype
+                    )
+                    if found is None:
+                        invalid.setdefault(issuetype, []).append(record.id)
                         continue
+                    self.issue_types[issuetype] = found["name"]
+                if record.size and self.story_points_field_id is None:
+                    # Raises if several fields share the name.
+                    self.jira.metadata.find_field_id(self.story_points_field)
+                    raise InvalidField(
+                        f"Row {record.id} has a size, but there is no field "
+                        f"named {self.story_points_field} in which to record "
+                        "it; set story_points_field in your configuration."
+                    )
+                if not previous:
+                    continue
+
+                names = dependencies[record.id] = list(
+                    issue_reader.get_dependency_names(record)
+                )
+                if previous.get(record.id) != self.get_digest(record, names):
+                    changed.append(record.id)
+
+        if invalid:
+            names = [
+                issue_type["name"]
+                for issue_type in self.jira.metadata.issue_types(self.options.project)
+            ]
+            raise InvalidIssueType(
+                f"Project {self.options.project} has no issue type named "
+                + "; nor ".join(
+                    f"{issuetype} (used by row{'s' if len(ids) > 1 else ''} "
+                    + ", ".join(ids[:5])
+                    + (f" and {len(ids) - 5} more" if len(ids) > 5 else "")
+                    + ")"
+                    for issuetype, ids in invalid.items()
+                )
+                + f".  Its issue types are: {', '.join(names)}."
+            )
+        if not previous:
+            return None
+
+        rows = DependencyGraph(dependencies).downstream(changed)
+
+        if len(rows) < len(dependencies):
+            self.print_status(
+                f"Skipping {len(dependencies) - len(rows)} rows that have not "
+                "changed since they were last synced."
+            )
+        return rows
+
+    def is_unchanged(self, record: IssueDescriptor) -> bool:
+        return self.changed is not None and record.id not in self.changed
+
+    def get_digest(
+        self, record: IssueDescriptor, dependency_names: Iterable[str]
+    ) -> str:
+        return get_row_digest(
+            self.keys.get(record.id) or record.jira_id or "",
+            self.get_fields(record),
+            dependency_names,
+            self.options.relationship,
+        )
 
+    def digest_synced(
+        self, issue_reader: BaseReader, records: Iterable[IssueDescriptor]
+    ) -> None:
+        """Notes the digests of those of `records` now in sync with Jira."""
+        for record in records:
+            key = self.keys.get(record.id) or record.jira_id
+            if key and record.id not in self.unsynced and key not in self.unlinked:
+                self.digests[record.id] = self.get_digest(
+                    record, issue_reader.get_dependency_names(record)
+                )
+
+    def save_state(self) -> None:
+        # Unless issues were synced, their fields may not match the rows'.
+        if self.options.update_or_create_issues:
+            for path, digests in self.sheets.split(self.digests).items():
+                self.states[path].save(digests)
+
+    def sync_issues(self, records: List[IssueDescriptor]) -> None:
+        for record in records:
+            if self.skip_all:
+                self.unsynced.add(record.id)
+                continue
+
+            fields = self.get_fields(record)
+            try:
+                if not record.jira_id:
+                    if self.options.update_or_create_issues:
+                        if self.confirm(
+                            f'Create issue for [u]"{record.summary}" ({record.id})[/u]?'
+                        ):
+                            jira_issue = self.jira.create_issue(fields=fields)
+                            self.record_issues([(record, jira_issue)])
+                            self.outcomes["created"] += 1
+                        else:
+                            raise Abort(f"Issue for {record.id} does not exist")
+                else:
+                    jira_issue = self.index.issue(record.jira_id)
+                    changed = get_changed_fields(fields, jira_issue)
                     if (
-                        link.type.name == self.options.relationship
-                        and link.outwardIssue.key == issue.key
-                    ):
-                        found_link = True
-
-                if not found_link:
-                    if Confirm.ask(
-                        "Create relationship"
-                        f' [u]"{jira_dep.fields.summary}" ({jira_dep.key})[/u]'
-                        f" [b]{self.options.relationship}[/b]"
-                        f' [u]"{issue.fields.summary}" ({record.id})[/u]?'
+                        changed
+                        and self.options.update_or_create_issues
+                        and self.confirm(
+                            f"Update {', '.join(changed)} of issue for "
+                            f'[u]"{record.summary}" ({record.id})[/u]?'
+                        )
                     ):
-                        self.jira.create_issue_link(
-                            type=self.options.relationship,
-                            inwardIssue=jira_dep.key,
-                            outwardIssue=issue.key,
+                        jira_issue.update(changed)
+                        self.jira.remember([jira_issue])
+                        self.index.add(jira_issue)
+                        self.outcomes["updated"] += 1
+                    else:
+                        if changed:
+                            self.unsynced.add(record.id)
+                        self.outcomes["unchanged"] += 1
+                    self.record_issues([(record, jira_issue)])
+            except (KeyboardInterrupt, Abort):
+                self.unsynced.add(record.id)
+                self.skip_all = True
+
+    def sync_issues_in_bulk(self, records: List[IssueDescriptor]) -> None:
+        creates: List[Tuple[IssueDescriptor, Dict[str, Any]]] = []
+        updates: List[Tuple[IssueDescriptor, str, Dict[str, Any]]] = []
+        for record in records:
+            if record.jira_id:
+                updates.append((record, record.jira_id, self.get_fields(record)))
+            elif self.options.update_or_create_issues:
+                creates.append((record, self.get_fields(record)))
+
+        self.execute_in_bulk(creates, updates, self.update_issue)
+
+    def execute_in_bulk(
+        self,
+        creates: List[Tuple[IssueDescriptor, Dict[str, Any]]],
+        updates: List[Tuple[IssueDescriptor, str, Dict[str, Any]]],
+        update_issue: Callable[[str, Dict[str, Any]], Tuple[Issue, bool]],
+    ) -> None:
+        """Creates and updates issues concurrently, without prompting.
+
+        New issues are created in batches using Jira's bulk-create
+        endpoint; each update is made by calling `update_issue` with the
+        issue's key and fields.
+        """
+        from jira import JIRAError
+
+        batch_size = min(self.options.batch_size, JIRA_BULK_CREATE_LIMIT)
+
+        with ThreadPoolExecutor(max_workers=self.options.concurrency) as executor:
+            created = {
+                executor.submit(
+                    self.jira.create_issues,
+                    [fields for _, fields in batch],
+                    prefetch=False,
+                ): batch
+                for batch in chunked(creates, batch_size)
+            }
+            updated = {
+                executor.submit(update_issue, key, fields): record
+                for record, key, fields in updates
+            }
+
+            for future in as_completed(created):
+                batch = created[future]
+                try:
+                    results = future.result()
+                except JIRAError as e:
+                    for record, _ in batch:
+                        self.report_failure(record, "create", e.text)
+                        self.outcomes["failed"] += 1
+                    continue
+
+                # Results are returned in the same order as the
+                # submitted field list, including for failed elements.
+                successes: List[Tuple[IssueDescriptor, Issue]] = []
+                for (record, _), result in zip(batch, results):
+                    if result["status"] == "Success":
+                        successes.append((record, result["issue"]))
+                        self.outcomes["created"] += 1
+                    else:
+                        self.report_failure(record, "create", result["error"])
+                        self.outcomes["failed"] += 1
+                self.record_issues(successes)
+
+            for future in as_completed(updated):
+                record = updated[future]
+                try:
+                    jira_issue, was_updated = future.result()
+                except JIRAError as e:
+                    self.report_failure(record, "update", e.text)
+                    self.outcomes["failed"] += 1
+                    continue
+                self.record_issues([(record, jira_issue)])
+                self.outcomes["updated" if was_updated else "unchanged"] += 1
+
+    def update_issue(self, key: str, fields: Dict[str, Any]) -> Tuple[Issue, bool]:
+        """Updates only those fields that differ from the issue in Jira.
+
+        Returns the issue, and whether any fields needed to be updated.
+        """
+        jira_issue = self.index.issue(key)
+        changed = get_changed_fields(fields, jira_issue)
+        if not changed or not self.options.update_or_create_issues:
+            return jira_issue, False
+
+        jira_issue.update(changed)
+        self.jira.remember([jira_issue])
+        self.index.add(jira_issue)
+        return jira_issue, True
+
+    def apply_update(self, key: str, fields: Dict[str, Any]) -> Tuple[Issue, bool]:
+        """Updates the given fields of an issue, as planned."""
+        jira_issue = self.index.issue(key)
+        jira_issue.update(fields)
+        self.jira.remember([jira_issue])
+        self.index.add(jira_issue)
+        return jira_issue, True
+
+    def sync_in_dependency_order(self, issue_reader: BaseReader) -> None:
+        """Syncs every row, each as soon as the rows it depends upon are.
+
+        Unlike the other modes, this holds the whole sheet in memory.
+        """
+        records = {
+            record.id: record for record in self.read_records(issue_reader)
+        }
+        pending: List[IssueDescriptor] = []
+        for record in records.values():
+            if self.is_unchanged(record):
+                # Rows depending upon this one will need its key.
+                self.keys.setdefault(record.id, cast(str, record.jira_id))
+                self.outcomes["unchanged"] += 1
+            else:
+                pending.append(record)
+
+        self.index = self.new_index()
+        self.index.prefetch(
+            (self.keys.get(record.id) or record.jira_id for record in pending),
+            concurrency=self.options.concurrency,
+        )
+
+        def on_complete(record_id: Id, result: Tuple[str, str]) -> None:
+            key, outcome = result
+            self.record_keys([(records[record_id], key)])
+            self.outcomes[outcome] += 1
+
+        scheduler: Scheduler[Tuple[str, str]] = Scheduler(
+            DependencyGraph.from_records(issue_reader, pending),
+            concurrency=self.options.concurrency,
+        )
+        with span("sync_issues"):
+            result = scheduler.run(
+                lambda record_id: self.sync_issue_and_links(
+                    issue_reader, records[record_id]
+                ),
+                on_complete=on_complete,
+            )
+
+        for record_id, error in result.errors.items():
+            self.report_failure(
+                records[record_id], "sync", getattr(error, "text", error)
+            )
+            self.outcomes["failed"] += 1
+        for record_id in result.skipped:
+            self.report_failure(
+                records[record_id], "sync", "one of its dependencies failed"
+            )
+            self.outcomes["failed"] += 1
+
+        self.digest_synced(issue_reader, records.values())
+
+    def sync_issue_and_links(
+        self, issue_reader: BaseReader, record: IssueDescriptor
+    ) -> Tuple[str, str]:
+        """Creates or updates a row's issue and links it to its dependencies.
+
+        Returns the issue's key and whether it was created, updated or
+        unchanged; only the key is kept so that the issues of rows synced
+        so far need not all be held in memory.
+        """
+        fields = self.get_fields(record)
+        key = self.keys.get(record.id) or record.jira_id
+        if key:
+            jira_issue, was_updated = self.update_issue(key, fields)
+            outcome = "updated" if was_updated else "unchanged"
+        elif self.options.update_or_create_issues:
+            jira_issue = self.jira.create_issue(fields=fields, prefetch=False)
+            outcome = "created"
+        else:
+            raise UserError(f"Issue for {record.id} does not exist")
+
+        # Everything this row depends upon has been synced already.
+        existing = LinkIndex([jira_issue])
+        for link in existing.missing(
+            Link(self.options.relationship, dependency_key, jira_issue.key)
+            for dependency_key in issue_reader.get_dependency_keys(record, self.keys)
+        ):
+            self.jira.create_issue_link(
+                type=link.type, inwardIssue=link.inward, outwardIssue=link.outward
+            )
+
+        return jira_issue.key, outcome
+
+    def record_issues(self, synced: List[Tuple[IssueDescriptor, Issue]]) -> None:
+        """Journals the issues that rows have been synced to."""
+        self.record_keys([(record, issue.key) for record, issue in synced])
+
+    def record_keys(self, synced: List[Tuple[IssueDescriptor, str]]) -> None:
+        """Journals the keys of the issues that rows have been synced to."""
+        entries = [(record.id, key) for record, key in synced]
+        if entries:
+            self.keys.update(entries)
+            for path, keys in self.sheets.split(dict(entries)).items():
+                if keys:
+                    self.journals[path].record(keys.items())
+
+    def report_outcomes(self):
+        summary = (
+            f"Created {self.outcomes['created']}, "
+            f"updated {self.outcomes['updated']} and "
+            f"left {self.outcomes['unchanged']} issues unchanged."
+        )
+        if self.outcomes["failed"]:
+            summary += f" [red]{self.outcomes['failed']} failed.[/red]"
+        self.print_status(summary)
+
+    def print_status(self, message: str) -> None:
+        """Prints a message about the sync, naming the instance being
+        synced if it is one of several."""
+        if self.instance_name:
+            message = f"{self.instance_name}: {message}"
+        self.console.print(message)
+
+    def report_failure(self, record: IssueDescriptor, action: str, error: Any):
+        self.unsynced.add(record.id)
+        self.print_status(
+            f"[red]Could not {action} issue for "
+            f'"{record.summary}" ({record.id}): {error}[/red]'
+        )
+
+    def handle(self):
+        if self.options.instances:
+            self.sync_instances()
+        else:
+            self.sync()
+
+    def sync_instances(self) -> None:
+        """Syncs the sheets to each of `--instances` at once, each in a
+        process of its own, then writes every instance's issue keys back
+        to the sheets together.
+
+        An instance that could not be synced keeps its journal, so that
+        running the same command again picks up where it left off.
+        """
+        if self.options.plan or self.options.apply:
+            raise UserError("--plan and --apply sync one instance at a time.")
+        if not (self.options.bulk or self.options.parallel or self.options.yes):
+            raise UserError(
+                "Syncing several instances at once requires --bulk, "
+                "--parallel or --yes."
+            )
+        names = list(dict.fromkeys(self.options.instances))
+        for name in names:
+            if name not in self.config.get("instances", {}):
+                raise ConfigurationError(f"No instance named {name} is configured.")
+
+        sheets = SheetSet(expand_paths(self.options.paths), self.get_issue_reader())
+
+        keys: Dict[str, Dict[Id, str]] = {}
+        errors: Dict[str, Exception] = {}
+        with ProcessPoolExecutor(max_workers=len(names)) as executor:
+            futures = {
+                executor.submit(sync_instance, self.config, self.options, name): name
+                for name in names
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors[name] = e
+                    continue
+                self.metrics.merge(result.metrics)
+                if result.retries:
+                    self.console.print(f"[yellow]{name}: {result.retries}[/yellow]")
+                if result.error is not None:
+                    errors[name] = result.error
+                else:
+                    keys[name] = result.keys
+
+        synced = [name for name in names if name in keys]
+        if synced:
+            sheets.write_keys(
+                lambda record: [keys[name].get(record.id, "") for name in synced],
+                [get_key_field(name) for name in synced],
+            )
+            for name in synced:
+                for path in sheets.paths:
+                    Journal(get_journal_path(path, name)).remove()
+
+        for name, error in errors.items():
+            if isinstance(error, UserError):
+                self.console.print(f"[red]{name}: {error}[/red]")
+        for error in errors.values():
+            if not isinstance(error, UserError):
+                raise error
+        if errors:
+            raise UserError(
+                f"Could not sync to {', '.join(errors)}; run again to resume."
+            )
+
+    def sync(self, instance_name: Optional[str] = None) -> None:
+        """Syncs the sheets to the selected instance.
+
+        If `instance_name` is given, the instance is one of several being
+        synced at once: keys are read from (and journalled for) its own
+        column, and left for `sync_instances` to write back.
+        """
+        self.instance_name = instance_name
+        issue_reader = self.get_issue_reader()
+
+        self.outcomes = Counter()
+        self.skip_all = False
+        self.digests = {}
+        self.unsynced = set()
+        self.unlinked = set()
+        self.sheets = SheetSet(
+            expand_paths(self.options.paths),
+            issue_reader,
+            get_key_field(instance_name) if instance_name else JIRA_ID_FIELD,
+            self.parsed,
+        )
+        # Each sheet's rows are journalled, and their digests kept, next
+        # to it, so that sheets added since an interrupted run do not
+        # hide the journal of the rows already synced.
+        self.journals = {
+            path: Journal(get_journal_path(path, instance_name))
+            for path in self.sheets.paths
+        }
+        self.keys = {}
+        for journal in self.journals.values():
+            self.keys.update(journal.load())
+        self.resumed = bool(self.keys)
+        if self.keys:
+            self.print_status(
+                f"Resuming an interrupted run; {len(self.keys)} rows "
+                "were already synced."
+            )
+        self.states = {
+            path: SyncState(get_state_path(path, instance_name))
+            for path in self.sheets.paths
+        }
+        try:
+            self.sync_rows(issue_reader)
+        finally:
+            # A sync that failed keeps its journals, but not their files
+            # open, e.g. while watch waits to sync again.
+            for journal in self.journals.values():
+                journal.close()
+
+    def sync_rows(self, issue_reader: BaseReader) -> None:
+        self.resolve_fields()
+        self.changed = None
+        if not self.options.apply:
+            self.changed = self.check_rows(issue_reader)
+
+        if self.options.plan or self.options.apply or self.options.yes:
+            self.handle_plan(issue_reader)
+            return
+
+        if self.options.parallel:
+            self.sync_in_dependency_order(issue_reader)
+        else:
+            for _, _, records in self.sheets.batches():
+                pending: List[IssueDescriptor] = []
+                for record in records:
+                    if self.is_unchanged(record):
+                        self.outcomes["unchanged"] += 1
+                    elif record.id not in self.keys:
+                        pending.append(record)
+                self.sync_window(pending)
+
+        self.write_keys()
+        self.report_outcomes()
+
+        if not self.options.parallel:
+            with span("sync_links"):
+                self.sync_links(issue_reader)
+        self.save_state()
+
+    def write_keys(self) -> None:
+        """Writes the keys of synced issues to the sheets, replacing them,
+        and removes the journal of them.
+
+        If this is one of several instances being synced at once, the
+        keys are only collected; see `sync_instances`.  Likewise if no
+        issue was created, as the sheets already hold every key.
+        """
+
+        def get_key(record: IssueDescriptor) -> str:
+            key = self.keys.get(record.id, record.jira_id or "")
+            if key:
+                self.keys[record.id] = key
+            return key
+
+        if self.instance_name or not (self.outcomes["created"] or self.resumed):
+            for record in self.sheets.records():
+                get_key(record)
+        else:
+            self.sheets.write_keys(lambda record: [get_key(record)])
+        if not self.instance_name:
+            for journal in self.journals.values():
+                journal.remove()
+
+    def sync_window(self, records: List[IssueDescriptor]) -> None:
+        self.index = self.new_index()
+        self.index.prefetch(
+            (record.jira_id for record in records if record.jira_id),
+            concurrency=self.options.concurrency,
+        )
+
+        with span("sync_issues"):
+            if self.options.bulk:
+                self.sync_issues_in_bulk(records)
+            else:
+                self.sync_issues(records)
+
+    def sync_links(self, issue_reader: BaseReader) -> None:
+        """Creates missing dependency links, a window of rows at a time.
+
+        Rows are re-read from the (now updated) sheets, so only the map
+        of row IDs to issue keys needs to be held in memory.
+        """
+        for _, _, records in self.sheets.batches():
+            wanted: List[Link] = []
+            for record in records:
+                key = self.keys.get(record.id)
+                if not key or self.is_unchanged(record):
+                    continue
+                for dependency_key in issue_reader.get_dependency_keys(
+                    record, self.keys
+                ):
+                    wanted.append(Link(self.options.relationship, dependency_key, key))
+            self.create_links(wanted)
+            self.digest_synced(issue_reader, records)
+
+    def create_links(self, wanted: List[Link]) -> None:
+        if not wanted:
+            return
+
+        # Jira lists each link on both of its issues, so these are
+        # enough to tell which of the wanted links already exist.
+        linked_issues = LinkedIssueIndex(self.jira)
+        linked_issues.prefetch(
+            (key for link in wanted for key in (link.inward, link.outward)),
+            concurrency=self.options.concurrency,
+        )
+
+        missing: List[Link] = []
+        for link in linked_issues.links.missing(wanted):
+            if link.inward not in linked_issues:
+                self.print_status(
+                    f"[red]Could not find dependency {link.inward} "
+                    f"of {link.outward}.[/red]"
+                )
+                self.unlinked.add(link.outward)
+                continue
+
+            if self.options.bulk or self.confirm(
+                "Create relationship"
+                f' [u]"{linked_issues.summary(link.inward)}"'
+                f" ({link.inward})[/u]"
+                f" [b]{link.type}[/b]"
+                f' [u]"{linked_issues.summary(link.outward)}"'
+                f" ({link.outward})[/u]?"
+            ):
+                missing.append(link)
+            else:
+                self.unlinked.add(link.outward)
+
+        self.link_issues(missing)
+
+    def link_issues(self, links: List[Link]) -> None:
+        """Creates the given links concurrently, reporting any failures."""
+        from jira import JIRAError
+
+        with ThreadPoolExecutor(max_workers=self.options.concurrency) as executor:
+            futures = {
+                executor.submit(
+                    self.jira.create_issue_link,
+                    type=link.type,
+                    inwardIssue=link.inward,
+                    outwardIssue=link.outward,
+                ): link
+                for link in links
+            }
+            for future in as_completed(futures):
+                link = futures[future]
+                try:
+                    future.result()
+                except JIRAError as e:
+                    self.unlinked.add(link.outward)
+                    self.print_status(
+                        f"[red]Could not link {link.inward} {link.type} "
+                        f"{link.outward}: {e.text}[/red]"
+                    )
+
+    def handle_plan(self, issue_reader: BaseReader) -> None:
+        if self.options.apply:
+            plan = Plan.load(self.options.apply)
+            digests = self.sheets.digests()
+            if plan.sheets.keys() != digests.keys():
+                raise InvalidPlan(
+                    f"Plan {self.options.apply} was made for "
+                    f"{', '.join(plan.sheets)}."
+                )
+            for path, digest in digests.items():
+                if plan.sheets[path] != digest:
+                    raise InvalidPlan(
+                        f"{path} has changed since plan "
+                        f"{self.options.apply} was made; please make a new plan."
+                    )
+            if plan.project != self.options.project:
+                raise InvalidPlan(
+                    f"Plan {self.options.apply} was made for project {plan.project}."
+                )
+        else:
+            plan = self.build_plan(issue_reader)
+
+        self.print_status(plan.summary())
+        if self.options.plan:
+            plan.save(self.options.plan)
+            self.console.print(
+                f"Review {self.options.plan}, then run again with "
+                f"--apply={self.options.plan} to make these changes."
+            )
+            return
+
+        self.apply_plan(issue_reader, plan)
+
+    def read_records(self, issue_reader: BaseReader) -> List[IssueDescriptor]:
+        return list(self.sheets.records())
+
+    def build_plan(self, issue_reader: BaseReader) -> Plan:
+        """Works out the changes needed, without making any of them.
+
+        Unlike the streaming modes, this holds the whole sheet in memory.
+        """
+        plan = Plan(
+            sheets=self.sheets.digests(),
+            project=self.options.project,
+        )
+        records = self.read_records(issue_reader)
+        pending = [record for record in records if not self.is_unchanged(record)]
+        plan.unchanged += len(records) - len(pending)
+
+        keys: Dict[Id, str] = {}
+        for record in records:
+            key = self.keys.get(record.id) or record.jira_id
+            if key:
+                keys[record.id] = key
+        # Dependencies upon rows that have no issue yet are planned
+        # against the row, and resolved once its issue is created.
+        references = {
+            record.id: keys.get(record.id) or get_row_reference(record.id)
+            for record in records
+        }
+        wanted = [
+            Link(self.options.relationship, dependency, references[record.id])
+            for record in pending
+            for dependency in issue_reader.get_dependency_keys(record, references)
+        ]
+
+        self.index = self.new_index()
+        self.index.prefetch(
+            [keys[record.id] for record in pending if record.id in keys]
+            + [link.inward for link in wanted if get_referenced_row(link.inward) is None],
+            concurrency=self.options.concurrency,
+        )
+
+        with span("plan"):
+            synced = set()
+            for record in pending:
+                fields = self.get_fields(record)
+                key = keys.get(record.id)
+                if key:
+                    if key not in self.index:
+                        self.report_failure(record, "find", f"{key} does not exist")
+                        continue
+                    changed = get_changed_fields(fields, self.index.issue(key))
+                    if changed and self.options.update_or_create_issues:
+                        plan.issues.append(
+                            PlannedIssue(record.id, record.summary, key, changed)
                         )
+                    else:
+                        plan.unchanged += 1
+                    synced.add(references[record.id])
+                elif self.options.update_or_create_issues:
+                    plan.issues.append(
+                        PlannedIssue(record.id, record.summary, None, fields)
+                    )
+                    synced.add(references[record.id])
+
+            existing = LinkIndex(self.index.raw_issues())
+            for link in existing.missing(wanted):
+                if link.outward not in synced:
+                    continue
+                if get_referenced_row(link.inward) is not None:
+                    if link.inward not in synced:
+                        continue
+                elif link.inward not in self.index:
+                    self.print_status(
+                        f"[red]Could not find dependency {link.inward} "
+                        f"of {link.outward}.[/red]"
+                    )
+                    continue
+                plan.links.append(PlannedLink(*link))
+
+        return plan
+
+    def apply_plan(self, issue_reader: BaseReader, plan: Plan) -> None:
+        """Makes the changes listed in `plan`, without prompting."""
+        records = {record.id: record for record in self.read_records(issue_reader)}
+        try:
+            creates = [
+                (records[issue.id], issue.fields)
+                for issue in plan.creates
+                if issue.id not in self.keys
+            ]
+            updates = [
+                (records[issue.id], cast(str, issue.key), issue.fields)
+                for issue in plan.updates
+            ]
+        except KeyError as e:
+            raise InvalidPlan(f"Row {e} of the plan is not in the sheets.")
+
+        self.index = self.new_index()
+        self.index.prefetch(
+            (key for _, key, _ in updates), concurrency=self.options.concurrency
+        )
+        with span("sync_issues"):
+            self.execute_in_bulk(creates, updates, self.apply_update)
+        self.outcomes["unchanged"] += plan.unchanged
+
+        self.write_keys()
+        self.report_outcomes()
+
+        def resolve(reference: str) -> Optional[str]:
+            row_id = get_referenced_row(reference)
+            return reference if row_id is None else self.keys.get(row_id)
+
+        links: List[Link] = []
+        for planned in plan.links:
+            inward, outward = resolve(planned.inward), resolve(planned.outward)
+            # The issue for one end of the link could not be created.
+            if inward and outward:
+                links.append(Link(planned.type, inward, outward))
+        with span("sync_links"):
+            self.link_issues(links)
+
+        self.digest_synced(issue_reader, records.values())
+        self.save_state()
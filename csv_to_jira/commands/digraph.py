@@ -1,11 +1,26 @@
 import argparse
-import csv
-from csv_to_jira.types import IssueDescriptor
+from csv_to_jira.types import Id, IssueDescriptor
+from html import escape
 from pathlib import Path
 import textwrap
-from typing import List
+from typing import Container, Dict, Iterable, List, Optional, Set
 
-from ..plugin import BaseCommand, BaseReader, get_installed_readers
+from ..plugin import (
+    BaseCommand,
+    BaseReader,
+    get_installed_reader,
+    get_installed_reader_names,
+)
+from ..dot import DotWriter, Html
+from ..exceptions import UserError
+from ..graph import DependencyGraph
+from ..metrics import span
+from ..sheet import SheetSet, expand_paths
+
+
+SUMMARY_WRAPPER = textwrap.TextWrapper(width=20)
+
+CLUSTER_CHOICES = ["label", "issuetype"]
 
 
 class Command(BaseCommand):
@@ -15,11 +30,16 @@ class Command(BaseCommand):
 
     @classmethod
     def add_arguments(cls, parser: argparse.ArgumentParser):
-        available_readers = get_installed_readers()
+        available_readers = get_installed_reader_names()
 
         parser.add_argument(
-            "path",
-            type=Path,
+            "paths",
+            nargs="+",
+            metavar="path",
+            help=(
+                "Sheets to read; globs (e.g. 'teams/*.csv') are expanded.  "
+                "Rows of several sheets are drawn as one graph."
+            ),
         )
         parser.add_argument(
             "out_path",
@@ -28,37 +48,169 @@ class Command(BaseCommand):
         parser.add_argument(
             "--reader", type=str, choices=available_readers, default="default"
         )
+        parser.add_argument(
+            "--cluster",
+            choices=CLUSTER_CHOICES,
+            default=None,
+            help=(
+                "Group issues in boxes by their (first) label or by their "
+                "issue type."
+            ),
+        )
+        parser.add_argument(
+            "--reduce",
+            action="store_true",
+            default=False,
+            help=(
+                "Omit each dependency that is implied by another (i.e. draw "
+                "the transitive reduction of the dependency graph)."
+            ),
+        )
+        parser.add_argument(
+            "--upstream",
+            action="append",
+            default=[],
+            help=(
+                "Only draw the issue having this ID and everything it depends "
+                "upon.  Can be specified multiple times."
+            ),
+        )
+        parser.add_argument(
+            "--downstream",
+            action="append",
+            default=[],
+            help=(
+                "Only draw the issue having this ID and everything depending "
+                "upon it.  Can be specified multiple times."
+            ),
+        )
 
     def handle(self):
-        available_readers = get_installed_readers()
-        issue_reader: BaseReader = available_readers[self.options.reader](
+        issue_reader: BaseReader = get_installed_reader(self.options.reader)(
             self.config, self.options
         )
 
-        with open(self.options.path, "r") as inf:
-            reader = csv.DictReader(inf)
+        sheets = SheetSet(expand_paths(self.options.paths), issue_reader)
+        if not (
+            self.options.cluster
+            or self.options.reduce
+            or self.options.upstream
+            or self.options.downstream
+        ):
+            # Nothing calls for the whole graph at once, so write
+            # each batch of rows out as soon as it has been read.
+            with open(self.options.out_path, "w") as outf, DotWriter(outf) as dot:
+                for _, _, issues in sheets.batches():
+                    for issue in issues:
+                        self.write_node(dot, issue)
+                    for issue in issues:
+                        self.write_edges(
+                            dot,
+                            issue,
+                            issue_reader.get_dependency_names(issue),
+                            sheets.ids,
+                        )
+            return
+
+        issues_by_id: Dict[Id, IssueDescriptor] = {
+            issue.id: issue for issue in sheets.records()
+        }
+
+        dependencies: Dict[Id, List[str]] = {
+            issue.id: list(issue_reader.get_dependency_names(issue))
+            for issue in issues_by_id.values()
+        }
+        graph = DependencyGraph(dependencies)
+
+        shown = self.get_shown(graph)
+        if self.options.reduce:
+            with span("reduce"):
+                reduced = graph.transitive_reduction()
+            for id, names in dependencies.items():
+                kept = set(reduced[id])
+                dependencies[id] = [
+                    name for name in names if name in kept or name not in graph
+                ]
 
-            issues: List[IssueDescriptor] = []
-            for row in reader:
-                record = issue_reader.process_row(row)
-                issues.append(record)
+        with open(self.options.out_path, "w") as outf, DotWriter(outf) as dot:
+            if self.options.cluster:
+                clusters: Dict[Optional[str], List[IssueDescriptor]] = {}
+                for id in issues_by_id:
+                    if id in shown:
+                        issue = issues_by_id[id]
+                        clusters.setdefault(self.get_cluster(issue), []).append(issue)
+                for name, issues in clusters.items():
+                    if name is None:
+                        for issue in issues:
+                            self.write_node(dot, issue)
+                        continue
+                    with dot.cluster(name):
+                        for issue in issues:
+                            self.write_node(dot, issue)
+            else:
+                for id, issue in issues_by_id.items():
+                    if id in shown:
+                        self.write_node(dot, issue)
 
-        with open(self.options.out_path, "w") as outf:
-            lines = ["digraph issues {"]
+            for id, issue in issues_by_id.items():
+                if id in shown:
+                    self.write_edges(
+                        dot,
+                        issue,
+                        (
+                            name
+                            for name in dependencies[id]
+                            if name in shown or name not in graph
+                        ),
+                        graph,
+                    )
 
-            for issue in issues:
-                wrapped = "<BR/>".join(textwrap.wrap(issue.summary, 20))
-                lines.append(f"\tid{issue.id}[shape=box,label=<<B>{issue.id}</B><BR/>{wrapped}<BR/>{issue.size} pts>,height={issue.size * 1.25}]")
+    def get_shown(self, graph: DependencyGraph) -> Set[Id]:
+        """IDs of the rows to draw, given `--upstream` and `--downstream`."""
+        roots = self.options.upstream + self.options.downstream
+        if not roots:
+            return set(graph.nodes)
 
-            for issue in issues:
-                dep_names = issue_reader.get_dependency_names(issue)
-                for dep in dep_names:
-                    dep_name: str = f"id{dep}"
-                    if '-' in dep:
-                        dep_name = f"\"{dep}\""
+        for root in roots:
+            if root not in graph:
+                raise UserError(f"No row has the ID {root}.")
+        return graph.upstream(self.options.upstream) | graph.downstream(
+            self.options.downstream
+        )
+
+    def get_cluster(self, issue: IssueDescriptor) -> Optional[str]:
+        if self.options.cluster == "label":
+            return issue.labels[0] if issue.labels else None
+        return issue.issuetype or None
+
+    def write_node(self, dot: DotWriter, issue: IssueDescriptor) -> None:
+        lines = [f"<B>{escape(issue.id)}</B>"]
+        lines.extend(escape(line) for line in SUMMARY_WRAPPER.wrap(issue.summary))
+        attributes = {}
+        if issue.size is not None:
+            lines.append(f"{issue.size:g} pts")
+            attributes["height"] = issue.size * 1.25
+        dot.node(
+            f"id{issue.id}", shape="box", label=Html("<BR/>".join(lines)), **attributes
+        )
 
-                    lines.append(f"\t{dep_name} -> id{issue.id} [arrowhead=normal]")
+    def write_edges(
+        self,
+        dot: DotWriter,
+        issue: IssueDescriptor,
+        dependency_names: Iterable[str],
+        rows: Optional[Container[Id]] = None,
+    ) -> None:
+        """Draws an edge from each of `issue`'s dependencies to it.
 
-            lines.append("}")
+        Dependencies are drawn as rows if they are among `rows` (or, if
+        the IDs of all rows are not known, unless they look like issue
+        keys) and as issue keys otherwise.
+        """
+        for dep in dependency_names:
+            dep_name: str = f"id{dep}"
+            is_key = dep not in rows if rows is not None else '-' in dep
+            if is_key:
+                dep_name = dep
 
-            outf.write("\n".join(lines))
+            dot.edge(dep_name, f"id{issue.id}", arrowhead="normal")
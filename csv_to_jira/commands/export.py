@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import argparse
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import csv
+from itertools import islice
+import os
+from pathlib import Path
+import sys
+from typing import Any, Deque, Dict, Iterator, List, Optional, TextIO
+
+from ..constants import JIRA_ID_FIELD
+from ..exceptions import InvalidQuery
+from ..links import get_links
+from ..metrics import span, timed
+from ..plugin import BaseCommand
+from ..sheet import get_temporary_path
+from ..utils import positive_int
+
+
+# Jira may cap the number of issues per search page below what was asked
+# for; whatever the first page's `maxResults` reports is used for the rest.
+DEFAULT_PAGE_SIZE = 100
+
+# Columns written, in the order the agile reader reads them.
+COLUMNS = [
+    "ID",
+    "Summary",
+    "Description",
+    "Size",
+    "Labels",
+    "Issuetype",
+    "Depends",
+    JIRA_ID_FIELD,
+]
+
+
+class Command(BaseCommand):
+    @classmethod
+    def get_help(cls) -> str:
+        return """Export the issues matching a JQL query to a CSV that
+        create-issues can read back."""
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser):
+        parser.add_argument("jql", type=str, help="JQL query selecting the issues.")
+        parser.add_argument(
+            "out_path",
+            type=str,
+            help="CSV to write, or '-' to write to stdout.",
+        )
+        parser.add_argument(
+            "--relationship",
+            type=str,
+            default="Blocks",
+            help="Type of link by which issues depend upon one another.",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=positive_int,
+            default=DEFAULT_PAGE_SIZE,
+            help="Number of issues to request per search.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=positive_int,
+            default=4,
+            help="Maximum number of requests to have in flight at once.",
+        )
+
+    def handle(self):
+        # Instances without a story points field export no sizes.
+        self.size_field = self.jira.metadata.find_field_id(self.story_points_field)
+
+        if self.options.out_path == "-":
+            self.export(sys.stdout)
+            return
+
+        # As when writing keys back to a sheet, an interrupted export
+        # leaves any existing file as it was.
+        path = Path(self.options.out_path)
+        temporary_path = get_temporary_path(path)
+        try:
+            with open(temporary_path, "w", newline="") as outf:
+                count = self.export(outf)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        os.replace(temporary_path, path)
+        self.console.print(f"Exported {count} issues to {path}.")
+
+    def export(self, outf: TextIO) -> int:
+        """Writes a row for each matching issue as its page arrives, and
+        returns the number of rows written."""
+        writer = csv.writer(outf)
+        writer.writerow(COLUMNS)
+        count = 0
+        for issues in timed(self.pages(), "search"):
+            with span("write_csv"):
+                writer.writerows(self.get_row(raw) for raw in issues)
+            count += len(issues)
+        return count
+
+    def get_fields(self) -> List[str]:
+        fields = ["summary", "description", "labels", "issuetype", "issuelinks"]
+        if self.size_field:
+            fields.append(self.size_field)
+        return fields
+
+    def search(self, start_at: int, page_size: int) -> Dict[str, Any]:
+        return self.jira.search_issues(
+            self.options.jql,
+            startAt=start_at,
+            maxResults=page_size,
+            fields=self.get_fields(),
+            json_result=True,
+        )
+
+    def pages(self) -> Iterator[List[Dict[str, Any]]]:
+        """Yields each page of matching issues' JSON, in order.
+
+        The first page reveals how many issues match; the rest are then
+        fetched up to `--concurrency` at once.  Only that many pages are
+        requested ahead of the one being written, however many match.
+        """
+        from jira import JIRAError
+
+        try:
+            first = self.search(0, self.options.page_size)
+        except JIRAError as e:
+            raise InvalidQuery(f"Jira rejected the query: {e.text}")
+        yield first["issues"]
+
+        page_size = first.get("maxResults") or self.options.page_size
+        starts = iter(range(len(first["issues"]), first["total"], page_size))
+        with ThreadPoolExecutor(max_workers=self.options.concurrency) as executor:
+            pending: Deque[Future] = deque(
+                executor.submit(self.search, start_at, page_size)
+                for start_at in islice(starts, self.options.concurrency)
+            )
+            while pending:
+                page = pending.popleft().result()
+                start_at: Optional[int] = next(starts, None)
+                if start_at is not None:
+                    pending.append(executor.submit(self.search, start_at, page_size))
+                yield page["issues"]
+
+    def get_row(self, raw: Dict[str, Any]) -> List[str]:
+        fields = raw.get("fields") or {}
+        key = raw["key"]
+        # Rows are identified by their issue's key, so dependencies upon
+        # both exported and other issues are written as keys.
+        dependencies = [
+            link.inward
+            for link in get_links(raw)
+            if link.outward == key and link.type == self.options.relationship
+        ]
+        size = fields.get(self.size_field) if self.size_field else None
+        issuetype = fields.get("issuetype") or {}
+        return [
+            key,
+            fields.get("summary") or "",
+            fields.get("description") or "",
+            f"{size:g}" if size is not None else "",
+            " ".join(fields.get("labels") or []),
+            issuetype.get("name") or "",
+            ",".join(dict.fromkeys(dependencies)),
+            key,
+        ]
@@ -1,5 +1,3 @@
-import IPython
-
 from ..plugin import BaseCommand
 
 
@@ -9,4 +7,6 @@ class Command(BaseCommand):
         return """Open a shell from which you can access Jira"""
 
     def handle(self):
+        import IPython
+
         IPython.embed(evaluation="dangerous")
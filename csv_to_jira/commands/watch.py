@@ -0,0 +1,172 @@
+import argparse
+from pathlib import Path
+import time
+from typing import Dict, Optional, Sequence, Set, Tuple
+
+from ..exceptions import UserError
+from ..index import IssueIndex
+from ..plugin import BaseReader
+from ..sheet import expand_paths
+from ..types import Id
+from ..utils import get_file_stamp
+from .create_issues import Command as CreateIssuesCommand
+
+# Seconds after which a failed sync is tried again (unless a sheet changes
+# first); the delay doubles after each failure, up to the maximum.
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+
+
+class Command(CreateIssuesCommand):
+    # Issues looked up while syncing, kept from one sync to the next.
+    kept_index: Optional[IssueIndex] = None
+
+    @classmethod
+    def get_help(cls) -> str:
+        return """Sync your CSV to Jira as create-issues would, then again
+        whenever it changes."""
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.25,
+            help="Seconds between checks of whether the sheets have changed.",
+        )
+        parser.add_argument(
+            "--debounce",
+            type=float,
+            default=0.5,
+            help=(
+                "Seconds for which changed sheets must be left alone before "
+                "they are synced, so that a sheet is not read while it is "
+                "being saved."
+            ),
+        )
+
+    def handle(self):
+        if (
+            self.options.plan
+            or self.options.apply
+            or self.options.yes
+            or self.options.instances
+        ):
+            raise UserError(
+                "--plan, --apply, --yes and --instances cannot be used with watch."
+            )
+        if not self.options.parallel:
+            # Nobody is there to answer prompts.
+            self.options.bulk = True
+
+        # The connection to Jira, its field and issue type definitions,
+        # the records parsed from sheets that have not changed and the
+        # issues of rows that have not changed are all kept from one
+        # sync to the next.
+        self.parsed = {}
+
+        try:
+            attempted = seen = self.get_stamps()
+            synced = self.sync_changes()
+            changed_at = retry_at = time.monotonic()
+            retry_delay = RETRY_DELAY
+            if synced is None:
+                retry_at, retry_delay = self.schedule_retry(retry_delay)
+            self.console.print("Watching for changes; press Ctrl+C to stop.")
+            while True:
+                time.sleep(self.options.interval)
+                current = self.get_stamps()
+                now = time.monotonic()
+                if current != seen:
+                    seen, changed_at = current, now
+                elif (
+                    current is not None
+                    and current != synced
+                    and now - changed_at >= self.options.debounce
+                    # Sheets that failed to sync as they are are only
+                    # synced again once the retry is due.
+                    and (current != attempted or now >= retry_at)
+                ):
+                    changed = [
+                        path
+                        for path, stamp in current.items()
+                        if stamp != (attempted or {}).get(path)
+                    ]
+                    attempted = current
+                    result = self.sync_changes(changed)
+                    if result is None:
+                        retry_at, retry_delay = self.schedule_retry(retry_delay)
+                    else:
+                        # Sheets saved while they were being synced differ
+                        # from the stamps returned, so are synced again.
+                        synced, retry_delay = result, RETRY_DELAY
+        except KeyboardInterrupt:
+            self.console.print("Stopped watching.")
+
+    def schedule_retry(self, delay: float) -> Tuple[float, float]:
+        """Returns when to retry a failed sync, and the delay after which
+        to retry it should that fail too."""
+        self.console.print(f"Syncing again in {delay:g}s unless a sheet changes.")
+        return time.monotonic() + delay, min(delay * 2, MAX_RETRY_DELAY)
+
+    def get_stamps(self) -> Optional[Dict[Path, Tuple[int, int]]]:
+        """Returns the stamp of each sheet (see `get_file_stamp`), or
+        `None` if any is missing, e.g. while an editor replaces it."""
+        try:
+            return {
+                path: get_file_stamp(path) for path in expand_paths(self.options.paths)
+            }
+        except (OSError, UserError):
+            return None
+
+    def sync_changes(
+        self, changed: Sequence[Path] = ()
+    ) -> Optional[Dict[Path, Tuple[int, int]]]:
+        """Syncs the sheets, and returns the stamp of each as it was synced
+        (as it was read, or as its keys were written back to it), or
+        `None` if the sync failed."""
+        if changed:
+            self.console.print(
+                f"[dim]{time.strftime('%H:%M:%S')}[/dim] "
+                f"{', '.join(str(path) for path in changed)} changed."
+            )
+        try:
+            self.sync()
+        except UserError as e:
+            self.console.print(f"[red]{e}[/red]")
+            return None
+        except Exception:
+            # Keep watching; Jira may only be unreachable for a moment.
+            self.console.print_exception()
+            return None
+        return {
+            path: self.sheets.written.get(path) or self.parsed[path][0]
+            for path in self.sheets.paths
+        }
+
+    def check_rows(self, issue_reader: BaseReader) -> Optional[Set[Id]]:
+        changed = super().check_rows(issue_reader)
+        if self.kept_index is None:
+            return changed
+        if changed is None:
+            # Every row is to be synced; start from a fresh index.
+            self.kept_index = None
+            return changed
+
+        # The issues of the rows about to be synced are fetched again, in
+        # case they were edited in Jira since they were indexed.
+        stale = []
+        for record in self.sheets.records():
+            key = self.keys.get(record.id) or record.jira_id
+            if key and record.id in changed:
+                stale.append(key)
+        self.kept_index.discard(stale)
+        return changed
+
+    def new_index(self) -> IssueIndex:
+        if self.kept_index is None or self.kept_index.fields != sorted(
+            self.get_fetched_fields()
+        ):
+            self.kept_index = super().new_index()
+        return self.kept_index
@@ -1,3 +1,14 @@
 APP_NAME = "csv-to-jira"
 
 JIRA_ID_FIELD = "__jira_id__"
+
+# Jira rejects bulk-create requests having more than this many issues.
+JIRA_BULK_CREATE_LIMIT = 50
+
+# Number of rows read, synced and written back at a time; this bounds
+# how much of the sheet (and how many issues) we hold in memory.
+STREAM_WINDOW_SIZE = 500
+
+# Name of the field in which an issue's size (in story points) is kept,
+# unless an instance's `story_points_field` names another.
+STORY_POINTS_FIELD = "Story Points"
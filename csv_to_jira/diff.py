@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict
+
+if TYPE_CHECKING:
+    from jira import Issue
+
+
+# Fields that can be set when creating an issue, but not changed by
+# an update.
+CREATE_ONLY_FIELDS = {"project"}
+
+# When we set a field using a plain string, Jira may store it as an
+# object (e.g. an option, user or version); these are the attributes
+# such a string would be matched against.
+NAMED_VALUE_ATTRIBUTES = ("value", "name", "key", "id")
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _as_number(value: Any) -> Any:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def values_match(desired: Any, current: Any) -> bool:
+    """Whether setting a field to `desired` would leave `current` as-is."""
+    if _is_empty(desired) or _is_empty(current):
+        return _is_empty(desired) and _is_empty(current)
+
+    if isinstance(desired, dict):
+        if not isinstance(current, dict):
+            return False
+        return all(values_match(value, current.get(key)) for key, value in desired.items())
+
+    if isinstance(desired, (list, tuple)):
+        if not isinstance(current, list) or len(desired) != len(current):
+            return False
+        remaining = list(current)
+        for value in desired:
+            for index, candidate in enumerate(remaining):
+                if values_match(value, candidate):
+                    del remaining[index]
+                    break
+            else:
+                return False
+        return True
+
+    if isinstance(current, dict):
+        return any(
+            values_match(desired, current[attribute])
+            for attribute in NAMED_VALUE_ATTRIBUTES
+            if attribute in current
+        )
+
+    if isinstance(desired, (int, float)) or isinstance(current, (int, float)):
+        return _as_number(desired) is not None and _as_number(desired) == _as_number(
+            current
+        )
+
+    return str(desired) == str(current)
+
+
+def get_changed_fields(fields: Dict[str, Any], issue: Issue) -> Dict[str, Any]:
+    """Returns the subset of `fields` whose values differ from `issue`'s.
+
+    Fields that were not fetched along with `issue` are assumed to
+    have changed.
+    """
+    current_fields: Dict[str, Any] = issue.raw.get("fields", {})
+
+    changed: Dict[str, Any] = {}
+    for name, value in fields.items():
+        if name in CREATE_ONLY_FIELDS:
+            continue
+        if name in current_fields and values_match(value, current_fields[name]):
+            continue
+        changed[name] = value
+
+    return changed
@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+from types import TracebackType
+from typing import Any, Iterator, Optional, TextIO, Type
+
+
+def quote(value: str) -> str:
+    """Quotes `value` for use as a DOT identifier or attribute value."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class Html(str):
+    """An HTML-like label; written between angle brackets, not quoted."""
+
+
+def format_attributes(attributes: Any) -> str:
+    parts = []
+    for name, value in attributes.items():
+        if isinstance(value, Html):
+            parts.append(f"{name}=<{value}>")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            parts.append(f"{name}={value:g}")
+        else:
+            parts.append(f"{name}={quote(str(value))}")
+    return "[" + ",".join(parts) + "]" if parts else ""
+
+
+class DotWriter:
+    """Writes a Graphviz digraph to a file statement by statement.
+
+    Nothing is held in memory beyond the statement being written, so
+    graphs of any size can be written as their nodes and edges are read.
+    """
+
+    def __init__(self, outf: TextIO, name: str = "issues"):
+        self._outf = outf
+        self._name = name
+        self._indent = "\t"
+        self._clusters = 0
+
+    def __enter__(self) -> "DotWriter":
+        self._outf.write(f"digraph {self._name} {{\n")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._outf.write("}\n")
+
+    def node(self, name: str, **attributes: Any) -> None:
+        self._outf.write(
+            f"{self._indent}{quote(name)}{format_attributes(attributes)}\n"
+        )
+
+    def edge(self, tail: str, head: str, **attributes: Any) -> None:
+        self._outf.write(
+            f"{self._indent}{quote(tail)} -> {quote(head)}"
+            f"{format_attributes(attributes)}\n"
+        )
+
+    @contextmanager
+    def cluster(self, label: str) -> Iterator[None]:
+        """Groups the nodes written within this context in a labelled box."""
+        self._clusters += 1
+        self._outf.write(f"{self._indent}subgraph cluster_{self._clusters} {{\n")
+        outer = self._indent
+        self._indent += "\t"
+        self._outf.write(f"{self._indent}label={quote(label)}\n")
+        try:
+            yield
+        finally:
+            self._indent = outer
+            self._outf.write(f"{self._indent}}}\n")
@@ -12,3 +12,37 @@ class ConfigurationError(UserError):
 
 class Abort(CsvToJiraError):
     pass
+
+
+class DependencyCycleError(UserError):
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super().__init__("Dependency cycle found: " + " -> ".join(cycle))
+
+
+class InvalidPlan(UserError):
+    pass
+
+
+class InvalidQuery(UserError):
+    pass
+
+
+class InvalidField(UserError):
+    pass
+
+
+class InvalidIssueType(UserError):
+    pass
+
+
+class InvalidProject(UserError):
+    pass
+
+
+class SheetChanged(UserError):
+    pass
+
+
+class InvalidSheet(UserError):
+    pass
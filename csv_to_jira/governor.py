@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+from collections import Counter
+from email.utils import parsedate_to_datetime
+import logging
+import random
+import threading
+import time
+from typing import Any, Optional
+
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, ReadTimeout
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_RATE_LIMIT = 25.0
+
+# Statuses Jira (or a proxy in front of it) uses to ask us to slow down
+# or come back later.
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Methods that may be re-sent after a connection error, a timeout or a
+# gateway error without risking doing the same thing twice.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+def is_unprocessed(status: int, retry_after: Optional[str]) -> bool:
+    """Returns whether a response says its request was not processed.
+
+    Only throttling, and unavailability for which Jira says when to come
+    back, say so; a gateway error (502, 504) or a bare 503 may come from a
+    proxy after Jira has already, e.g., created the issues requested.
+    """
+    return status == 429 or (status == 503 and bool(retry_after))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Returns the number of seconds a `Retry-After` header asks us to wait."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestGovernor:
+    """Paces and retries requests made to a single Jira instance.
+
+    Requests are paced by a token bucket refilling at `rate` requests per
+    second.  Each time Jira throttles us, the rate is halved (but kept at
+    or above `min_rate`) and every request is held back for as long as
+    the response's `Retry-After` asks; each successful response then
+    raises the rate again by `rate_increase`, up to `max_rate`.  Retries
+    are delayed by `Retry-After` when given, or otherwise by an
+    exponential backoff with full jitter.
+
+    A `max_rate` of `None` leaves requests unpaced until Jira first
+    throttles us.  The governor is thread-safe, and may be shared by
+    several clients of the same instance.
+    """
+
+    def __init__(
+        self,
+        max_rate: Optional[float] = DEFAULT_RATE_LIMIT,
+        min_rate: float = 0.5,
+        rate_increase: float = 1.0,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 60.0,
+    ):
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.rate_increase = rate_increase
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.rate: Optional[float] = max_rate
+        self.stats: Counter = Counter()
+
+        self._lock = threading.Lock()
+        self._tokens = max_rate or 0.0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def reserve(self) -> float:
+        """Claims a slot for one request, returning how long to wait first."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            if self.rate is not None:
+                burst = max(1.0, self.rate)
+                self._tokens = min(
+                    burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / self.rate)
+            self.stats["requests"] += 1
+            return wait
+
+    def acquire(self) -> None:
+        """Blocks until a request may be sent."""
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+    def observe(
+        self,
+        method: str,
+        status: Optional[int],
+        retry_after: Optional[str] = None,
+        attempt: int = 0,
+    ) -> Optional[float]:
+        """Records the outcome of a request.
+
+        `status` is `None` if the request failed to connect or timed out.
+        Returns how many seconds to wait before retrying the request, or
+        `None` if it should not be retried.  Requests that are not
+        idempotent are only retried if Jira says it did not process them.
+        """
+        if status is not None and status not in RETRY_STATUSES:
+            self._speed_up()
+            return None
+
+        if method.upper() not in IDEMPOTENT_METHODS and (
+            status is None or not is_unprocessed(status, retry_after)
+        ):
+            return None
+
+        self.stats["throttled" if status == 429 else "errors"] += 1
+        if attempt >= self.max_retries:
+            self.stats["gave_up"] += 1
+            return None
+
+        requested = parse_retry_after(retry_after)
+        if requested is not None:
+            delay = requested + random.uniform(0, self.backoff_base)
+        else:
+            delay = random.uniform(
+                0, min(self.backoff_max, self.backoff_base * 2**attempt)
+            )
+        self._slow_down(delay)
+        self.stats["retries"] += 1
+        return delay
+
+    def _speed_up(self) -> None:
+        with self._lock:
+            if self.rate is not None:
+                self.rate += self.rate_increase
+                if self.max_rate is not None:
+                    self.rate = min(self.max_rate, self.rate)
+
+    def _slow_down(self, delay: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + delay)
+            if self.rate is None:
+                # Start pacing at the rate we had been managing so far.
+                elapsed = max(1.0, now - self._updated)
+                self.rate = max(self.min_rate, self.stats["requests"] / elapsed / 2)
+            else:
+                self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = now
+        logger.debug("Throttled; pacing requests at %.2f/s.", self.rate)
+
+    def summary(self) -> str:
+        """Describes the retries made, or returns an empty string if none were."""
+        if not self.stats["retries"] and not self.stats["gave_up"]:
+            return ""
+
+        summary = (
+            f"Retried {self.stats['retries']} of {self.stats['requests']} requests "
+            f"({self.stats['throttled']} throttled, {self.stats['errors']} errors)"
+        )
+        if self.stats["gave_up"]:
+            summary += f"; gave up on {self.stats['gave_up']}"
+        if self.rate is not None:
+            summary += f"; ended pacing at {self.rate:.1f} requests/s"
+        return summary + "."
+
+
+def _body_size(body: Any) -> int:
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    return 0
+
+
+class GovernedAdapter(HTTPAdapter):
+    """Transport adapter sending each request through a `RequestGovernor`.
+
+    Each attempt is also recorded in `csv_to_jira.metrics.metrics`.
+    """
+
+    def __init__(self, governor: RequestGovernor, **kwargs: Any):
+        self.governor = governor
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):  # type: ignore[override]
+        attempt = 0
+        while True:
+            self.governor.acquire()
+            started = time.perf_counter()
+            try:
+                response = super().send(request, **kwargs)
+            except (ConnectionError, ReadTimeout):
+                metrics.record_request(
+                    request.method,
+                    request.url,
+                    None,
+                    time.perf_counter() - started,
+                    _body_size(request.body),
+                )
+                delay = self.governor.observe(request.method, None, None, attempt)
+                if delay is None:
+                    raise
+            else:
+                metrics.record_request(
+                    request.method,
+                    request.url,
+                    response.status_code,
+                    time.perf_counter() - started,
+                    _body_size(request.body),
+                    int(response.headers.get("Content-Length") or 0)
+                    if kwargs.get("stream")
+                    else len(response.content),
+                )
+                delay = self.governor.observe(
+                    request.method,
+                    response.status_code,
+                    response.headers.get("Retry-After"),
+                    attempt,
+                )
+                if delay is None:
+                    return response
+                response.close()
+
+            metrics.record_retry(request.method, request.url)
+            logger.debug(
+                "Retrying %s %s in %.2fs (attempt %s).",
+                request.method,
+                request.url,
+                delay,
+                attempt + 1,
+            )
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from .exceptions import DependencyCycleError
+from .types import Id, IssueDescriptor
+
+if TYPE_CHECKING:
+    from .plugin import BaseReader
+
+
+class DependencyGraph:
+    """Adjacency index of the dependencies between rows of a sheet.
+
+    Dependencies on anything that is not itself a node of the graph
+    (e.g. existing Jira issues referenced by key) are not edges.
+    """
+
+    def __init__(self, dependencies: Mapping[Id, Iterable[Id]]):
+        self._dependencies: Dict[Id, List[Id]] = {}
+        self._dependents: Dict[Id, List[Id]] = {node: [] for node in dependencies}
+        for node, node_dependencies in dependencies.items():
+            edges = self._dependencies[node] = []
+            for dependency in dict.fromkeys(node_dependencies):
+                if dependency in self._dependents:
+                    edges.append(dependency)
+                    self._dependents[dependency].append(node)
+
+    @classmethod
+    def from_records(
+        cls, reader: BaseReader, records: Iterable[IssueDescriptor]
+    ) -> DependencyGraph:
+        return cls(
+            {record.id: list(reader.get_dependency_names(record)) for record in records}
+        )
+
+    def __contains__(self, node: Id) -> bool:
+        return node in self._dependencies
+
+    def __len__(self) -> int:
+        return len(self._dependencies)
+
+    @property
+    def nodes(self) -> List[Id]:
+        return list(self._dependencies)
+
+    def dependencies(self, node: Id) -> List[Id]:
+        """Nodes that `node` depends upon."""
+        return self._dependencies[node]
+
+    def dependents(self, node: Id) -> List[Id]:
+        """Nodes that depend upon `node`."""
+        return self._dependents[node]
+
+    def find_cycle(self) -> Optional[List[Id]]:
+        """Returns one dependency cycle (first node repeated last), if any."""
+        visiting, done = 1, 2
+        state: Dict[Id, int] = {}
+        for root in self._dependencies:
+            if root in state:
+                continue
+            path: List[Id] = [root]
+            stack = [iter(self._dependencies[root])]
+            state[root] = visiting
+            while stack:
+                for dependency in stack[-1]:
+                    if state.get(dependency) == visiting:
+                        return path[path.index(dependency) :] + [dependency]
+                    if dependency not in state:
+                        state[dependency] = visiting
+                        path.append(dependency)
+                        stack.append(iter(self._dependencies[dependency]))
+                        break
+                else:
+                    state[path.pop()] = done
+                    stack.pop()
+        return None
+
+    def waves(self) -> List[List[Id]]:
+        """Groups nodes so that each depends only on nodes of earlier groups.
+
+        Raises `DependencyCycleError` if the graph is not acyclic.
+        """
+        remaining = {node: len(edges) for node, edges in self._dependencies.items()}
+        wave = [node for node, count in remaining.items() if not count]
+        waves: List[List[Id]] = []
+        visited = 0
+        while wave:
+            waves.append(wave)
+            visited += len(wave)
+            next_wave: List[Id] = []
+            for node in wave:
+                for dependent in self._dependents[node]:
+                    remaining[dependent] -= 1
+                    if not remaining[dependent]:
+                        next_wave.append(dependent)
+            wave = next_wave
+
+        if visited < len(self._dependencies):
+            raise DependencyCycleError(self.find_cycle() or [])
+        return waves
+
+    def topological_order(self) -> List[Id]:
+        """Orders nodes so that each comes after everything it depends upon."""
+        return [node for wave in self.waves() for node in wave]
+
+    def upstream(self, roots: Iterable[Id]) -> Set[Id]:
+        """`roots` and every node they depend upon, directly or not."""
+        return self._reachable(roots, self._dependencies)
+
+    def downstream(self, roots: Iterable[Id]) -> Set[Id]:
+        """`roots` and every node depending upon them, directly or not."""
+        return self._reachable(roots, self._dependents)
+
+    @staticmethod
+    def _reachable(roots: Iterable[Id], edges: Dict[Id, List[Id]]) -> Set[Id]:
+        reached: Set[Id] = set()
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            if node not in reached:
+                reached.add(node)
+                stack.extend(edges[node])
+        return reached
+
+    def transitive_reduction(self) -> Dict[Id, List[Id]]:
+        """Returns each node's dependencies less those it depends upon
+        indirectly anyway (i.e. via another of its dependencies).
+
+        Raises `DependencyCycleError` if the graph is not acyclic.
+        """
+        order = self.topological_order()
+        # Only positions are kept; a bit set per node of every node before
+        # it would hold O(N²) bits at once.
+        positions = {node: position for position, node in enumerate(order)}
+        # Each node's ancestors as a bit set (by topological position),
+        # kept only until every node depending upon it has been visited.
+        ancestors: Dict[Id, int] = {}
+        pending = {node: len(self._dependents[node]) for node in order}
+
+        reduced: Dict[Id, List[Id]] = {}
+        for node in order:
+            dependencies = self._dependencies[node]
+            indirect = 0
+            for dependency in dependencies:
+                indirect |= ancestors[dependency]
+            reduced[node] = [
+                dependency
+                for dependency in dependencies
+                if not indirect >> positions[dependency] & 1
+            ]
+
+            for dependency in dependencies:
+                indirect |= 1 << positions[dependency]
+                pending[dependency] -= 1
+                if not pending[dependency]:
+                    del ancestors[dependency]
+            if pending[node]:
+                ancestors[node] = indirect
+        return reduced
+
+    def strongly_connected_components(self) -> List[List[Id]]:
+        """Groups nodes that all (indirectly) depend upon one another.
+
+        Uses Tarjan's algorithm, without recursion so that long chains of
+        dependencies do not exhaust the stack.  Components are listed
+        with dependencies before their dependents.
+        """
+        counter = 0
+        indexes: Dict[Id, int] = {}
+        lowlinks: Dict[Id, int] = {}
+        stack: List[Id] = []
+        on_stack: Set[Id] = set()
+        components: List[List[Id]] = []
+
+        for root in self._dependencies:
+            if root in indexes:
+                continue
+            indexes[root] = lowlinks[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self._dependencies[root]))]
+            while work:
+                node, edges = work[-1]
+                for dependency in edges:
+                    if dependency not in indexes:
+                        indexes[dependency] = lowlinks[dependency] = counter
+                        counter += 1
+                        stack.append(dependency)
+                        on_stack.add(dependency)
+                        work.append((dependency, iter(self._dependencies[dependency])))
+                        break
+                    if dependency in on_stack:
+                        lowlinks[node] = min(lowlinks[node], indexes[dependency])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlinks[parent] = min(lowlinks[parent], lowlinks[node])
+                    if lowlinks[node] == indexes[node]:
+                        component: List[Id] = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+        return components
+
+    def cycles(self) -> List[List[Id]]:
+        """Returns each group of nodes that depend upon one another."""
+        return [
+            component
+            for component in self.strongly_connected_components()
+            if len(component) > 1 or component[0] in self._dependencies[component[0]]
+        ]
+
+    def earliest_starts(
+        self, weights: Mapping[Id, float]
+    ) -> Tuple[Dict[Id, float], Dict[Id, Optional[Id]]]:
+        """Returns, for each node, the total weight of the heaviest chain of
+        dependencies that must be finished before it, and the dependency
+        that chain ends with (if any).  Nodes absent from `weights` weigh
+        nothing.
+
+        Raises `DependencyCycleError` if the graph is not acyclic.
+        """
+        starts: Dict[Id, float] = {}
+        via: Dict[Id, Optional[Id]] = {}
+        for node in self.topological_order():
+            start = 0.0
+            latest: Optional[Id] = None
+            for dependency in self._dependencies[node]:
+                finish = starts[dependency] + weights.get(dependency, 0.0)
+                if latest is None or finish > start:
+                    start, latest = finish, dependency
+            starts[node] = start
+            via[node] = latest
+        return starts, via
+
+    def critical_path(self, weights: Mapping[Id, float]) -> Tuple[float, List[Id]]:
+        """Returns the heaviest chain of dependent nodes and its weight.
+
+        Raises `DependencyCycleError` if the graph is not acyclic.
+        """
+        if not self._dependencies:
+            return 0.0, []
+
+        starts, via = self.earliest_starts(weights)
+        last = max(starts, key=lambda node: starts[node] + weights.get(node, 0.0))
+        path: List[Id] = []
+        node: Optional[Id] = last
+        while node is not None:
+            path.append(node)
+            node = via[node]
+        path.reverse()
+        return starts[last] + weights.get(last, 0.0), path
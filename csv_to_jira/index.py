@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import logging
+from sys import intern
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from .links import LinkIndex
+from .metrics import span
+from .utils import chunked
+
+if TYPE_CHECKING:
+    from jira import JIRA, Issue
+
+
+logger = logging.getLogger(__name__)
+
+
+# Keep generated JQL well under the URL-length limits of common proxies.
+SEARCH_CHUNK_SIZE = 100
+
+
+class IssueIndex:
+    """In-memory index of Jira issues keyed by issue key.
+
+    Issues are loaded in bulk via `prefetch` using a handful of paged
+    `key in (...)` searches; `issue` then serves lookups from memory,
+    falling back to fetching the issue individually only for keys
+    that were never prefetched.
+
+    Only each issue's JSON is held; `jira.Issue` resources, which are
+    several times larger, are built when `issue` is called.
+    """
+
+    def __init__(self, jira: JIRA, fields: Optional[Iterable[str]] = None):
+        self._jira = jira
+        self._fields: Optional[List[str]] = sorted(fields) if fields else None
+        self._issues: Dict[str, Dict[str, Any]] = {}
+        self._missing: Set[str] = set()
+
+    @property
+    def fields(self) -> Optional[List[str]]:
+        """Fields requested for each issue; `None` requests all fields."""
+        return self._fields
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._issues
+
+    def __len__(self) -> int:
+        return len(self._issues)
+
+    def __iter__(self) -> Iterator[Issue]:
+        return (self._build(raw) for raw in self._issues.values())
+
+    def raw_issues(self) -> Iterator[Dict[str, Any]]:
+        """Yields the JSON of each indexed issue."""
+        return iter(self._issues.values())
+
+    def add(self, issue: Issue) -> None:
+        self.add_raw(issue.raw)
+
+    def add_raw(self, raw: Dict[str, Any]) -> None:
+        self._issues[raw["key"]] = raw
+        self._missing.discard(raw["key"])
+
+    def discard(self, keys: Iterable[str]) -> None:
+        """Forgets the issues having `keys`, so that they are fetched
+        again when next needed."""
+        for key in keys:
+            self._issues.pop(key, None)
+            self._missing.discard(key)
+
+    def prefetch(self, keys: Iterable[str], concurrency: int = 1) -> None:
+        """Load every not-yet-indexed issue among `keys`."""
+        with span("prefetch"):
+            self._prefetch(keys, concurrency)
+
+    def _prefetch(self, keys: Iterable[str], concurrency: int) -> None:
+        wanted = sorted(
+            {key for key in keys if key}
+            - self._issues.keys()
+            - self._missing
+        )
+        if not wanted:
+            return
+
+        from .client import JiraClient
+
+        if isinstance(self._jira, JiraClient):
+            for raw in self._jira.cached_raw(wanted, self._fields).values():
+                self.add_raw(raw)
+            wanted = [key for key in wanted if key not in self._issues]
+            if not wanted:
+                return
+
+        chunks = list(chunked(wanted, SEARCH_CHUNK_SIZE))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for raws in executor.map(self._search, chunks):
+                for raw in raws:
+                    self.add_raw(raw)
+                if isinstance(self._jira, JiraClient):
+                    self._jira.remember_raw(raws, self._fields)
+
+        self._missing.update(set(wanted) - self._issues.keys())
+        if self._missing:
+            logger.debug("Issues not found while prefetching: %s", self._missing)
+
+    def _search(self, keys: List[str]) -> List[Dict[str, Any]]:
+        quoted = ", ".join(f'"{key}"' for key in keys)
+        raws: List[Dict[str, Any]] = []
+        while True:
+            # Fetching JSON rather than `Issue` resources saves building
+            # (and holding) objects we would mostly never use.
+            page = self._jira.search_issues(
+                f"key in ({quoted})",
+                startAt=len(raws),
+                maxResults=len(keys),
+                fields=self._fields or "*all",
+                # Without this, a single deleted or inaccessible key
+                # would make Jira reject the whole query.
+                validate_query=False,
+                json_result=True,
+            )
+            raws.extend(page["issues"])
+            if not page["issues"] or len(raws) >= page["total"]:
+                return raws
+
+    def _build(self, raw: Dict[str, Any]) -> Issue:
+        from jira import Issue
+
+        return Issue(self._jira._options, self._jira._session, raw=raw)
+
+    def issue(self, key: str) -> Issue:
+        """Returns the issue having the given key.
+
+        Raises `JIRAError` if the issue was found not to exist while
+        prefetching, just as `JIRA.issue` would have.
+        """
+        if key in self._issues:
+            return self._build(self._issues[key])
+        if key in self._missing:
+            from jira import JIRAError
+
+            raise JIRAError(status_code=404, text=f"Issue {key} does not exist.")
+
+        issue = self._jira.issue(
+            key, fields=",".join(self._fields) if self._fields else None
+        )
+        self.add(issue)
+        return issue
+
+    def summary(self, key: str) -> str:
+        """Returns the summary of the issue having the given key."""
+        if key not in self._issues:
+            return self.issue(key).fields.summary
+        return self._issues[key].get("fields", {}).get("summary", "")
+
+
+class LinkedIssueIndex(IssueIndex):
+    """Index of the summaries of issues and of the links among them.
+
+    Rather than each issue's JSON, only its key and summary are kept;
+    its links are collected into `links` as it is indexed.
+    """
+
+    def __init__(self, jira: JIRA):
+        super().__init__(jira, fields=["summary", "issuelinks"])
+        self.links = LinkIndex()
+
+    def add_raw(self, raw: Dict[str, Any]) -> None:
+        self.links.add_issue(raw)
+        super().add_raw(
+            {
+                "key": intern(raw["key"]),
+                "fields": {"summary": raw.get("fields", {}).get("summary", "")},
+            }
+        )
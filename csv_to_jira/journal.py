@@ -0,0 +1,66 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional, TextIO, Tuple
+
+from .types import Id
+
+
+def get_journal_path(path: Path, instance_name: Optional[str] = None) -> Path:
+    suffix = f".{instance_name}.journal" if instance_name else ".journal"
+    return Path(os.path.dirname(path)) / Path(os.path.basename(path) + suffix)
+
+
+class Journal:
+    """Append-only record of which rows have been synced to which issue.
+
+    Each entry is flushed to disk before `record` returns so that, if a
+    run is interrupted, the next run can pick up where it left off
+    rather than creating the same issues again.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file: Optional[TextIO] = None
+
+    def load(self) -> Dict[Id, str]:
+        """Returns the issue key recorded for each row ID so far."""
+        keys: Dict[Id, str] = {}
+        if not os.path.isfile(self.path):
+            return keys
+
+        with open(self.path, "r") as inf:
+            for line in inf:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line may be incomplete if we crashed while
+                    # writing it; that row was not recorded.
+                    continue
+                keys[entry["id"]] = entry["key"]
+        return keys
+
+    def record(self, entries: Iterable[Tuple[Id, str]]) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a+")
+            # Start afresh after any incomplete last line, lest the first
+            # entry be read back as part of it.
+            if self._file.tell():
+                self._file.seek(self._file.tell() - 1)
+                if self._file.read(1) != "\n":
+                    self._file.write("\n")
+
+        for row_id, key in entries:
+            self._file.write(json.dumps({"id": row_id, "key": key}) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self) -> None:
+        self.close()
+        if os.path.isfile(self.path):
+            os.unlink(self.path)
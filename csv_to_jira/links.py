@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from sys import intern
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Set,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from jira import Issue
+
+
+class Link(NamedTuple):
+    """A link of the named type from the inward issue to the outward issue.
+
+    This mirrors the arguments to `JIRA.create_issue_link`.
+    """
+
+    type: str
+    inward: str
+    outward: str
+
+
+def get_links(issue: Union[Issue, Dict[str, Any]]) -> Iterator[Link]:
+    """Yields every link recorded in the issue's `issuelinks` field.
+
+    `issue` may be either an `Issue` or its JSON.  Jira lists each link
+    on both of its issues; the issue a link is listed on is absent from
+    that side of the link, so fill it in.
+    """
+    raw = issue if isinstance(issue, dict) else issue.raw
+    # Each key and link type recurs across many links; intern them so
+    # that large sets of links share a single copy of each.
+    key = intern(raw["key"])
+    for link in raw.get("fields", {}).get("issuelinks") or []:
+        if "outwardIssue" in link:
+            yield Link(
+                intern(link["type"]["name"]), key, intern(link["outwardIssue"]["key"])
+            )
+        elif "inwardIssue" in link:
+            yield Link(
+                intern(link["type"]["name"]), intern(link["inwardIssue"]["key"]), key
+            )
+
+
+class LinkIndex:
+    """Set of existing issue links, for reconciling links in bulk."""
+
+    def __init__(self, issues: Iterable[Union[Issue, Dict[str, Any]]] = ()):
+        self._links: Set[Link] = set()
+        for issue in issues:
+            self.add_issue(issue)
+
+    def __contains__(self, link: Link) -> bool:
+        return link in self._links
+
+    def __len__(self) -> int:
+        return len(self._links)
+
+    def add(self, link: Link) -> None:
+        self._links.add(link)
+
+    def add_issue(self, issue: Union[Issue, Dict[str, Any]]) -> None:
+        self._links.update(get_links(issue))
+
+    def missing(self, links: Iterable[Link]) -> List[Link]:
+        """Returns links among `links` that do not yet exist, in order."""
+        found: Set[Link] = set()
+        missing: List[Link] = []
+        for link in links:
+            if link in self._links or link in found:
+                continue
+            found.add(link)
+            missing.append(link)
+        return missing
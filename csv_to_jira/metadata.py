@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from difflib import get_close_matches
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from .exceptions import InvalidField, InvalidIssueType, InvalidProject
+
+if TYPE_CHECKING:
+    from jira import JIRA
+
+    from .cache import MetadataCache
+
+
+def _suggest(name: str, candidates: List[str]) -> str:
+    matches = get_close_matches(name, candidates, n=3)
+    return f"; did you mean {' or '.join(matches)}?" if matches else "."
+
+
+class Metadata:
+    """Definitions of a Jira instance's fields and projects' issue types.
+
+    Each is fetched at most once per run, and is read from `cache` (if
+    given) for as long as it stays fresh there, so that field and issue
+    type names can be resolved (and rows checked) without asking Jira.
+    """
+
+    def __init__(self, jira: JIRA, cache: Optional[MetadataCache] = None):
+        self._jira = jira
+        self._cache = cache
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str, fetch: Callable[[], Any]) -> Any:
+        with self._lock:
+            if name not in self._values:
+                value = self._cache.get(name) if self._cache is not None else None
+                if value is None:
+                    value = fetch()
+                    if self._cache is not None:
+                        self._cache.put(name, value)
+                self._values[name] = value
+            return self._values[name]
+
+    def fields(self) -> List[Dict[str, Any]]:
+        """Returns the definition of every field, as `JIRA.fields` would."""
+        return self._get("fields", lambda: self._jira._get_json("field"))
+
+    def find_field_id(self, name: str) -> Optional[str]:
+        """Returns the ID of the field having the given ID or name.
+
+        Names are matched regardless of case.  Returns `None` if there
+        is no such field, and raises `InvalidField` if several fields
+        share the name.
+        """
+        fields = self.fields()
+        for field in fields:
+            if field["id"] == name:
+                return name
+
+        folded = name.casefold()
+        matches = [
+            field["id"]
+            for field in fields
+            if field.get("name", "").casefold() == folded
+            or folded in (clause.casefold() for clause in field.get("clauseNames", []))
+        ]
+        if len(set(matches)) > 1:
+            raise InvalidField(
+                f"Several fields are named {name}; use one of their IDs "
+                f"instead: {', '.join(sorted(set(matches)))}."
+            )
+        return matches[0] if matches else None
+
+    def get_field_id(self, name: str) -> str:
+        """Returns the ID of the field having the given ID or name, or
+        raises `InvalidField` if there is none."""
+        field_id = self.find_field_id(name)
+        if field_id is None:
+            raise InvalidField(
+                f"There is no field named {name}"
+                + _suggest(name, [field.get("name", "") for field in self.fields()])
+            )
+        return field_id
+
+    def issue_types(self, project: str) -> List[Dict[str, Any]]:
+        """Returns the issue types available in the given project."""
+
+        def fetch() -> List[Dict[str, Any]]:
+            from jira import JIRAError
+
+            try:
+                raw = self._jira._get_json(f"project/{project}")
+            except JIRAError as e:
+                raise InvalidProject(f"Could not find project {project}: {e.text}")
+            return raw.get("issueTypes", [])
+
+        return self._get(f"project/{project}/issuetypes", fetch)
+
+    def find_issue_type(self, project: str, name: str) -> Optional[Dict[str, Any]]:
+        """Returns the project's issue type having the given name (in any
+        case) or ID, if any."""
+        folded = name.casefold()
+        for issue_type in self.issue_types(project):
+            if issue_type.get("name", "").casefold() == folded or issue_type.get(
+                "id"
+            ) == name:
+                return issue_type
+        return None
+
+    def get_issue_type(self, project: str, name: str) -> Dict[str, Any]:
+        issue_type = self.find_issue_type(project, name)
+        if issue_type is None:
+            names = [issue_type["name"] for issue_type in self.issue_types(project)]
+            raise InvalidIssueType(
+                f"Project {project} has no issue type named {name}"
+                + _suggest(name, names)
+            )
+        return issue_type
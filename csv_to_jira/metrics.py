@@ -0,0 +1,305 @@
+"""Timing and HTTP instrumentation.
+
+Work is timed in named spans, e.g.:
+
+    from csv_to_jira.metrics import span
+
+    with span("my_phase"):
+        ...
+
+and every request made to Jira through `BaseCommand.jira` or
+`BaseCommand.ajira` is counted per endpoint.  Run a command with
+`--profile` to print what was recorded, or `--metrics-out` to save it.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import json
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+
+
+T = TypeVar("T")
+
+# Upper bounds, in seconds, of the request latency histogram's buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = "csv_to_jira"
+
+# Path segments identifying a particular resource, which are collapsed
+# so that requests are counted per endpoint rather than per resource.
+ISSUE_KEY_SEGMENT = re.compile(r"^[A-Z][A-Z0-9_]*-\d+$")
+ID_SEGMENT = re.compile(r"^\d+$")
+
+
+def get_endpoint(url: str) -> str:
+    """Returns the REST endpoint `url` refers to, e.g. `api/2/issue/{key}`."""
+    path = urlparse(url).path
+    _, found, rest = path.partition("/rest/")
+    segments = (rest if found else path.lstrip("/")).rstrip("/").split("/")
+    # The first two segments name the API and its version, e.g. `api/2`.
+    return "/".join(
+        segments[:2]
+        + [
+            "{key}"
+            if ISSUE_KEY_SEGMENT.match(segment)
+            else "{id}"
+            if ID_SEGMENT.match(segment)
+            else segment
+            for segment in segments[2:]
+        ]
+    )
+
+
+@dataclass
+class SpanStats:
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def merge(self, other: SpanStats) -> None:
+        self.count += other.count
+        self.seconds += other.seconds
+        self.max_seconds = max(self.max_seconds, other.max_seconds)
+
+
+@dataclass
+class RequestStats:
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    retries: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def add(
+        self, status: Optional[int], seconds: float, sent: int, received: int
+    ) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.bytes_sent += sent
+        self.bytes_received += received
+        self.statuses["error" if status is None else str(status)] += 1
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def merge(self, other: RequestStats) -> None:
+        self.count += other.count
+        self.seconds += other.seconds
+        self.max_seconds = max(self.max_seconds, other.max_seconds)
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        self.retries += other.retries
+        self.statuses.update(other.statuses)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+
+class Metrics:
+    """Thread-safe store of span timings and per-endpoint request counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: Dict[str, SpanStats] = {}
+        self.requests: Dict[Tuple[str, str], RequestStats] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Metrics are sent back from worker processes; see `merge`.
+        with self._lock:
+            return {"spans": self.spans, "requests": self.requests}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__()
+        self.spans = state["spans"]
+        self.requests = state["requests"]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans.clear()
+            self.requests.clear()
+
+    def merge(self, other: Metrics) -> None:
+        """Adds what `other` recorded, e.g. in a worker process."""
+        with self._lock:
+            for name, span_stats in other.spans.items():
+                self.spans.setdefault(name, SpanStats()).merge(span_stats)
+            for endpoint, stats in other.requests.items():
+                self.requests.setdefault(endpoint, RequestStats()).merge(stats)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Times the enclosed block as one occurrence of the named span."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_span(name, time.perf_counter() - started)
+
+    def timed(self, iterable: Iterable[T], name: str) -> Iterator[T]:
+        """Yields from `iterable`, timing the production of each item."""
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.record_span(name, time.perf_counter() - started)
+            yield item
+
+    def record_span(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.spans.setdefault(name, SpanStats()).add(seconds)
+
+    def _request_stats(self, method: str, url: str) -> RequestStats:
+        return self.requests.setdefault(
+            (method.upper(), get_endpoint(url)), RequestStats()
+        )
+
+    def record_request(
+        self,
+        method: str,
+        url: str,
+        status: Optional[int],
+        seconds: float,
+        sent: int = 0,
+        received: int = 0,
+    ) -> None:
+        """Records one HTTP request; `status` is `None` if it failed to connect."""
+        with self._lock:
+            self._request_stats(method, url).add(status, seconds, sent, received)
+
+    def record_retry(self, method: str, url: str) -> None:
+        with self._lock:
+            self._request_stats(method, url).retries += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "spans": {
+                    name: {
+                        "count": stats.count,
+                        "seconds": stats.seconds,
+                        "max_seconds": stats.max_seconds,
+                    }
+                    for name, stats in self.spans.items()
+                },
+                "requests": [
+                    {
+                        "method": method,
+                        "endpoint": endpoint,
+                        "count": stats.count,
+                        "seconds": stats.seconds,
+                        "max_seconds": stats.max_seconds,
+                        "bytes_sent": stats.bytes_sent,
+                        "bytes_received": stats.bytes_received,
+                        "retries": stats.retries,
+                        "statuses": dict(stats.statuses),
+                        "latency_buckets": {
+                            str(bound): count
+                            for bound, count in zip(
+                                LATENCY_BUCKETS + (float("inf"),), stats.buckets
+                            )
+                        },
+                    }
+                    for (method, endpoint), stats in self.requests.items()
+                ],
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_openmetrics(self) -> str:
+        """Renders the metrics in the OpenMetrics text exposition format."""
+        lines: List[str] = []
+
+        def family(name: str, type: str, help: str) -> str:
+            full_name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {full_name} {type}")
+            lines.append(f"# HELP {full_name} {help}")
+            return full_name
+
+        def sample(name: str, labels: Dict[str, str], value: Any) -> None:
+            label_text = ",".join(
+                f'{key}="{_escape_label(label)}"' for key, label in labels.items()
+            )
+            lines.append(f"{name}{{{label_text}}} {value}")
+
+        with self._lock:
+            name = family("phase_seconds", "counter", "Time spent in each phase.")
+            for phase, span_stats in self.spans.items():
+                sample(f"{name}_total", {"phase": phase}, span_stats.seconds)
+            name = family("phase_calls", "counter", "Occurrences of each phase.")
+            for phase, span_stats in self.spans.items():
+                sample(f"{name}_total", {"phase": phase}, span_stats.count)
+
+            name = family("http_requests", "counter", "HTTP requests made to Jira.")
+            for (method, endpoint), stats in self.requests.items():
+                for status, count in stats.statuses.items():
+                    sample(
+                        f"{name}_total",
+                        {"method": method, "endpoint": endpoint, "status": status},
+                        count,
+                    )
+
+            name = family(
+                "http_request_duration_seconds",
+                "histogram",
+                "Latency of HTTP requests made to Jira.",
+            )
+            for (method, endpoint), stats in self.requests.items():
+                labels = {"method": method, "endpoint": endpoint}
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                    cumulative += count
+                    sample(f"{name}_bucket", {**labels, "le": str(bound)}, cumulative)
+                sample(f"{name}_bucket", {**labels, "le": "+Inf"}, stats.count)
+                sample(f"{name}_sum", labels, stats.seconds)
+                sample(f"{name}_count", labels, stats.count)
+
+            for metric, attribute, help in (
+                ("http_sent_bytes", "bytes_sent", "Request body bytes sent."),
+                ("http_received_bytes", "bytes_received", "Response bytes received."),
+                ("http_retries", "retries", "HTTP requests retried."),
+            ):
+                name = family(metric, "counter", help)
+                for (method, endpoint), stats in self.requests.items():
+                    sample(
+                        f"{name}_total",
+                        {"method": method, "endpoint": endpoint},
+                        getattr(stats, attribute),
+                    )
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Metrics for the running command.
+metrics = Metrics()
+
+
+def span(name: str):
+    """Times the enclosed block as one occurrence of the named span."""
+    return metrics.span(name)
+
+
+def timed(iterable: Iterable[T], name: str) -> Iterator[T]:
+    """Yields from `iterable`, timing the production of each item."""
+    return metrics.timed(iterable, name)
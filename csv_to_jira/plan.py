@@ -0,0 +1,108 @@
+from dataclasses import asdict, dataclass, field
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .exceptions import InvalidPlan
+from .types import Id
+
+
+PLAN_VERSION = 2
+
+# Issues not yet created are referred to by their row ID behind this
+# prefix wherever an issue key would otherwise go.
+ROW_REFERENCE_PREFIX = "row:"
+
+
+def get_row_reference(row_id: Id) -> str:
+    return ROW_REFERENCE_PREFIX + row_id
+
+
+def get_referenced_row(reference: str) -> Optional[Id]:
+    """Returns the row ID `reference` refers to, or `None` if it is a key."""
+    if reference.startswith(ROW_REFERENCE_PREFIX):
+        return reference[len(ROW_REFERENCE_PREFIX) :]
+    return None
+
+
+@dataclass
+class PlannedIssue:
+    """An issue to create (if `key` is `None`) or fields of one to update."""
+
+    id: Id
+    summary: str
+    key: Optional[str]
+    fields: Dict[str, Any]
+
+    @property
+    def action(self) -> str:
+        return "update" if self.key else "create"
+
+
+@dataclass
+class PlannedLink:
+    """A link to create; `inward` and `outward` are keys or row references."""
+
+    type: str
+    inward: str
+    outward: str
+
+
+@dataclass
+class Plan:
+    """Changes `create-issues` would make to bring Jira in line with sheets.
+
+    `sheets` maps the path of each sheet the plan was made from to the
+    digest of its contents, so that a plan is not applied to sheets that
+    have changed since.
+    """
+
+    sheets: Dict[str, str]
+    project: str
+    issues: List[PlannedIssue] = field(default_factory=list)
+    links: List[PlannedLink] = field(default_factory=list)
+    unchanged: int = 0
+    version: int = PLAN_VERSION
+
+    @property
+    def creates(self) -> List[PlannedIssue]:
+        return [issue for issue in self.issues if issue.key is None]
+
+    @property
+    def updates(self) -> List[PlannedIssue]:
+        return [issue for issue in self.issues if issue.key is not None]
+
+    def summary(self) -> str:
+        return (
+            f"Create {len(self.creates)}, update {len(self.updates)} and "
+            f"leave {self.unchanged} issues unchanged; "
+            f"create {len(self.links)} links."
+        )
+
+    def save(self, path: Path) -> None:
+        with open(path, "w") as outf:
+            json.dump(asdict(self), outf, indent=2)
+            outf.write("\n")
+
+    @classmethod
+    def load(cls, path: Path) -> "Plan":
+        try:
+            with open(path, "r") as inf:
+                data = json.load(inf)
+        except (OSError, ValueError) as e:
+            raise InvalidPlan(f"Could not read plan {path}: {e}")
+
+        if data.get("version") != PLAN_VERSION:
+            raise InvalidPlan(
+                f"Plan {path} was made by an incompatible version of csv-to-jira."
+            )
+        try:
+            return cls(
+                sheets=data["sheets"],
+                project=data["project"],
+                issues=[PlannedIssue(**issue) for issue in data["issues"]],
+                links=[PlannedLink(**link) for link in data["links"]],
+                unchanged=data.get("unchanged", 0),
+            )
+        except (KeyError, TypeError) as e:
+            raise InvalidPlan(f"Plan {path} is malformed: {e}")
@@ -2,62 +2,105 @@ from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
 import argparse
+from functools import lru_cache
+from importlib.metadata import EntryPoint, entry_points
 import logging
+from pathlib import Path
 from typing import (
+    TYPE_CHECKING,
+    Callable,
     Dict,
     Iterable,
+    Iterator,
+    List,
     Tuple,
     Optional,
+    Sequence,
     Type,
+    TypeVar,
+    Union,
     cast,
 )
+import warnings
 
-import pkg_resources
+from .constants import APP_NAME, STORY_POINTS_FIELD
+from .exceptions import ConfigurationError, UserError
+from .metrics import Metrics, metrics
+from .types import ConfigDict, Id, InstanceDefinition, IssueCsvRow, IssueDescriptor
+from . import config
 
-import keyring
-from jira import JIRA, Issue
-from rich.console import Console
-from urllib3 import disable_warnings
+# `jira`, `keyring` and `rich` are comparatively slow to import, and are
+# imported only once they are needed so that the command line starts
+# quickly.
+if TYPE_CHECKING:
+    from rich.console import Console
 
-from .constants import APP_NAME
-from .exceptions import ConfigurationError
-from .types import ConfigDict, InstanceDefinition, IssueCsvRow, IssueDescriptor
-from . import config
+    from .aio import AsyncJira
+    from .client import JiraClient
+    from .governor import RequestGovernor
+    from .sheet import RowBatch
+    from .transport import TransportSettings
 
 
 logger = logging.getLogger(__name__)
 
-
+COMMANDS_GROUP = "csv_to_jira.commands"
+READERS_GROUP = "csv_to_jira.readers"
+SOURCES_GROUP = "csv_to_jira.sources"
+
+PluginClass = TypeVar("PluginClass", bound=type)
+
+
+@lru_cache(maxsize=None)
+def get_entry_points(group: str) -> Dict[str, EntryPoint]:
+    """Returns the entry points registered in `group` by name, unloaded."""
+    return {entry_point.name: entry_point for entry_point in entry_points(group=group)}
+
+
+def load_entry_point(
+    entry_point: EntryPoint, base_class: PluginClass
+) -> Optional[PluginClass]:
+    try:
+        loaded_class = entry_point.load()
+    except ImportError:
+        logger.warning(
+            "Attempted to load entrypoint %s, but " "an ImportError occurred.",
+            entry_point,
+        )
+        return None
+    if not issubclass(loaded_class, base_class):
+        logger.warning(
+            "Loaded entrypoint %s, but loaded class is "
+            "not a subclass of `csv_to_jira.plugin.%s`.",
+            entry_point,
+            base_class.__name__,
+        )
+        return None
+    return loaded_class
+
+
+@lru_cache(maxsize=None)
 def get_installed_commands() -> Dict[str, Type[BaseCommand]]:
     possible_commands: Dict[str, Type[BaseCommand]] = {}
-    for entry_point in pkg_resources.iter_entry_points(group="csv_to_jira.commands"):
-        try:
-            loaded_class = entry_point.load()
-        except ImportError:
-            logger.warning(
-                "Attempted to load entrypoint %s, but " "an ImportError occurred.",
-                entry_point,
-            )
-            continue
-        if not issubclass(loaded_class, BaseCommand):
-            logger.warning(
-                "Loaded entrypoint %s, but loaded class is "
-                "not a subclass of `csv_to_jira.plugin.BaseCommand`.",
-                entry_point,
-            )
-            continue
-        possible_commands[entry_point.name] = loaded_class
+    for name, entry_point in get_entry_points(COMMANDS_GROUP).items():
+        loaded_class = load_entry_point(entry_point, BaseCommand)
+        if loaded_class is not None:
+            possible_commands[name] = loaded_class
 
     return possible_commands
 
 
 class BaseCommand(metaclass=ABCMeta):
-    _jira: Optional[JIRA] = None
+    _jira: Optional[JiraClient] = None
+    _ajira: Optional[AsyncJira] = None
+    _governor: Optional[RequestGovernor] = None
+    _transport: Optional[TransportSettings] = None
+
+    _console: Optional[Console] = None
 
     def __init__(self, config: ConfigDict, options: argparse.Namespace):
         self._config: ConfigDict = config
         self._options: argparse.Namespace = options
-        self._console = Console(highlight=False)
         super().__init__()
 
     @property
@@ -77,59 +120,199 @@ class BaseCommand(metaclass=ABCMeta):
     @property
     def console(self) -> Console:
         """Provides access to the console (see `rich.console.Console`."""
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console(highlight=False)
         return self._console
 
     @property
-    def jira(self) -> JIRA:
-        """Provides access to the configured Jira instance."""
-        if self._jira is None:
-            instance: Dict[InstanceDefinition] = cast(  # type: ignore
-                InstanceDefinition,
-                self.config.get("instances", {}).get(self.options.instance_name, {}),
+    def instance(self) -> InstanceDefinition:
+        """Provides the configuration of the selected Jira instance."""
+        return cast(
+            InstanceDefinition,
+            self.config.get("instances", {}).get(self.options.instance_name, {}),
+        )
+
+    def get_credentials(self) -> Tuple[str, str, str]:
+        """Returns the URL, username and password for the Jira instance."""
+        import keyring
+
+        instance = self.instance
+
+        instance_url = self.options.instance_url or instance.get("url")
+        if not instance_url:
+            raise ConfigurationError(
+                "instance_url not set; please run `jira-select configure`."
             )
 
-            instance_url = self.options.instance_url or instance.get("url")
-            if not instance_url:
-                raise ConfigurationError(
-                    "instance_url not set; please run `jira-select configure`."
-                )
+        username = self.options.username or instance.get("username")
+        if not username:
+            raise ConfigurationError(
+                "username not set; please run `jira-select configure`."
+            )
 
-            username = self.options.username or instance.get("username")
-            if not username:
+        password = self.options.password or instance.get("password")
+        if not password:
+            password = keyring.get_password(APP_NAME, instance_url + username)
+            if not password:
                 raise ConfigurationError(
-                    "username not set; please run `jira-select configure`."
+                    f"Password not stored for {instance_url} user {username}; "
+                    "use the 'store-password' command to store the password "
+                    "for this user account in your system keyring or use "
+                    "`jira-select configure`."
                 )
 
-            password = self.options.password or instance.get("password")
-            if not password:
-                password = keyring.get_password(APP_NAME, instance_url + username)
-                if not password:
-                    raise ConfigurationError(
-                        f"Password not stored for {instance_url} user {username}; "
-                        "use the 'store-password' command to store the password "
-                        "for this user account in your system keyring or use "
-                        "`jira-select configure`."
-                    )
-
-            verify = self.options.disable_certificate_verification or instance.get(
-                "verify"
+        return instance_url, username, password
+
+    def get_verify(self) -> Union[str, bool]:
+        """Returns whether (or using what) to verify the server certificate.
+
+        This is `False` if verification is disabled, the path to a CA
+        bundle (or certificate) if one is configured, or otherwise `True`.
+        """
+        from urllib3 import disable_warnings
+
+        verify: Union[str, bool]
+        if self.options.disable_certificate_verification:
+            verify = False
+        elif self.options.certificate:
+            verify = self.options.certificate
+        else:
+            verify = self.instance.get("verify", True)
+            if verify is True:
+                verify = self.instance.get("ca_bundle") or True
+        if verify is False:
+            disable_warnings()
+        return verify
+
+    @property
+    def transport(self) -> TransportSettings:
+        """Provides the connection settings of the selected Jira instance.
+
+        They are shared by `jira` and `ajira`.
+        """
+        if self._transport is None:
+            from .transport import (
+                DEFAULT_CONNECT_TIMEOUT,
+                DEFAULT_POOL_SIZE,
+                DEFAULT_READ_TIMEOUT,
+                TransportSettings,
+            )
+
+            instance = self.instance
+            # Leave room in the pool for every request a command may
+            # have in flight at once.
+            concurrency = getattr(self.options, "concurrency", None) or 0
+            self._transport = TransportSettings(
+                verify=self.get_verify(),
+                pool_size=instance.get(
+                    "pool_size", max(DEFAULT_POOL_SIZE, concurrency)
+                ),
+                connect_timeout=instance.get(
+                    "connect_timeout", DEFAULT_CONNECT_TIMEOUT
+                ),
+                read_timeout=instance.get("read_timeout", DEFAULT_READ_TIMEOUT),
+                gzip=instance.get("gzip", True),
+                proxies=dict(instance.get("proxies", {})),
             )
-            if verify is None:
-                verify = True
-            if verify is False:
-                disable_warnings()
 
-            self._jira = JIRA(
+        return self._transport
+
+    @property
+    def governor(self) -> RequestGovernor:
+        """Provides the governor pacing and retrying requests to Jira.
+
+        It is shared by `jira` and `ajira`, so that their requests
+        together stay within the instance's rate limit.
+        """
+        if self._governor is None:
+            from .governor import DEFAULT_RATE_LIMIT, RequestGovernor
+
+            rate_limit = self.options.rate_limit
+            if rate_limit is None:
+                rate_limit = self.instance.get("rate_limit", DEFAULT_RATE_LIMIT)
+
+            self._governor = RequestGovernor(
+                max_rate=rate_limit or None,
+                max_retries=self.instance.get("max_retries", 5),
+            )
+
+        return self._governor
+
+    @property
+    def jira(self) -> JiraClient:
+        """Provides access to the configured Jira instance."""
+        if self._jira is None:
+            from .cache import (
+                DEFAULT_METADATA_TTL,
+                DEFAULT_TTL,
+                IssueCache,
+                MetadataCache,
+            )
+            from .client import JiraClient
+
+            instance_url, username, password = self.get_credentials()
+
+            cache: Optional[IssueCache] = None
+            metadata_cache: Optional[MetadataCache] = None
+            if not self.options.no_cache:
+                cache_ttl = self.options.cache_ttl
+                if cache_ttl is None:
+                    cache_ttl = self.instance.get("cache_ttl", DEFAULT_TTL)
+                cache = IssueCache(
+                    instance_url, ttl=cache_ttl, refresh=self.options.refresh
+                )
+                metadata_cache = MetadataCache(
+                    instance_url,
+                    ttl=self.instance.get("metadata_ttl", DEFAULT_METADATA_TTL),
+                    refresh=self.options.refresh,
+                )
+
+            self._jira = JiraClient(
                 options={
                     "agile_rest_path": "agile",
                     "server": instance_url,
-                    "verify": verify,
                 },
                 basic_auth=(username, password),
+                cache=cache,
+                governor=self.governor,
+                transport=self.transport,
+                metadata_cache=metadata_cache,
             )
 
         return self._jira
 
+    @property
+    def story_points_field(self) -> str:
+        """Name (or ID) of the field in which issues' sizes are kept.
+
+        Resolve it to the field's ID using `jira.metadata`.
+        """
+        return self.instance.get("story_points_field", STORY_POINTS_FIELD)
+
+    @property
+    def ajira(self) -> AsyncJira:
+        """Provides asyncio-based access to the configured Jira instance.
+
+        Requires `aiohttp` (install `csv-to-jira[async]`).  Use it from
+        within a coroutine, e.g. `asyncio.run(self.handle_async())`, and
+        close it (or use it as an async context manager) when done.
+        """
+        if self._ajira is None:
+            from .aio import AsyncJira
+
+            instance_url, username, password = self.get_credentials()
+            self._ajira = AsyncJira(
+                instance_url,
+                basic_auth=(username, password),
+                concurrency=getattr(self.options, "concurrency", None),
+                governor=self.governor,
+                transport=self.transport,
+            )
+
+        return self._ajira
+
     @classmethod
     def get_help(cls) -> str:
         """Retuurns help text for this function."""
@@ -145,31 +328,127 @@ class BaseCommand(metaclass=ABCMeta):
         """This is where the work of your function starts."""
         ...
 
+    @property
+    def metrics(self) -> Metrics:
+        """Provides the run's metrics; see `csv_to_jira.metrics`.
+
+        Use `self.metrics.span("name")` to time a phase of your command.
+        """
+        return metrics
+
+    def report(self) -> None:
+        """Prints a summary of the run once the command has finished."""
+        if self._governor is not None:
+            summary = self._governor.summary()
+            if summary:
+                self.console.print(f"[yellow]{summary}[/yellow]")
+
+        if getattr(self.options, "profile", False):
+            self.print_metrics()
+
+        metrics_out = getattr(self.options, "metrics_out", None)
+        if metrics_out:
+            metrics_format = self.options.metrics_format or (
+                "json" if metrics_out.endswith(".json") else "openmetrics"
+            )
+            with open(metrics_out, "w") as outf:
+                if metrics_format == "json":
+                    outf.write(self.metrics.to_json())
+                else:
+                    outf.write(self.metrics.to_openmetrics())
+
+    def print_metrics(self) -> None:
+        from rich.table import Table
+
+        phases = Table(title="Phases")
+        phases.add_column("Phase")
+        for column in ("Count", "Total (s)", "Mean (ms)", "Max (ms)"):
+            phases.add_column(column, justify="right")
+        for name, span_stats in sorted(
+            self.metrics.spans.items(), key=lambda item: -item[1].seconds
+        ):
+            phases.add_row(
+                name,
+                str(span_stats.count),
+                f"{span_stats.seconds:.3f}",
+                f"{span_stats.seconds / span_stats.count * 1000:.1f}",
+                f"{span_stats.max_seconds * 1000:.1f}",
+            )
+        self.console.print(phases)
+
+        requests = Table(title="HTTP requests")
+        requests.add_column("Endpoint", no_wrap=True)
+        for column in (
+            "Count",
+            "Errors",
+            "Retries",
+            "Mean (ms)",
+            "Max (ms)",
+            "Sent (KiB)",
+            "Received (KiB)",
+        ):
+            requests.add_column(column, justify="right")
+        for (method, endpoint), stats in sorted(
+            self.metrics.requests.items(), key=lambda item: -item[1].seconds
+        ):
+            errors = sum(
+                count
+                for status, count in stats.statuses.items()
+                if status == "error" or int(status) >= 400
+            )
+            requests.add_row(
+                f"{method} {endpoint}",
+                str(stats.count),
+                str(errors),
+                str(stats.retries),
+                f"{stats.seconds / stats.count * 1000:.1f}",
+                f"{stats.max_seconds * 1000:.1f}",
+                f"{stats.bytes_sent / 1024:.1f}",
+                f"{stats.bytes_received / 1024:.1f}",
+            )
+        self.console.print(requests)
+
+
+def get_installed_reader_names() -> List[str]:
+    """Returns the names of installed readers without loading them."""
+    return list(get_entry_points(READERS_GROUP))
+
+
+@lru_cache(maxsize=None)
+def get_installed_reader(name: str) -> Type[BaseReader]:
+    entry_point = get_entry_points(READERS_GROUP).get(name)
+    loaded_class = (
+        load_entry_point(entry_point, BaseReader) if entry_point is not None else None
+    )
+    if loaded_class is None:
+        raise UserError(f"Reader {name} is not installed or could not be loaded.")
+    return loaded_class
+
 
 def get_installed_readers() -> Dict[str, Type[BaseReader]]:
     possible_readers: Dict[str, Type[BaseReader]] = {}
-    for entry_point in pkg_resources.iter_entry_points(group="csv_to_jira.readers"):
-        try:
-            loaded_class = entry_point.load()
-        except ImportError:
-            logger.warning(
-                "Attempted to load entrypoint %s, but " "an ImportError occurred.",
-                entry_point,
-            )
-            continue
-        if not issubclass(loaded_class, BaseReader):
-            logger.warning(
-                "Loaded entrypoint %s, but loaded class is "
-                "not a subclass of `csv_to_jira.plugin.BaseReader`.",
-                entry_point,
-            )
-            continue
-        possible_readers[entry_point.name] = loaded_class
+    for name, entry_point in get_entry_points(READERS_GROUP).items():
+        loaded_class = load_entry_point(entry_point, BaseReader)
+        if loaded_class is not None:
+            possible_readers[name] = loaded_class
 
     return possible_readers
 
 
 class BaseReader(metaclass=ABCMeta):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "get_dependencies" in cls.__dict__:
+            # Its links are no longer created; say so rather than
+            # refusing a reader that otherwise still works.
+            warnings.warn(
+                f"{cls.__module__}.{cls.__qualname__} implements "
+                "`get_dependencies`, which is ignored; implement "
+                "`get_dependency_names` (or `get_dependency_keys`) instead.",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+
     def __init__(self, config: ConfigDict, options: argparse.Namespace):
         self._config: ConfigDict = config
         self._options: argparse.Namespace = options
@@ -189,12 +468,109 @@ class BaseReader(metaclass=ABCMeta):
     def process_row(self, row: IssueCsvRow) -> IssueDescriptor:
         ...
 
+    def process_batch(self, batch: RowBatch) -> List[IssueDescriptor]:
+        """Processes a batch of rows at once.
+
+        Readers may override this to work through `batch.columns` a
+        column at a time, which is considerably faster for large sheets
+        than building a dictionary per row; by default each row is
+        processed using `process_row`.
+        """
+        return [self.process_row(row) for row in batch.rows()]
+
+    def rename_record(
+        self, record: IssueDescriptor, rename: Callable[[str], str]
+    ) -> None:
+        """Renames the record's ID, and the rows it depends upon, in place.
+
+        When several sheets are read at once, each sheet's row IDs are
+        prefixed by the sheet's name so that they remain distinct;
+        `rename` maps a row ID or dependency as written in the record's
+        sheet to its name among all of the sheets.  Readers whose
+        descriptors name the rows they depend upon must override this
+        to rename those, too.
+        """
+        record.id = rename(record.id)
+
     def get_dependency_names(
         self, row: IssueDescriptor
     ) -> Iterable[str]:
         return []
 
-    def get_dependencies(
-        self, jira: JIRA, row: IssueDescriptor, rows: Dict[str, Tuple[IssueDescriptor, Issue]]
-    ) -> Iterable[Issue]:
-        return []
+    def get_dependency_keys(
+        self, row: IssueDescriptor, keys: Dict[Id, str]
+    ) -> Iterable[str]:
+        """Jira issue keys of the issues this row depends upon.
+
+        `keys` maps the IDs of rows in the sheet to the keys of the
+        issues they have been synced to.
+        """
+        for name in self.get_dependency_names(row):
+            if name in keys:
+                yield keys[name]
+
+
+@lru_cache(maxsize=None)
+def get_installed_sources() -> Dict[str, Type[BaseSource]]:
+    possible_sources: Dict[str, Type[BaseSource]] = {}
+    for name, entry_point in get_entry_points(SOURCES_GROUP).items():
+        loaded_class = load_entry_point(entry_point, BaseSource)
+        if loaded_class is not None:
+            possible_sources[name] = loaded_class
+
+    return possible_sources
+
+
+def get_source(path: Path) -> BaseSource:
+    """Returns the source for sheets having `path`'s file extension.
+
+    Sheets whose extension no installed source claims are read as CSV.
+    """
+    sources = get_installed_sources()
+    extension = path.suffix.lower()
+    for source_class in sources.values():
+        if extension in source_class.extensions:
+            return source_class()
+    if "csv" not in sources:
+        raise UserError(f"No installed source can read {path}.")
+    return sources["csv"]()
+
+
+class BaseSource(metaclass=ABCMeta):
+    """A format in which sheets are kept, e.g. CSV.
+
+    Sources read a sheet's rows in batches of text cells, so that readers
+    need not know what format their sheet is in, and write the keys of
+    rows' issues back to it.
+    """
+
+    # File extensions (e.g. ".csv") of the sheets this source reads.
+    extensions: Sequence[str] = ()
+
+    @abstractmethod
+    def read(self, path: Path, size: int) -> Iterator[RowBatch]:
+        """Yields the sheet's rows, up to `size` at a time.
+
+        Each cell is read as the text a CSV would hold; empty cells, and
+        columns a row does not have, as empty strings.
+        """
+        ...
+
+    @abstractmethod
+    def write_keys(
+        self,
+        path: Path,
+        temporary_path: Path,
+        key_fields: Sequence[str],
+        get_keys: Callable[[RowBatch], List[Sequence[str]]],
+        size: int,
+    ) -> None:
+        """Writes the sheet, with its rows' issue keys, to `temporary_path`.
+
+        The sheet is read as `read` would, and `get_keys` is called with
+        each batch of rows; it returns each row's keys, one for each of
+        `key_fields`.  Key columns the sheet does not have are added,
+        and a row's existing key is kept where its new one is empty;
+        everything else is written as it was read.
+        """
+        ...
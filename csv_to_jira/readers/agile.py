@@ -1,19 +1,25 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
 import logging
-from typing import cast, Dict, List, Iterable, Optional, Tuple
-
-from jira import JIRA, Issue
+from sys import intern
+from typing import cast, TYPE_CHECKING, Callable, Dict, List, Iterable, Optional, Sequence
 
 from ..plugin import BaseReader
-from ..types import IssueCsvRow, IssueDescriptor
+from ..types import Id, IssueCsvRow, IssueDescriptor
 from ..constants import JIRA_ID_FIELD
 
+if TYPE_CHECKING:
+    from ..sheet import RowBatch
+
 
 logger = logging.getLogger(__name__)
 
 
 @dataclass
 class AgileIssueDescriptor(IssueDescriptor):
+    __slots__ = ("dependency_ids",)
+
     dependency_ids: List[str]
 
 
@@ -29,26 +35,91 @@ class Reader(BaseReader):
         if _size:
             size = float(_size)
 
+        issuetype = row.get('Issuetype')
         return AgileIssueDescriptor(
-            id=row["ID"],
+            id=intern(row["ID"]),
             summary=row["Summary"],
             size=size,
             description="\n\n---\n\n".join(description_fields),
             jira_id=cast(Optional[str], row.get(JIRA_ID_FIELD)),
-            dependency_ids=[x for x in (row.get("Depends") or "").split(",") if x],
-            labels=[x.strip() for x in row.get('Labels', '').split(' ') if x.strip()] if row.get('Labels') else [],
-            issuetype=row.get('Issuetype')
+            dependency_ids=[intern(x) for x in (row.get("Depends") or "").split(",") if x],
+            labels=[intern(x.strip()) for x in row.get('Labels', '').split(' ') if x.strip()] if row.get('Labels') else [],
+            issuetype=intern(issuetype) if issuetype else issuetype,
+        )
+
+    def process_batch(self, batch: RowBatch) -> List[AgileIssueDescriptor]:  # type: ignore[override]
+        # Equivalent to calling `process_row` for each row, but working a
+        # column at a time.
+        columns = batch.columns
+        blank: Sequence[str] = [""] * len(batch)
+        absent: Sequence[None] = [None] * len(batch)
+
+        description_columns = [
+            columns[field]
+            for field in ['Story', 'Description', 'Details', 'Notes']
+            if field in columns
+        ]
+        if len(description_columns) == 1:
+            # Joining a single non-empty part leaves it as it was.
+            descriptions: Sequence[str] = description_columns[0]
+        elif description_columns:
+            descriptions = [
+                "\n\n---\n\n".join(part for part in parts if part)
+                for parts in zip(*description_columns)
+            ]
+        else:
+            descriptions = blank
+
+        # Row IDs, labels and issue types repeat across (and, as
+        # dependencies, within) rows; interning them keeps a single copy
+        # of each in memory, as does sharing the few distinct sizes.
+        ids = list(map(intern, columns["ID"]))
+        size_column = columns.get('Size', blank)
+        parsed_sizes = {size: float(size) for size in set(size_column) if size}
+        sizes = [parsed_sizes.get(size) for size in size_column]
+        dependency_ids = [
+            [intern(x) for x in depends.split(",") if x] if depends else []
+            for depends in columns.get("Depends", blank)
+        ]
+        labels = [
+            [intern(x.strip()) for x in value.split(' ') if x.strip()] if value else []
+            for value in columns.get('Labels', blank)
+        ]
+        issuetypes = [
+            intern(value) if value else value
+            for value in columns.get('Issuetype', absent)
+        ]
+
+        # Positional arguments, in field order, are markedly faster to
+        # pass than keywords here.
+        return list(
+            map(
+                AgileIssueDescriptor,
+                ids,
+                columns["Summary"],
+                sizes,
+                descriptions,
+                labels,
+                issuetypes,
+                columns.get(JIRA_ID_FIELD, absent),
+                dependency_ids,
+            )
         )
 
+    def rename_record(self, record: AgileIssueDescriptor, rename: Callable[[str], str]) -> None:  # type: ignore[override]
+        record.id = rename(record.id)
+        record.dependency_ids = [rename(dep_name) for dep_name in record.dependency_ids]
+
     def get_dependency_names(self, row: AgileIssueDescriptor) -> Iterable[str]:  # type: ignore[override]
         return row.dependency_ids
 
-    def get_dependencies(self, jira: JIRA, row: AgileIssueDescriptor, rows: Dict[str, Tuple[IssueDescriptor, Issue]]) -> Iterable[Issue]:  # type: ignore[override]
+    def get_dependency_keys(self, row: AgileIssueDescriptor, keys: Dict[Id, str]) -> Iterable[str]:  # type: ignore[override]
+        # Rows of other sheets are named "<sheet>:<ID>", and sheet names
+        # may contain dashes, so look for a row before assuming a key.
         for dep_name in row.dependency_ids:
-            try:
-                if '-' in dep_name:
-                    yield jira.issue(dep_name)
-                else:
-                    yield rows[dep_name][1]
-            except Exception:
-                logger.exception("Could not find dependency matching '%s'", dep_name)
+            if dep_name in keys:
+                yield keys[dep_name]
+            elif '-' in dep_name:
+                yield dep_name
+            else:
+                logger.warning("Could not find dependency matching '%s'", dep_name)
@@ -0,0 +1,81 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Generic, Optional, Set, TypeVar
+
+from .graph import DependencyGraph
+from .types import Id
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class ScheduleResult(Generic[T]):
+    results: Dict[Id, T] = field(default_factory=dict)
+    errors: Dict[Id, BaseException] = field(default_factory=dict)
+    # Nodes not run because something they depend upon failed.
+    skipped: Set[Id] = field(default_factory=set)
+
+
+class Scheduler(Generic[T]):
+    """Runs a task for each node of a graph once its dependencies are done.
+
+    Up to `concurrency` tasks run at once; each node is started as soon
+    as every node it depends upon has completed, rather than waiting for
+    the whole of the previous "wave" of the graph.  `on_complete` is
+    called from the calling thread, and before any dependent's task
+    starts, so it may record results that dependents' tasks rely on.
+    """
+
+    def __init__(self, graph: DependencyGraph, concurrency: int = 1):
+        self.graph = graph
+        self.concurrency = concurrency
+
+    def run(
+        self,
+        task: Callable[[Id], T],
+        on_complete: Optional[Callable[[Id, T], None]] = None,
+    ) -> ScheduleResult[T]:
+        # Fail fast, and before doing any work, if there is a cycle.
+        self.graph.waves()
+
+        outcome: ScheduleResult[T] = ScheduleResult()
+        remaining = {
+            node: len(self.graph.dependencies(node)) for node in self.graph.nodes
+        }
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            running: Dict[Future, Id] = {
+                executor.submit(task, node): node
+                for node, count in remaining.items()
+                if not count
+            }
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        outcome.errors[node] = e
+                        self._skip_dependents(node, outcome.skipped)
+                        continue
+
+                    outcome.results[node] = result
+                    if on_complete is not None:
+                        on_complete(node, result)
+
+                    for dependent in self.graph.dependents(node):
+                        remaining[dependent] -= 1
+                        if not remaining[dependent] and dependent not in outcome.skipped:
+                            running[executor.submit(task, dependent)] = dependent
+
+        return outcome
+
+    def _skip_dependents(self, node: Id, skipped: Set[Id]) -> None:
+        pending = list(self.graph.dependents(node))
+        while pending:
+            dependent = pending.pop()
+            if dependent not in skipped:
+                skipped.add(dependent)
+                pending.extend(self.graph.dependents(dependent))
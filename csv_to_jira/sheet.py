@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import glob
+import os
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+    Type,
+)
+
+from .constants import JIRA_ID_FIELD, STREAM_WINDOW_SIZE
+from .exceptions import SheetChanged, UserError
+from .metrics import span, timed
+from .plugin import get_source
+from .types import ConfigDict, Id, IssueCsvRow, IssueDescriptor
+from .utils import chunked, get_file_digest, get_file_stamp
+
+if TYPE_CHECKING:
+    import argparse
+
+    from .plugin import BaseReader
+
+
+# The records parsed from each sheet, by the stamp (see `get_file_stamp`)
+# of the sheet when they were parsed.
+ParsedSheets = Dict[Path, Tuple[Tuple[int, int], List[IssueDescriptor]]]
+
+
+class RowBatch:
+    """A run of consecutive rows of a sheet, available by row or by column.
+
+    Rows are kept as the lists of cell values read from the sheet; the
+    per-row dictionaries `csv.DictReader` would produce are only built
+    if `rows` is called.
+    """
+
+    def __init__(self, fieldnames: Sequence[str], values: List[List[str]]):
+        self.fieldnames = list(fieldnames)
+        self.values = values
+        self._columns: Optional[Dict[str, Sequence[str]]] = None
+
+    @classmethod
+    def from_columns(
+        cls, fieldnames: Sequence[str], columns: Sequence[Sequence[str]]
+    ) -> RowBatch:
+        """Returns the batch of rows whose cells are given column by column."""
+        batch = cls(fieldnames, [list(row) for row in zip(*columns)])
+        batch._columns = dict(zip(batch.fieldnames, columns))
+        return batch
+
+    def renamed(self, names: Dict[str, str]) -> RowBatch:
+        """Returns the same rows, with the columns named in `names` renamed."""
+        fieldnames = [names.get(name, name) for name in self.fieldnames]
+        batch = RowBatch(fieldnames, self.values)
+        if self._columns is not None:
+            batch._columns = {
+                names.get(name, name): cells for name, cells in self._columns.items()
+            }
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def columns(self) -> Dict[str, Sequence[str]]:
+        """Each column's cells by field name; missing cells are empty."""
+        if self._columns is None:
+            width = len(self.fieldnames)
+            values = self.values
+            if any(len(row) != width for row in values):
+                values = [(row + [""] * width)[:width] for row in values]
+            cells = list(zip(*values)) if values else [()] * width
+            self._columns = dict(zip(self.fieldnames, cells))
+        return self._columns
+
+    def rows(self) -> List[IssueCsvRow]:
+        """The rows as `csv.DictReader` would read them."""
+        width = len(self.fieldnames)
+        rows: List[IssueCsvRow] = []
+        for values in self.values:
+            row = dict(zip(self.fieldnames, values))
+            if len(values) < width:
+                row.update((name, None) for name in self.fieldnames[len(values) :])
+            elif len(values) > width:
+                row[None] = values[width:]  # type: ignore
+            rows.append(row)  # type: ignore
+        return rows
+
+
+def get_key_field(instance_name: str) -> str:
+    """Returns the column holding the keys of a row's issue in the named
+    instance, when a sheet is synced to several."""
+    return f"{JIRA_ID_FIELD}:{instance_name}"
+
+
+class SheetReader:
+    """Reads a CSV in batches of rows."""
+
+    def __init__(self, inf: TextIO):
+        self._reader = csv.reader(inf)
+        self.fieldnames: List[str] = next(self._reader, [])
+
+    def batches(self, size: int) -> Iterator[RowBatch]:
+        # Like `csv.DictReader`, skip blank lines.
+        for values in chunked((row for row in self._reader if row), size):
+            yield RowBatch(self.fieldnames, values)
+
+
+class SheetWriter:
+    """Writes rows read by a `SheetReader` back out with their issue keys,
+    one for each of `key_fields`."""
+
+    def __init__(
+        self,
+        outf: TextIO,
+        fieldnames: Sequence[str],
+        key_fields: Sequence[str] = (JIRA_ID_FIELD,),
+    ):
+        self.fieldnames = list(fieldnames)
+        self._width = len(self.fieldnames)
+        for key_field in key_fields:
+            if key_field not in self.fieldnames:
+                self.fieldnames.append(key_field)
+        self._key_indexes = [self.fieldnames.index(field) for field in key_fields]
+
+        self._writer = csv.writer(outf)
+        self._writer.writerow(self.fieldnames)
+
+    def write_batch(self, batch: RowBatch, keys: Iterable[Sequence[str]]) -> None:
+        """Writes each row of `batch` with its keys; a row's existing key
+        is kept where its new one is empty."""
+        padding = [""] * len(self.fieldnames)
+        for values, row_keys in zip(batch.values, keys):
+            row = (values[: self._width] + padding)[: len(self.fieldnames)]
+            for index, key in zip(self._key_indexes, row_keys):
+                if key:
+                    row[index] = key
+            self._writer.writerow(row)
+
+
+def expand_paths(patterns: Iterable[str]) -> List[Path]:
+    """Returns the paths named by `patterns`, expanding any globs.
+
+    Raises `UserError` if a glob matches nothing.
+    """
+    paths: Dict[Path, None] = {}
+    for pattern in patterns:
+        if any(character in pattern for character in "*?["):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                raise UserError(f"No sheets match {pattern}.")
+            paths.update((Path(match), None) for match in matches)
+        else:
+            paths[Path(pattern)] = None
+    return list(paths)
+
+
+def get_temporary_path(path: Path) -> Path:
+    return Path(os.path.dirname(path)) / Path(os.path.basename(path) + ".tmp")
+
+
+def get_key_names(key_field: str) -> Dict[str, str]:
+    """Returns the renaming of columns by which a sheet's `key_field`
+    column is read as its `__jira_id__` column (and vice versa)."""
+    if key_field == JIRA_ID_FIELD:
+        return {}
+    return {key_field: JIRA_ID_FIELD, JIRA_ID_FIELD: key_field}
+
+
+def read_sheet(
+    path: Path, size: int = STREAM_WINDOW_SIZE, key_field: str = JIRA_ID_FIELD
+) -> Iterator[RowBatch]:
+    """Yields the rows of a sheet of any installed format, `size` at a
+    time, with its `key_field` column read as `__jira_id__`."""
+    names = get_key_names(key_field)
+    for batch in get_source(path).read(path, size):
+        yield batch.renamed(names) if names else batch
+
+
+def parse_sheet(
+    reader_class: Type[BaseReader],
+    config: ConfigDict,
+    options: argparse.Namespace,
+    path: Path,
+    key_field: str = JIRA_ID_FIELD,
+) -> List[IssueDescriptor]:
+    """Reads every row of a sheet; run in a worker process by `SheetSet`."""
+    issue_reader = reader_class(config, options)
+    records: List[IssueDescriptor] = []
+    for batch in read_sheet(path, STREAM_WINDOW_SIZE, key_field):
+        records.extend(issue_reader.process_batch(batch))
+    return records
+
+
+class SheetSet:
+    """One or more sheets read together as a single set of rows.
+
+    A single sheet is read from disk a batch at a time.  Several sheets
+    are parsed at once in a pool of processes and held in memory, and
+    share a single namespace of row IDs: each row's ID is prefixed by
+    the name of its sheet (e.g. `backend:12` for row `12` of
+    `backend.csv`), so that rows of different sheets may share IDs and
+    depend upon one another.  Within a sheet, rows still refer to one
+    another by their unprefixed IDs.
+
+    Sheets may be of any format for which a source is installed (see
+    `BaseSource`); rows' issue keys are read from the column `key_field`.
+
+    If given, `parsed` keeps the records of every sheet (even a single
+    one) in memory, and is updated as sheets are parsed; records found
+    in it are used for as long as their sheet is unchanged on disk, so
+    that only the sheets that have changed since are parsed again.
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[Path],
+        issue_reader: BaseReader,
+        key_field: str = JIRA_ID_FIELD,
+        parsed: Optional[ParsedSheets] = None,
+    ):
+        self.paths = list(paths)
+        self.issue_reader = issue_reader
+        self.key_field = key_field
+        self.sources = {path: get_source(path) for path in self.paths}
+        self.in_memory = len(self.paths) > 1 or parsed is not None
+        self.parsed: ParsedSheets = parsed if parsed is not None else {}
+        # Row IDs of all sheets, once read; only set for several sheets.
+        self.ids: Optional[Set[Id]] = None
+        self._records: Optional[Dict[Path, List[IssueDescriptor]]] = None
+        # The stamp of each sheet written by `write_keys`, as written.
+        self.written: Dict[Path, Tuple[int, int]] = {}
+
+        self.names: Dict[Path, str] = {}
+        for path in self.paths:
+            name = path.stem
+            if name in self.names.values():
+                raise UserError(
+                    f"More than one sheet is named {name}; sheets must have "
+                    "distinct file names."
+                )
+            self.names[path] = name
+        self._paths_by_name = {name: path for path, name in self.names.items()}
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def get_path(self, row_id: Id) -> Path:
+        """Returns the path of the sheet having the row `row_id`."""
+        if len(self.paths) == 1:
+            return self.paths[0]
+        return self._paths_by_name[row_id.split(":", 1)[0]]
+
+    def split(self, values: Dict[Id, str]) -> Dict[Path, Dict[Id, str]]:
+        """Splits `values`, by row ID, by the sheet each row is in."""
+        split: Dict[Path, Dict[Id, str]] = {path: {} for path in self.paths}
+        for row_id, value in values.items():
+            split[self.get_path(row_id)][row_id] = value
+        return split
+
+    def digests(self) -> Dict[str, str]:
+        return {str(path): get_file_digest(path) for path in self.paths}
+
+    def batches(
+        self, size: int = STREAM_WINDOW_SIZE
+    ) -> Iterator[Tuple[Path, RowBatch, List[IssueDescriptor]]]:
+        """Yields each sheet's path, rows and records, a batch at a time."""
+        if self.in_memory:
+            self.read_all()
+
+        for path in self.paths:
+            offset = 0
+            for batch in timed(read_sheet(path, size, self.key_field), "read_csv"):
+                records = self._process(path, batch, offset)
+                offset += len(batch)
+                yield path, batch, records
+
+    def _process(
+        self, path: Path, batch: RowBatch, offset: int
+    ) -> List[IssueDescriptor]:
+        """Returns the records of the rows of `batch`, found `offset` rows
+        into the sheet at `path`."""
+        if self._records is not None:
+            return self._records[path][offset : offset + len(batch)]
+        with span("process_row"):
+            return self.issue_reader.process_batch(batch)
+
+    def records(self) -> Iterator[IssueDescriptor]:
+        for _, _, records in self.batches():
+            yield from records
+
+    def read_all(self) -> None:
+        """Parses every sheet not already parsed, in parallel, and prefixes
+        their row IDs."""
+        if self._records is not None:
+            return
+
+        stamps = {path: get_file_stamp(path) for path in self.paths}
+        stale = [
+            path
+            for path in self.paths
+            if path not in self.parsed or self.parsed[path][0] != stamps[path]
+        ]
+        arguments = (
+            [type(self.issue_reader)] * len(stale),
+            [self.issue_reader.config] * len(stale),
+            [self.issue_reader.options] * len(stale),
+            stale,
+            [self.key_field] * len(stale),
+        )
+        workers = min(len(stale), os.cpu_count() or 1)
+        with span("process_row"):
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    parsed = list(executor.map(parse_sheet, *arguments))
+            else:
+                # Sending every record back from a single worker would
+                # only add to the time taken.
+                parsed = list(map(parse_sheet, *arguments))
+        for path, records in zip(stale, parsed):
+            self.parsed[path] = (stamps[path], records)
+        self._records = {path: self.parsed[path][1] for path in self.paths}
+        if len(self.paths) == 1:
+            return
+
+        # Records parsed for an earlier sync were renamed then.
+        ids = {
+            record.id
+            for path in self.paths
+            if path not in stale
+            for record in self._records[path]
+        }
+        ids.update(
+            f"{self.names[path]}:{record.id}"
+            for path in stale
+            for record in self._records[path]
+        )
+        for path in stale:
+            rename = self.get_renamer(self.names[path], ids)
+            for record in self._records[path]:
+                self.issue_reader.rename_record(record, rename)
+        self.ids = ids
+
+    @staticmethod
+    def get_renamer(name: str, ids: Set[Id]) -> Callable[[str], str]:
+        prefix = name + ":"
+
+        def rename(row_id: str) -> str:
+            # Anything not naming a row of this sheet is left alone: the
+            # key of a Jira issue, or the (prefixed) ID of another
+            # sheet's row.
+            prefixed = prefix + row_id
+            return prefixed if prefixed in ids else row_id
+
+        return rename
+
+    def write_keys(
+        self,
+        get_keys: Callable[[IssueDescriptor], Sequence[str]],
+        key_fields: Sequence[str] = (JIRA_ID_FIELD,),
+    ) -> None:
+        """Writes each row's issue keys (as returned by `get_keys`, one for
+        each of `key_fields`) back to its sheet.
+
+        Every sheet is written in full before any is replaced, so that
+        either all or none of them are.  Raises `SheetChanged`, leaving
+        every sheet as it is, if any is changed after it was read (or
+        while they are being written).
+        """
+        if self.in_memory:
+            self.read_all()
+
+        names = get_key_names(self.key_field)
+        stamps: Dict[Path, Tuple[int, int]] = {}
+        written: Dict[Path, Path] = {}
+        try:
+            for path in self.paths:
+                stamps[path] = get_file_stamp(path)
+                if path in self.parsed and self.parsed[path][0] != stamps[path]:
+                    raise SheetChanged(f"{path} changed while it was being synced.")
+                written[path] = get_temporary_path(path)
+                with span("write_csv"):
+                    self._write_keys(path, written[path], get_keys, key_fields, names)
+            for path, stamp in stamps.items():
+                if get_file_stamp(path) != stamp:
+                    raise SheetChanged(f"{path} changed while it was being synced.")
+        except BaseException:
+            for temporary_path in written.values():
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+            raise
+
+        for path, temporary_path in written.items():
+            # Renaming a file keeps its stamp.
+            self.written[path] = get_file_stamp(temporary_path)
+            os.replace(temporary_path, path)
+
+    def _write_keys(
+        self,
+        path: Path,
+        temporary_path: Path,
+        get_keys: Callable[[IssueDescriptor], Sequence[str]],
+        key_fields: Sequence[str],
+        names: Dict[str, str],
+    ) -> None:
+        offset = 0
+
+        def get_batch_keys(batch: RowBatch) -> List[Sequence[str]]:
+            nonlocal offset
+            records = self._process(
+                path, batch.renamed(names) if names else batch, offset
+            )
+            offset += len(batch)
+            return [get_keys(record) for record in records]
+
+        self.sources[path].write_keys(
+            path, temporary_path, key_fields, get_batch_keys, STREAM_WINDOW_SIZE
+        )
@@ -0,0 +1,22 @@
+from datetime import date, datetime, time
+import json
+from typing import Any
+
+
+def to_cell(value: Any) -> str:
+    """Returns the text a CSV would hold for a cell holding `value`."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    # Spreadsheets and Parquet files often hold row IDs (and sizes) as
+    # floating-point numbers; `12.0` should still be row `12`.
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return json.dumps(value, default=str)
@@ -0,0 +1,27 @@
+from pathlib import Path
+from typing import Callable, Iterator, List, Sequence
+
+from ..plugin import BaseSource
+from ..sheet import RowBatch, SheetReader, SheetWriter
+
+
+class Source(BaseSource):
+    extensions = (".csv",)
+
+    def read(self, path: Path, size: int) -> Iterator[RowBatch]:
+        with open(path, "r") as inf:
+            yield from SheetReader(inf).batches(size)
+
+    def write_keys(
+        self,
+        path: Path,
+        temporary_path: Path,
+        key_fields: Sequence[str],
+        get_keys: Callable[[RowBatch], List[Sequence[str]]],
+        size: int,
+    ) -> None:
+        with open(path, "r") as inf, open(temporary_path, "w") as outf:
+            sheet = SheetReader(inf)
+            writer = SheetWriter(outf, sheet.fieldnames, key_fields)
+            for batch in sheet.batches(size):
+                writer.write_batch(batch, get_keys(batch))
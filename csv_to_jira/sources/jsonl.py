@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Sequence, TextIO
+
+from ..exceptions import InvalidSheet
+from ..plugin import BaseSource
+from ..sheet import RowBatch
+from ..utils import chunked
+from . import to_cell
+
+
+class Source(BaseSource):
+    """Sheets of one JSON object per line, each object being a row.
+
+    Rows need not all have the same fields; each batch of rows has the
+    fields of any of its rows, in the order they are first found.
+    """
+
+    extensions = (".jsonl", ".ndjson")
+
+    def read(self, path: Path, size: int) -> Iterator[RowBatch]:
+        with open(path, "r") as inf:
+            for objects in chunked(self.get_objects(path, inf), size):
+                yield self.get_batch(objects)
+
+    def get_objects(self, path: Path, inf: TextIO) -> Iterator[Dict[str, Any]]:
+        for number, line in enumerate(inf, start=1):
+            # Like `csv.DictReader`, skip blank lines.
+            if not line.strip():
+                continue
+            try:
+                value = json.loads(line)
+            except ValueError as e:
+                raise InvalidSheet(f"Line {number} of {path} is not valid JSON: {e}")
+            if not isinstance(value, dict):
+                raise InvalidSheet(f"Line {number} of {path} is not a JSON object.")
+            yield value
+
+    def get_batch(self, objects: List[Dict[str, Any]]) -> RowBatch:
+        fieldnames: Dict[str, None] = {}
+        for value in objects:
+            fieldnames.update(dict.fromkeys(value))
+        return RowBatch(
+            list(fieldnames),
+            [[to_cell(value.get(name)) for name in fieldnames] for value in objects],
+        )
+
+    def write_keys(
+        self,
+        path: Path,
+        temporary_path: Path,
+        key_fields: Sequence[str],
+        get_keys: Callable[[RowBatch], List[Sequence[str]]],
+        size: int,
+    ) -> None:
+        with open(path, "r") as inf, open(temporary_path, "w") as outf:
+            for objects in chunked(self.get_objects(path, inf), size):
+                keys = get_keys(self.get_batch(objects))
+                for value, row_keys in zip(objects, keys):
+                    for field, key in zip(key_fields, row_keys):
+                        if key:
+                            value[field] = key
+                        else:
+                            value.setdefault(field, "")
+                    outf.write(json.dumps(value, ensure_ascii=False) + "\n")
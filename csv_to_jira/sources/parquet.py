@@ -0,0 +1,92 @@
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Sequence
+
+from ..exceptions import ConfigurationError
+from ..plugin import BaseSource
+from ..sheet import RowBatch
+from . import to_cell
+
+
+def import_pyarrow() -> Any:
+    """Imports pyarrow, only once a Parquet file is read: every source is
+    loaded to find which reads a sheet, and pyarrow is slow to import."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ConfigurationError(
+            "Reading Parquet files requires pyarrow; "
+            "please install csv-to-jira[parquet]."
+        )
+    return pyarrow
+
+
+class Source(BaseSource):
+    """Parquet files, read a record batch at a time from a memory map.
+
+    Requires `pyarrow`; install it with `pip install csv-to-jira[parquet]`.
+    """
+
+    extensions = (".parquet", ".pq")
+
+    def open(self, path: Path) -> Any:
+        return import_pyarrow().parquet.ParquetFile(path, memory_map=True)
+
+    def read(self, path: Path, size: int) -> Iterator[RowBatch]:
+        for record_batch in self.open(path).iter_batches(batch_size=size):
+            yield self.get_batch(record_batch)
+
+    def get_batch(self, record_batch: Any) -> RowBatch:
+        return RowBatch.from_columns(
+            record_batch.schema.names,
+            [self.get_cells(column) for column in record_batch.columns],
+        )
+
+    def get_cells(self, column: Any) -> List[str]:
+        pyarrow = import_pyarrow()
+        if pyarrow.types.is_string(column.type):
+            return [value or "" for value in column.to_pylist()]
+        return [to_cell(value) for value in column.to_pylist()]
+
+    def write_keys(
+        self,
+        path: Path,
+        temporary_path: Path,
+        key_fields: Sequence[str],
+        get_keys: Callable[[RowBatch], List[Sequence[str]]],
+        size: int,
+    ) -> None:
+        pyarrow = import_pyarrow()
+        parquet = self.open(path)
+        # Key columns are written as strings, whatever they were read as
+        # (e.g. as nulls, if no row had a key yet).
+        schema = parquet.schema_arrow
+        for field in key_fields:
+            index = schema.get_field_index(field)
+            if index == -1:
+                schema = schema.append(pyarrow.field(field, pyarrow.string()))
+            else:
+                schema = schema.set(index, pyarrow.field(field, pyarrow.string()))
+
+        with pyarrow.parquet.ParquetWriter(temporary_path, schema) as writer:
+            for record_batch in parquet.iter_batches(batch_size=size):
+                keys = get_keys(self.get_batch(record_batch))
+                columns = dict(zip(record_batch.schema.names, record_batch.columns))
+                for position, field in enumerate(key_fields):
+                    existing = (
+                        self.get_cells(columns[field])
+                        if field in columns
+                        else [""] * len(keys)
+                    )
+                    columns[field] = pyarrow.array(
+                        [
+                            row_keys[position] or cell or None
+                            for row_keys, cell in zip(keys, existing)
+                        ],
+                        type=pyarrow.string(),
+                    )
+                writer.write_batch(
+                    pyarrow.RecordBatch.from_arrays(
+                        [columns[name] for name in schema.names], schema=schema
+                    )
+                )
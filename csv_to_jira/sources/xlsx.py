@@ -0,0 +1,105 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from ..exceptions import ConfigurationError
+from ..plugin import BaseSource
+from ..sheet import RowBatch
+from ..utils import chunked
+from . import to_cell
+
+
+def import_openpyxl() -> Any:
+    """Imports openpyxl when a workbook is first opened, rather than
+    whenever the installed sources are looked up."""
+    try:
+        import openpyxl
+    except ImportError:
+        raise ConfigurationError(
+            "Reading Excel workbooks requires openpyxl; "
+            "please install csv-to-jira[xlsx]."
+        )
+    return openpyxl
+
+
+class Source(BaseSource):
+    """Excel workbooks, of which the active worksheet is the sheet.
+
+    The worksheet's first non-blank row names its columns.  Rows are
+    streamed from the workbook as they are read, but keys are written
+    back by loading the whole workbook, so that its formatting, its
+    formulas and its other worksheets are kept.
+
+    Requires `openpyxl`; install it with `pip install csv-to-jira[xlsx]`.
+    """
+
+    extensions = (".xlsx",)
+
+    def open(self, path: Path, **kwargs: Any) -> Any:
+        return import_openpyxl().load_workbook(path, **kwargs)
+
+    def get_rows(self, path: Path) -> Iterator[Tuple[int, List[str]]]:
+        """Yields the number and cells of each non-blank row, the first
+        being the header."""
+        workbook = self.open(path, read_only=True, data_only=True)
+        try:
+            for number, values in enumerate(
+                workbook.active.iter_rows(values_only=True), start=1
+            ):
+                cells = [to_cell(value) for value in values]
+                if any(cells):
+                    yield number, cells
+        finally:
+            workbook.close()
+
+    def get_fieldnames(self, header: List[str]) -> List[str]:
+        # Worksheets often report more columns than they have names for.
+        fieldnames = list(header)
+        while fieldnames and not fieldnames[-1]:
+            fieldnames.pop()
+        return fieldnames
+
+    def read(self, path: Path, size: int) -> Iterator[RowBatch]:
+        rows = self.get_rows(path)
+        header = next(rows, None)
+        if header is None:
+            return
+        fieldnames = self.get_fieldnames(header[1])
+        for chunk in chunked(rows, size):
+            yield RowBatch(
+                fieldnames, [cells[: len(fieldnames)] for _, cells in chunk]
+            )
+
+    def write_keys(
+        self,
+        path: Path,
+        temporary_path: Path,
+        key_fields: Sequence[str],
+        get_keys: Callable[[RowBatch], List[Sequence[str]]],
+        size: int,
+    ) -> None:
+        workbook = self.open(path)
+        worksheet = workbook.active
+
+        rows = self.get_rows(path)
+        header = next(rows, None)
+        if header is not None:
+            header_number, header_cells = header
+            fieldnames = self.get_fieldnames(header_cells)
+            width = len(fieldnames)
+            key_columns: Dict[str, int] = {}
+            for field in key_fields:
+                if field not in fieldnames:
+                    fieldnames.append(field)
+                    worksheet.cell(header_number, len(fieldnames), field)
+                key_columns[field] = fieldnames.index(field) + 1
+
+            for chunk in chunked(rows, size):
+                keys = get_keys(
+                    RowBatch(fieldnames[:width], [cells[:width] for _, cells in chunk])
+                )
+                for (number, _), row_keys in zip(chunk, keys):
+                    for field, key in zip(key_fields, row_keys):
+                        if key:
+                            worksheet.cell(number, key_columns[field], key)
+
+        workbook.save(temporary_path)
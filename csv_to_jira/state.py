@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .types import Id
+
+
+STATE_VERSION = 1
+
+
+def get_state_path(path: Path, instance_name: Optional[str] = None) -> Path:
+    suffix = f".{instance_name}.state" if instance_name else ".state"
+    return Path(os.path.dirname(path)) / Path(os.path.basename(path) + suffix)
+
+
+def get_row_digest(
+    key: str, fields: Dict[str, Any], dependencies: Iterable[str], relationship: str
+) -> str:
+    """Returns a digest of everything syncing a row would send to Jira.
+
+    Dependencies are digested by name rather than by issue key: a row
+    whose dependency gains (or changes) its issue is found by looking
+    downstream of the changed dependency instead.
+    """
+    document = json.dumps(
+        [key, fields, list(dependencies), relationship],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.blake2b(document.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SyncState:
+    """Digest of each row as of the last sync that completed for it.
+
+    A row whose digest has not changed since, and that depends upon no
+    row that has changed, is known to match its issue (and links) in
+    Jira already, so need not be synced again.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def load(self) -> Dict[Id, str]:
+        """Returns the digest recorded for each row ID, if any."""
+        if not os.path.isfile(self.path):
+            return {}
+
+        with open(self.path, "r") as inf:
+            try:
+                state = json.load(inf)
+            except ValueError:
+                return {}
+        if state.get("version") != STATE_VERSION:
+            return {}
+        return state["rows"]
+
+    def save(self, digests: Dict[Id, str]) -> None:
+        temporary_path = Path(str(self.path) + ".tmp")
+        with open(temporary_path, "w") as outf:
+            json.dump(
+                {"version": STATE_VERSION, "rows": digests},
+                outf,
+                separators=(",", ":"),
+            )
+        os.replace(temporary_path, self.path)
@@ -0,0 +1,48 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple, Union
+
+from requests.adapters import HTTPAdapter
+
+from .governor import GovernedAdapter, RequestGovernor
+
+
+# urllib3 keeps only 10 connections per host by default; requests made
+# by more threads than that at once each open (and then discard) a
+# connection of their own, paying for a fresh TLS handshake every time.
+DEFAULT_POOL_SIZE = 20
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 120.0
+
+
+@dataclass
+class TransportSettings:
+    """How to connect to a Jira instance; see `InstanceDefinition`."""
+
+    verify: Union[str, bool] = True
+    pool_size: int = DEFAULT_POOL_SIZE
+    connect_timeout: Optional[float] = DEFAULT_CONNECT_TIMEOUT
+    read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT
+    gzip: bool = True
+    proxies: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def timeout(self) -> Tuple[Optional[float], Optional[float]]:
+        return (self.connect_timeout, self.read_timeout)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        # Both `requests` and `aiohttp` ask for compressed responses
+        # unless told otherwise.
+        return {} if self.gzip else {"Accept-Encoding": "identity"}
+
+    def get_proxy(self, url: str) -> Optional[str]:
+        """Returns the proxy through which to connect to `url`, if any."""
+        return self.proxies.get(url.split(":", 1)[0])
+
+    def get_adapter(self, governor: Optional[RequestGovernor] = None) -> HTTPAdapter:
+        """Returns a transport adapter pooling up to `pool_size` connections
+        per host, and sending requests through `governor` if given."""
+        if governor is not None:
+            return GovernedAdapter(governor, pool_maxsize=self.pool_size)
+        return HTTPAdapter(pool_maxsize=self.pool_size)
@@ -19,6 +19,18 @@ class IssueCsvRow(TypedDict, total=False):
 
 @dataclass
 class IssueDescriptor:
+    # Sheets can run to hundreds of thousands of rows, all of which are
+    # held at once; slots keep each descriptor small.
+    __slots__ = (
+        "id",
+        "summary",
+        "size",
+        "description",
+        "labels",
+        "issuetype",
+        "jira_id",
+    )
+
     id: Id
     summary: str
     size: Optional[float]
@@ -33,6 +45,17 @@ class InstanceDefinition(TypedDict, total=False):
     username: str
     password: str
     verify: Union[str, bool]
+    cache_ttl: float
+    rate_limit: float
+    max_retries: int
+    pool_size: int
+    connect_timeout: float
+    read_timeout: float
+    gzip: bool
+    proxies: Dict[str, str]
+    ca_bundle: str
+    metadata_ttl: float
+    story_points_field: str
 
 
 class ConfigDict(TypedDict, total=False):
@@ -0,0 +1,42 @@
+import argparse
+import hashlib
+from itertools import islice
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple, TypeVar, Union
+
+
+T = TypeVar("T")
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yields successive lists of up to `size` items from `items`."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_file_digest(path: Union[str, Path]) -> str:
+    """Returns the SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as inf:
+        for block in iter(lambda: inf.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_file_stamp(path: Union[str, Path]) -> Tuple[int, int]:
+    """Returns a file's modification time and size, which change (for
+    all practical purposes) whenever its contents do."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def positive_int(arg: str) -> int:
+    value = int(arg)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"{arg} is not a positive integer")
+    return value
@@ -0,0 +1,28 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from benchmarks.fake_jira import FakeJira
+
+from .utils import write_sheet
+
+
+@pytest.fixture
+def fake_jira() -> Iterator[FakeJira]:
+    with FakeJira() as fake:
+        yield fake
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch) -> Path:
+    """Keeps configuration and caches in `tmp_path`."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return tmp_path
+
+
+@pytest.fixture
+def sheet(home) -> Path:
+    return write_sheet(home / "plan.csv")
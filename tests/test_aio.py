@@ -0,0 +1,72 @@
+import asyncio
+
+from jira import JIRAError
+import pytest
+
+from benchmarks.fake_jira import FakeJira
+from csv_to_jira.aio import AsyncJira
+from csv_to_jira.governor import RequestGovernor
+
+pytest.importorskip("aiohttp")
+
+
+def run(fake_jira, coroutine, **kwargs):
+    async def main():
+        async with AsyncJira(fake_jira.url, ("user", "password"), **kwargs) as jira:
+            return await coroutine(jira)
+
+    return asyncio.run(main())
+
+
+def test_create_update_and_fetch_issues(fake_jira):
+    async def sync(jira):
+        results = await jira.create_issues(
+            [
+                {"project": {"key": "PROJ"}, "summary": "First"},
+                {"project": {"key": "PROJ"}, "summary": "Second"},
+            ]
+        )
+        first, second = (result["issue"]["key"] for result in results)
+        await jira.update_issue(first, {"summary": "Renamed"})
+        await jira.create_issue_link("Blocks", first, second)
+        return await jira.issue(first, ["summary"])
+
+    issue = run(fake_jira, sync)
+
+    assert issue["fields"]["summary"] == "Renamed"
+    assert fake_jira.requests["POST issue/bulk"] == 1
+    assert fake_jira.requests["POST issueLink"] == 1
+
+
+def test_search_all_issues_fetches_every_page(fake_jira):
+    keys = fake_jira.seed_issues("PROJ", 250)
+
+    issues = run(
+        fake_jira,
+        lambda jira: jira.search_all_issues("project = PROJ", ["summary"], 100),
+    )
+
+    assert sorted(issue["key"] for issue in issues) == sorted(keys)
+    assert fake_jira.requests["POST search"] == 3
+
+
+def test_error_responses_raise(fake_jira):
+    with pytest.raises(JIRAError) as excinfo:
+        run(fake_jira, lambda jira: jira.issue("PROJ-404"))
+    assert excinfo.value.status_code == 404
+
+
+def test_throttled_requests_are_retried():
+    with FakeJira(throttle_rate=0.3) as fake_jira:
+        governor = RequestGovernor(max_rate=None, max_retries=20, backoff_base=0.01)
+        keys = fake_jira.seed_issues("PROJ", 20)
+
+        issues = run(
+            fake_jira,
+            lambda jira: asyncio.gather(*(jira.issue(key) for key in keys)),
+            governor=governor,
+            concurrency=5,
+        )
+
+    assert [issue["key"] for issue in issues] == keys
+    assert fake_jira.throttled
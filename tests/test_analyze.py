@@ -0,0 +1,61 @@
+import json
+
+from .utils import ROWS, create_issues, read_keys, run_command, write_sheet
+
+
+def analyze(monkeypatch, fake_jira, sheet, *args):
+    out_path = sheet.with_name("analysis.json")
+    run_command(
+        monkeypatch, fake_jira, "analyze", str(sheet), f"--json={out_path}", *args
+    )
+    return json.loads(out_path.read_text())
+
+
+def test_analyze(monkeypatch, fake_jira, sheet):
+    analysis = analyze(monkeypatch, fake_jira, sheet)
+
+    assert analysis["issues"] == 3
+    assert analysis["dependencies"] == 3
+    assert analysis["points"] == 4
+    assert analysis["cycles"] == []
+    assert analysis["levels"] == 3
+    # Row 2 has no size, so 1 → 3 and 1 → 2 → 3 are equally critical.
+    assert analysis["critical_path"]["points"] == 4
+    assert analysis["critical_path"]["ids"] in (["1", "3"], ["1", "2", "3"])
+    assert analysis["hotspots"]["fan_in"][0] == {
+        "id": "3",
+        "summary": "Third",
+        "fan_in": 2,
+    }
+    nodes = {node["id"]: node for node in analysis["nodes"]}
+    assert [nodes[id]["earliest_start"] for id in "123"] == [0, 3, 3]
+    assert nodes["1"]["critical"] and nodes["3"]["critical"]
+
+
+def test_analyze_reports_cycles(monkeypatch, fake_jira, home):
+    rows = [
+        {**ROWS[0], "Depends": "2"},
+        *ROWS[1:],
+    ]
+    analysis = analyze(monkeypatch, fake_jira, write_sheet(home / "plan.csv", rows))
+
+    assert [sorted(cycle) for cycle in analysis["cycles"]] == [["1", "2"]]
+    assert analysis["levels"] is None
+    assert analysis["critical_path"] is None
+
+
+def test_analyze_status_leaves_out_done_issues(monkeypatch, fake_jira, sheet):
+    create_issues(monkeypatch, fake_jira, sheet)
+    done = read_keys(sheet)["1"]
+    fake_jira.issues[done]["fields"]["status"] = {
+        "name": "Done",
+        "statusCategory": {"key": "done"},
+    }
+
+    analysis = analyze(monkeypatch, fake_jira, sheet, "--status")
+
+    assert analysis["points"] == 1
+    assert analysis["critical_path"]["points"] == 1
+    nodes = {node["id"]: node for node in analysis["nodes"]}
+    assert nodes["1"]["done"] and nodes["1"]["status"] == "Done"
+    assert not nodes["3"]["done"]
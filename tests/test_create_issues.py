@@ -0,0 +1,61 @@
+import json
+
+from csv_to_jira.journal import get_journal_path
+
+from .utils import create_issues, get_links, read_keys, run_command
+
+
+def test_sync_creates_issues_and_links(monkeypatch, fake_jira, sheet):
+    create_issues(monkeypatch, fake_jira, sheet)
+
+    keys = read_keys(sheet)
+    assert sorted(keys.values()) == ["PROJ-1", "PROJ-2", "PROJ-3"]
+    assert get_links(fake_jira) == {
+        ("Blocks", keys["1"], keys["2"]),
+        ("Blocks", keys["1"], keys["3"]),
+        ("Blocks", keys["2"], keys["3"]),
+    }
+    assert not get_journal_path(sheet).exists()
+
+    # Nothing has changed since, so nothing is sent to Jira.
+    create_issues(monkeypatch, fake_jira, sheet)
+    assert not any(
+        request.startswith(("POST", "PUT")) for request in fake_jira.requests
+    )
+    assert read_keys(sheet) == keys
+
+
+def test_sync_resumes_from_journal(monkeypatch, fake_jira, sheet):
+    (existing,) = fake_jira.seed_issues("PROJ", 1)
+    get_journal_path(sheet).write_text(json.dumps({"id": "1", "key": existing}) + "\n")
+
+    create_issues(monkeypatch, fake_jira, sheet)
+
+    keys = read_keys(sheet)
+    assert keys["1"] == existing
+    assert len({issue["key"] for issue in fake_jira.issues.values()}) == 3
+    assert ("Blocks", existing, keys["2"]) in get_links(fake_jira)
+    assert not get_journal_path(sheet).exists()
+
+
+def test_parallel_sync(monkeypatch, fake_jira, sheet):
+    run_command(
+        monkeypatch,
+        fake_jira,
+        "create-issues",
+        str(sheet),
+        "PROJ",
+        "--parallel",
+        "--concurrency",
+        "2",
+    )
+
+    keys = read_keys(sheet)
+    # Rows are created after those they depend upon.
+    assert [keys[row_id] for row_id in "123"] == ["PROJ-1", "PROJ-2", "PROJ-3"]
+    assert get_links(fake_jira) == {
+        ("Blocks", keys["1"], keys["2"]),
+        ("Blocks", keys["1"], keys["3"]),
+        ("Blocks", keys["2"], keys["3"]),
+    }
+    assert not get_journal_path(sheet).exists()
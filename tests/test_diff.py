@@ -0,0 +1,79 @@
+from jira import Issue
+import pytest
+
+from csv_to_jira.diff import get_changed_fields, values_match
+
+
+def make_issue(fields) -> Issue:
+    return Issue(
+        {"server": "http://jira.example.com"},
+        None,
+        raw={"key": "X-1", "fields": fields},
+    )
+
+
+@pytest.mark.parametrize(
+    "desired, current",
+    [
+        ("Summary", "Summary"),
+        ("", None),
+        (None, []),
+        ([], {}),
+        (3, 3.0),
+        ("3", 3.0),
+        (3.0, "3"),
+        ({"name": "Story"}, {"id": "1", "name": "Story", "subtask": False}),
+        ("Story", {"id": "1", "name": "Story"}),
+        ("High", {"value": "High"}),
+        (["b", "a"], ["a", "b"]),
+        ([{"name": "Story"}], [{"name": "Story", "id": "1"}]),
+    ],
+)
+def test_values_match(desired, current):
+    assert values_match(desired, current)
+
+
+@pytest.mark.parametrize(
+    "desired, current",
+    [
+        ("Summary", "Other"),
+        ("Summary", None),
+        (None, "Summary"),
+        (3, 4),
+        (3, "three"),
+        ({"name": "Story"}, {"name": "Task"}),
+        ({"name": "Story"}, "Story"),
+        ("Story", {"id": "1", "name": "Task"}),
+        (["a", "b"], ["a"]),
+        (["a", "a"], ["a", "b"]),
+        (["a"], "a"),
+    ],
+)
+def test_values_differ(desired, current):
+    assert not values_match(desired, current)
+
+
+def test_get_changed_fields():
+    issue = make_issue(
+        {
+            "summary": "Write tests",
+            "description": None,
+            "labels": ["backend", "tests"],
+            "issuetype": {"id": "1", "name": "Story"},
+            "customfield_10069": 3.0,
+        }
+    )
+    fields = {
+        "project": {"key": "OTHER"},
+        "summary": "Write more tests",
+        "description": "",
+        "labels": ["tests", "backend"],
+        "issuetype": {"name": "Story"},
+        "customfield_10069": 3,
+        "customfield_20000": "not fetched",
+    }
+
+    assert get_changed_fields(fields, issue) == {
+        "summary": "Write more tests",
+        "customfield_20000": "not fetched",
+    }
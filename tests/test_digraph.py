@@ -0,0 +1,86 @@
+import io
+import re
+from typing import Dict, Optional, Set, Tuple
+
+from csv_to_jira.dot import DotWriter, Html
+
+from .utils import ROWS, run_command, write_sheet
+
+ROW = {"ID": "4", "Summary": "Fourth", "Size": "", "Issuetype": "Task", "Depends": "3"}
+
+
+def test_dot_writer():
+    outf = io.StringIO()
+    with DotWriter(outf) as dot:
+        dot.node('say "hi"', label=Html("<B>1</B>"), height=2.5)
+        with dot.cluster("Stories"):
+            dot.node("a", shape="box")
+        dot.edge("a", 'say "hi"', arrowhead="normal")
+
+    assert outf.getvalue() == (
+        "digraph issues {\n"
+        '\t"say \\"hi\\""[label=<<B>1</B>>,height=2.5]\n'
+        "\tsubgraph cluster_1 {\n"
+        '\t\tlabel="Stories"\n'
+        '\t\t"a"[shape="box"]\n'
+        "\t}\n"
+        '\t"a" -> "say \\"hi\\""[arrowhead="normal"]\n'
+        "}\n"
+    )
+
+
+def digraph(
+    monkeypatch, fake_jira, home, *args
+) -> Tuple[Dict[str, Optional[str]], Set[Tuple[str, str]]]:
+    """Draws the sheet of `ROWS` and `ROW`, returning the cluster of each
+    row drawn and the dependencies drawn."""
+    sheet = write_sheet(home / "plan.csv", [*ROWS, ROW])
+    out_path = home / "plan.dot"
+    run_command(monkeypatch, fake_jira, "digraph", str(sheet), str(out_path), *args)
+
+    clusters: Dict[str, Optional[str]] = {}
+    edges = set()
+    cluster = None
+    for line in out_path.read_text().splitlines():
+        if match := re.match(r'\s*label="(.*)"$', line):
+            cluster = match.group(1)
+        elif line == "\t}":
+            cluster = None
+        elif match := re.match(r'\s*"id(\w+)" -> "id(\w+)"', line):
+            edges.add((match.group(1), match.group(2)))
+        elif match := re.match(r'\s*"id(\w+)"\[', line):
+            clusters[match.group(1)] = cluster
+    return clusters, edges
+
+
+def test_digraph(monkeypatch, fake_jira, home):
+    clusters, edges = digraph(monkeypatch, fake_jira, home)
+
+    assert sorted(clusters) == ["1", "2", "3", "4"]
+    assert edges == {("1", "2"), ("1", "3"), ("2", "3"), ("3", "4")}
+
+
+def test_digraph_reduce(monkeypatch, fake_jira, home):
+    _, edges = digraph(monkeypatch, fake_jira, home, "--reduce")
+
+    # 3 depends upon 1 through 2.
+    assert edges == {("1", "2"), ("2", "3"), ("3", "4")}
+
+
+def test_digraph_upstream_and_downstream(monkeypatch, fake_jira, home):
+    clusters, edges = digraph(monkeypatch, fake_jira, home, "--upstream", "2")
+    assert sorted(clusters) == ["1", "2"]
+    assert edges == {("1", "2")}
+
+    clusters, edges = digraph(monkeypatch, fake_jira, home, "--downstream", "3")
+    assert sorted(clusters) == ["3", "4"]
+    assert edges == {("3", "4")}
+
+
+def test_digraph_cluster(monkeypatch, fake_jira, home):
+    clusters, edges = digraph(
+        monkeypatch, fake_jira, home, "--cluster", "issuetype", "--upstream", "3"
+    )
+
+    assert clusters == {"1": "Story", "2": "Task", "3": "Story"}
+    assert edges == {("1", "2"), ("1", "3"), ("2", "3")}
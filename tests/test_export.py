@@ -0,0 +1,43 @@
+import csv
+
+from csv_to_jira.commands import export
+from csv_to_jira.sheet import get_temporary_path
+
+from .utils import create_issues, read_keys, run_command
+
+
+def test_export_round_trip(monkeypatch, fake_jira, sheet):
+    create_issues(monkeypatch, fake_jira, sheet)
+    keys = read_keys(sheet)
+
+    out_path = sheet.with_name("export.csv")
+    run_command(monkeypatch, fake_jira, "export", "project = PROJ", str(out_path))
+
+    with open(out_path, newline="") as inf:
+        rows = {row["ID"]: row for row in csv.DictReader(inf)}
+    assert sorted(rows) == sorted(keys.values())
+    third = rows[keys["3"]]
+    assert third["Summary"] == "Third"
+    assert third["__jira_id__"] == keys["3"]
+    assert set(third["Depends"].split(",")) == {keys["1"], keys["2"]}
+
+    # The export describes the issues as they are, so syncing it changes
+    # nothing.
+    create_issues(monkeypatch, fake_jira, out_path)
+    assert not any(
+        request.startswith(("POST", "PUT")) for request in fake_jira.requests
+    )
+
+
+def test_failed_export_leaves_no_file(monkeypatch, fake_jira, sheet):
+    create_issues(monkeypatch, fake_jira, sheet)
+
+    def get_row(self, raw):
+        raise RuntimeError("Lost the connection")
+
+    monkeypatch.setattr(export.Command, "get_row", get_row)
+    out_path = sheet.with_name("export.csv")
+    run_command(monkeypatch, fake_jira, "export", "project = PROJ", str(out_path))
+
+    assert not out_path.exists()
+    assert not get_temporary_path(out_path).exists()
@@ -0,0 +1,102 @@
+from email.utils import formatdate
+import time
+
+import pytest
+
+from benchmarks.fake_jira import FakeJira
+from csv_to_jira.client import JiraClient
+from csv_to_jira.governor import RequestGovernor, parse_retry_after
+
+
+@pytest.fixture
+def governor() -> RequestGovernor:
+    return RequestGovernor(max_rate=None, max_retries=2, backoff_base=0.0)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0.0
+    assert 8 <= parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+    assert parse_retry_after("soon") is None
+
+
+@pytest.mark.parametrize("method", ["GET", "POST", "PUT", "DELETE"])
+def test_successes_and_client_errors_are_not_retried(governor, method):
+    assert governor.observe(method, 200) is None
+    assert governor.observe(method, 400) is None
+    assert governor.observe(method, 500) is None
+
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+def test_throttled_requests_are_retried(governor, method):
+    assert governor.observe(method, 429) is not None
+    assert governor.observe(method, 503, "0") is not None
+
+
+@pytest.mark.parametrize("status", [None, 502, 503, 504])
+def test_idempotent_requests_are_retried_after_errors(governor, status):
+    assert governor.observe("GET", status) is not None
+    assert governor.observe("PUT", status) is not None
+
+
+@pytest.mark.parametrize("status", [None, 502, 503, 504])
+def test_creating_requests_are_not_retried_after_errors(governor, status):
+    # Jira may already have created what was asked for.
+    assert governor.observe("POST", status) is None
+    assert governor.stats["retries"] == 0
+
+
+def test_retry_after_is_honoured(governor):
+    assert governor.observe("POST", 429, "1.5") >= 1.5
+
+
+def test_retries_are_limited(governor):
+    assert governor.observe("GET", 429, attempt=1) is not None
+    assert governor.observe("GET", 429, attempt=2) is None
+    assert governor.stats["gave_up"] == 1
+    assert "gave up on 1" in governor.summary()
+
+
+def test_throttling_slows_requests_down():
+    governor = RequestGovernor(max_rate=20, min_rate=1, backoff_base=0.0)
+
+    governor.observe("GET", 429, "0")
+    assert governor.rate == 10
+    governor.observe("GET", 200)
+    assert governor.rate == 11
+
+
+def test_summary_is_empty_without_retries(governor):
+    governor.observe("GET", 200)
+    assert governor.summary() == ""
+
+
+def test_throttled_requests_to_jira_are_retried():
+    governor = RequestGovernor(
+        max_rate=1000, min_rate=500, max_retries=20, backoff_base=0.001
+    )
+    with FakeJira(throttle_rate=0.3, retry_after=0.0) as fake:
+        jira = JiraClient(
+            fake.url,
+            basic_auth=("user", "password"),
+            governor=governor,
+            get_server_info=False,
+        )
+        keys = [
+            jira.create_issue(
+                fields={
+                    "project": {"key": "TEST"},
+                    "summary": f"Issue {index}",
+                    "issuetype": {"name": "Story"},
+                },
+                prefetch=False,
+            ).key
+            for index in range(20)
+        ]
+
+    assert len(set(keys)) == 20
+    assert fake.throttled > 0
+    assert governor.stats["retries"] == fake.throttled
+    assert len({issue["key"] for issue in fake.issues.values()}) == 20
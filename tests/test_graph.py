@@ -0,0 +1,130 @@
+import random
+import tracemalloc
+
+import pytest
+
+from csv_to_jira.exceptions import DependencyCycleError
+from csv_to_jira.graph import DependencyGraph
+
+
+@pytest.fixture
+def diamond() -> DependencyGraph:
+    return DependencyGraph({"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"]})
+
+
+def test_waves(diamond):
+    assert diamond.waves() == [["a"], ["b", "c"], ["d"]]
+    assert diamond.topological_order() == ["a", "b", "c", "d"]
+
+
+def test_dependencies_upon_other_issues_are_not_edges():
+    graph = DependencyGraph({"a": ["EXT-1"], "b": ["a", "EXT-2", "a"]})
+
+    assert graph.dependencies("a") == []
+    assert graph.dependencies("b") == ["a"]
+    assert "EXT-1" not in graph
+    assert graph.waves() == [["a"], ["b"]]
+
+
+def test_upstream_and_downstream(diamond):
+    assert diamond.upstream(["b"]) == {"a", "b"}
+    assert diamond.downstream(["b"]) == {"b", "d"}
+    assert diamond.downstream(["a"]) == {"a", "b", "c", "d"}
+
+
+def test_waves_refuse_cycles():
+    graph = DependencyGraph({"a": ["c"], "b": ["a"], "c": ["b"], "d": []})
+
+    with pytest.raises(DependencyCycleError) as raised:
+        graph.waves()
+    cycle = raised.value.cycle
+    assert cycle[0] == cycle[-1]
+    assert set(cycle) == {"a", "b", "c"}
+
+
+def test_find_cycle_of_acyclic_graph(diamond):
+    assert diamond.find_cycle() is None
+
+
+def test_strongly_connected_components():
+    graph = DependencyGraph(
+        {"a": ["b"], "b": ["a"], "c": ["a"], "d": ["d"], "e": []}
+    )
+
+    components = [
+        sorted(component) for component in graph.strongly_connected_components()
+    ]
+    assert sorted(components) == [["a", "b"], ["c"], ["d"], ["e"]]
+    # Dependencies are listed before their dependents.
+    assert components.index(["a", "b"]) < components.index(["c"])
+    assert sorted(sorted(cycle) for cycle in graph.cycles()) == [["a", "b"], ["d"]]
+
+
+def test_strongly_connected_components_of_long_chains():
+    count = 20000
+    graph = DependencyGraph(
+        {str(index): [str(index - 1)] if index else [] for index in range(count)}
+    )
+
+    assert len(graph.strongly_connected_components()) == count
+    assert graph.cycles() == []
+
+
+def test_transitive_reduction():
+    graph = DependencyGraph(
+        {"a": [], "b": ["a"], "c": ["b", "a"], "d": ["c", "a", "b"], "e": ["a"]}
+    )
+
+    assert graph.transitive_reduction() == {
+        "a": [],
+        "b": ["a"],
+        "c": ["b"],
+        "d": ["c"],
+        "e": ["a"],
+    }
+
+
+def test_transitive_reduction_keeps_diamonds(diamond):
+    assert diamond.transitive_reduction() == {
+        "a": [],
+        "b": ["a"],
+        "c": ["a"],
+        "d": ["b", "c"],
+    }
+
+
+def test_transitive_reduction_memory_is_not_quadratic():
+    # 20,000 issues each depending upon a few of the 50 before them; a bit
+    # set per node of every node before it would hold about 25 MB.
+    rng = random.Random(0)
+    graph = DependencyGraph({
+        str(i): [str(i - rng.randint(1, 50)) for _ in range(rng.randint(0, 3))]
+        if i > 50 else []
+        for i in range(20000)
+    })
+
+    tracemalloc.start()
+    try:
+        graph.transitive_reduction()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < 10 * 2**20
+
+
+def test_critical_path(diamond):
+    weights = {"a": 1, "b": 5, "c": 2, "d": 1}
+
+    assert diamond.critical_path(weights) == (7, ["a", "b", "d"])
+    starts, via = diamond.earliest_starts(weights)
+    assert starts == {"a": 0, "b": 1, "c": 1, "d": 6}
+    assert via == {"a": None, "b": "a", "c": "a", "d": "b"}
+
+
+def test_critical_path_treats_missing_weights_as_nothing(diamond):
+    assert diamond.critical_path({"c": 3, "d": 1}) == (4, ["a", "c", "d"])
+
+
+def test_critical_path_of_empty_graph():
+    assert DependencyGraph({}).critical_path({}) == (0.0, [])
@@ -0,0 +1,80 @@
+import sys
+
+import pytest
+import yaml
+
+from benchmarks.fake_jira import FakeJira
+from csv_to_jira.cmdline import main
+from csv_to_jira.journal import get_journal_path
+
+from .utils import get_links, read_keys
+
+
+@pytest.fixture
+def instances():
+    with FakeJira() as staging, FakeJira() as production:
+        yield {"staging": staging, "production": production}
+
+
+def sync_instances(monkeypatch, sheet, instances, **settings):
+    """Syncs `sheet` to every instance; `settings` are added to the
+    configuration of the instance each is named for."""
+    config_path = sheet.with_name("config.yaml")
+    config = {
+        name: {"url": fake.url, "username": "user", "password": "password"}
+        for name, fake in instances.items()
+    }
+    for name, instance_settings in settings.items():
+        config[name].update(instance_settings)
+    config_path.write_text(yaml.safe_dump({"instances": config}))
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "csv-to-jira",
+            f"--config={config_path}",
+            "--rate-limit=0",
+            "--no-cache",
+            "create-issues",
+            str(sheet),
+            "PROJ",
+            "--bulk",
+            "--instances",
+            *instances,
+        ],
+    )
+    for fake in instances.values():
+        fake.requests.clear()
+    main()
+
+
+def test_instances_are_synced_at_once(monkeypatch, sheet, instances):
+    sync_instances(monkeypatch, sheet, instances)
+
+    for name, fake in instances.items():
+        keys = read_keys(sheet, f"__jira_id__:{name}")
+        assert sorted(keys.values()) == ["PROJ-1", "PROJ-2", "PROJ-3"]
+        assert ("Blocks", keys["1"], keys["3"]) in get_links(fake)
+        assert not get_journal_path(sheet, name).exists()
+    assert "__jira_id__," not in sheet.read_text()
+
+
+def test_failed_instances_are_synced_again(monkeypatch, capsys, sheet, instances):
+    # Rows have sizes, but the production instance has no such field.
+    sync_instances(
+        monkeypatch, sheet, instances, production={"story_points_field": "Effort"}
+    )
+
+    assert "production: Row 1 has a size" in capsys.readouterr().out
+    assert all(read_keys(sheet, "__jira_id__:staging").values())
+    assert "__jira_id__:production" not in sheet.read_text()
+
+    sync_instances(monkeypatch, sheet, instances)
+
+    assert all(read_keys(sheet, "__jira_id__:production").values())
+    # Staging was only checked, its rows having synced already.
+    assert instances["staging"].requests
+    assert not any(
+        request.startswith("POST") for request in instances["staging"].requests
+    )
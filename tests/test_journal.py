@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from csv_to_jira.journal import Journal, get_journal_path
+
+
+def test_get_journal_path():
+    assert get_journal_path(Path("sheets/plan.csv")) == Path(
+        "sheets/plan.csv.journal"
+    )
+    assert get_journal_path(Path("sheets/plan.csv"), "staging") == Path(
+        "sheets/plan.csv.staging.journal"
+    )
+
+
+def test_resume(tmp_path):
+    path = tmp_path / "plan.csv.journal"
+    journal = Journal(path)
+    assert journal.load() == {}
+
+    journal.record([("1", "PROJ-1"), ("2", "PROJ-2")])
+    journal.record([("3", "PROJ-3")])
+    journal.close()
+
+    assert Journal(path).load() == {"1": "PROJ-1", "2": "PROJ-2", "3": "PROJ-3"}
+
+
+def test_resume_after_truncated_entry(tmp_path):
+    path = tmp_path / "plan.csv.journal"
+    journal = Journal(path)
+    journal.record([("1", "PROJ-1"), ("2", "PROJ-2")])
+    journal.close()
+    # As if the run crashed while writing its last entry.
+    contents = path.read_text()
+    path.write_text(contents[: -len('"PROJ-2"}\n')])
+
+    assert Journal(path).load() == {"1": "PROJ-1"}
+
+    # Entries recorded when resuming are still read back.
+    journal = Journal(path)
+    journal.record([("2", "PROJ-5")])
+    journal.close()
+    assert Journal(path).load() == {"1": "PROJ-1", "2": "PROJ-5"}
+
+
+def test_remove(tmp_path):
+    path = tmp_path / "plan.csv.journal"
+    journal = Journal(path)
+    journal.record([("1", "PROJ-1")])
+    journal.remove()
+
+    assert not path.exists()
+    assert journal.load() == {}
+    journal.remove()
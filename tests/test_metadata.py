@@ -0,0 +1,102 @@
+from collections import Counter
+from typing import Any, Dict, List
+
+from jira import JIRAError
+import pytest
+
+from benchmarks import fake_jira as fake_jira_module
+from benchmarks.fake_jira import FIELDS, ISSUE_TYPES
+from csv_to_jira.cache import MetadataCache
+from csv_to_jira.exceptions import InvalidField, InvalidIssueType, InvalidProject
+from csv_to_jira.metadata import Metadata
+
+from .utils import ROWS, create_issues, write_sheet
+
+DUPLICATE_FIELD = {"id": "customfield_10100", "name": "Story Points"}
+
+
+class Jira:
+    """Answers the requests made for metadata, counting them."""
+
+    def __init__(self, fields: List[Dict[str, Any]] = FIELDS):
+        self.fields = fields
+        self.requests: Counter = Counter()
+
+    def _get_json(self, path: str) -> Any:
+        self.requests[path] += 1
+        if path == "field":
+            return self.fields
+        if path == "project/PROJ":
+            return {"key": "PROJ", "issueTypes": ISSUE_TYPES}
+        raise JIRAError(status_code=404, text="No project could be found")
+
+
+def test_fields_are_found_by_id_or_name():
+    metadata = Metadata(Jira())
+
+    assert metadata.find_field_id("customfield_10069") == "customfield_10069"
+    assert metadata.find_field_id("story points") == "customfield_10069"
+    assert metadata.find_field_id("Sprint") is None
+    with pytest.raises(InvalidField, match="did you mean Story Points"):
+        metadata.get_field_id("Story Point")
+
+
+def test_fields_sharing_a_name_are_ambiguous():
+    jira = Jira([*FIELDS, DUPLICATE_FIELD])
+
+    with pytest.raises(InvalidField, match="customfield_10069, customfield_10100"):
+        Metadata(jira).find_field_id("Story Points")
+
+
+def test_issue_types():
+    jira = Jira()
+    metadata = Metadata(jira)
+
+    assert metadata.find_issue_type("PROJ", "bug")["name"] == "Bug"
+    assert metadata.find_issue_type("PROJ", "2")["name"] == "Task"
+    assert metadata.find_issue_type("PROJ", "Feature") is None
+    with pytest.raises(InvalidIssueType, match="did you mean Story"):
+        metadata.get_issue_type("PROJ", "Storyy")
+    with pytest.raises(InvalidProject):
+        metadata.issue_types("NOPE")
+    assert jira.requests["project/PROJ"] == 1
+
+
+def test_metadata_is_cached(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    jira = Jira()
+    Metadata(jira, MetadataCache("https://jira", path)).fields()
+    Metadata(jira, MetadataCache("https://jira", path)).fields()
+    assert jira.requests["field"] == 1
+
+    Metadata(jira, MetadataCache("https://jira", path, refresh=True)).fields()
+    assert jira.requests["field"] == 2
+
+
+def test_rows_are_checked_before_anything_is_synced(
+    monkeypatch, capsys, fake_jira, home
+):
+    rows = [*ROWS, *({**ROWS[0], "ID": id, "Issuetype": "Feature"} for id in "45")]
+    create_issues(monkeypatch, fake_jira, write_sheet(home / "plan.csv", rows))
+
+    # The console wraps its output.
+    assert (
+        "no issue type named Feature (used by rows 4, 5)"
+        in " ".join(capsys.readouterr().out.split())
+    )
+    assert not fake_jira.issues
+
+
+def test_sizes_need_an_unambiguous_field(monkeypatch, capsys, fake_jira, home):
+    monkeypatch.setattr(fake_jira_module, "FIELDS", [*FIELDS, DUPLICATE_FIELD])
+    unsized = [{**row, "Size": ""} for row in ROWS]
+
+    create_issues(monkeypatch, fake_jira, write_sheet(home / "plan.csv", ROWS))
+    assert "Several fields are named Story Points" in " ".join(
+        capsys.readouterr().out.split()
+    )
+    assert not fake_jira.issues
+
+    # Rows without sizes need no such field.
+    create_issues(monkeypatch, fake_jira, write_sheet(home / "plan.csv", unsized))
+    assert len({issue["key"] for issue in fake_jira.issues.values()}) == 3
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from csv_to_jira.exceptions import InvalidPlan
+from csv_to_jira.plan import (
+    Plan,
+    PlannedIssue,
+    PlannedLink,
+    get_referenced_row,
+    get_row_reference,
+)
+
+from .utils import create_issues, get_links, read_keys
+
+
+def test_row_references():
+    assert get_referenced_row(get_row_reference("12")) == "12"
+    assert get_referenced_row(get_row_reference("backend:12")) == "backend:12"
+    assert get_referenced_row("PROJ-12") is None
+
+
+def test_round_trip(tmp_path):
+    plan = Plan(
+        sheets={"plan.csv": "abc123"},
+        project="PROJ",
+        issues=[
+            PlannedIssue("1", "Create me", None, {"summary": "Create me"}),
+            PlannedIssue("2", "Update me", "PROJ-2", {"labels": ["x"]}),
+        ],
+        links=[PlannedLink("Blocks", "row:1", "PROJ-2")],
+        unchanged=3,
+    )
+    path = tmp_path / "plan.json"
+    plan.save(path)
+
+    loaded = Plan.load(path)
+    assert loaded == plan
+    assert [issue.action for issue in loaded.issues] == ["create", "update"]
+    assert loaded.summary() == (
+        "Create 1, update 1 and leave 3 issues unchanged; create 1 links."
+    )
+
+
+def test_load_refuses_other_versions(tmp_path):
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps({"version": 1, "sheets": {}, "project": "PROJ"}))
+
+    with pytest.raises(InvalidPlan, match="incompatible version"):
+        Plan.load(path)
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        "{",
+        json.dumps({"version": 2, "sheets": {}}),
+        json.dumps(
+            {
+                "version": 2,
+                "sheets": {},
+                "project": "PROJ",
+                "issues": [{"id": "1"}],
+                "links": [],
+            }
+        ),
+    ],
+)
+def test_load_refuses_malformed_plans(tmp_path, contents):
+    path = tmp_path / "plan.json"
+    path.write_text(contents)
+
+    with pytest.raises(InvalidPlan):
+        Plan.load(path)
+
+
+def test_load_refuses_missing_plans(tmp_path):
+    with pytest.raises(InvalidPlan):
+        Plan.load(tmp_path / "missing.json")
+
+
+def test_plan_then_apply(monkeypatch, capsys, fake_jira, sheet):
+    plan_path = sheet.with_name("changes.json")
+    create_issues(monkeypatch, fake_jira, sheet, f"--plan={plan_path}")
+
+    # Planning changes nothing.
+    assert not fake_jira.issues
+    assert "__jira_id__" not in sheet.read_text()
+    plan = Plan.load(plan_path)
+    assert [issue.action for issue in plan.issues] == ["create"] * 3
+    assert len(plan.links) == 3
+
+    create_issues(monkeypatch, fake_jira, sheet, f"--apply={plan_path}")
+
+    keys = read_keys(sheet)
+    assert sorted(keys.values()) == ["PROJ-1", "PROJ-2", "PROJ-3"]
+    assert ("Blocks", keys["1"], keys["3"]) in get_links(fake_jira)
+
+    # The sheet has changed since (its keys were written), so the plan
+    # is refused rather than creating every issue again.
+    capsys.readouterr()
+    create_issues(monkeypatch, fake_jira, sheet, f"--apply={plan_path}")
+    # The console wraps its output.
+    assert "please make a new plan" in " ".join(capsys.readouterr().out.split())
+    assert not any(request.startswith("POST") for request in fake_jira.requests)
+
+
+def test_plans_update_changed_issues(monkeypatch, fake_jira, sheet):
+    create_issues(monkeypatch, fake_jira, sheet)
+    sheet.write_text(sheet.read_text().replace("Second", "Renamed"))
+
+    plan_path = sheet.with_name("changes.json")
+    create_issues(monkeypatch, fake_jira, sheet, f"--plan={plan_path}")
+    (update,) = Plan.load(plan_path).issues
+    assert update.action == "update"
+    assert update.fields == {"summary": "Renamed"}
+
+    create_issues(monkeypatch, fake_jira, sheet, "--yes")
+    assert fake_jira.issues[read_keys(sheet)["2"]]["fields"]["summary"] == "Renamed"
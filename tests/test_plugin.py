@@ -0,0 +1,14 @@
+import pytest
+
+from csv_to_jira.plugin import BaseReader
+
+
+def test_readers_implementing_get_dependencies_are_warned():
+    with pytest.warns(DeprecationWarning, match="get_dependencies"):
+
+        class Reader(BaseReader):
+            def get_dependencies(self, row):
+                return []
+
+    # The reader is still usable; only the old hook is ignored.
+    assert issubclass(Reader, BaseReader)
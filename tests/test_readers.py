@@ -0,0 +1,55 @@
+import argparse
+import csv
+
+import pytest
+
+from benchmarks.generate import generate_sheet
+from csv_to_jira.readers.agile import Reader
+from csv_to_jira.sheet import RowBatch
+
+
+@pytest.fixture
+def reader() -> Reader:
+    return Reader({}, argparse.Namespace())
+
+
+def assert_batch_matches_rows(reader, batch):
+    assert reader.process_batch(batch) == [
+        reader.process_row(row) for row in batch.rows()
+    ]
+
+
+def test_process_batch_matches_process_row_for_generated_sheets(reader, tmp_path):
+    path = tmp_path / "plan.csv"
+    generate_sheet(
+        str(path), 200, external_keys=5, external_rate=0.1, blank_size_rate=0.2
+    )
+    with open(path, newline="") as inf:
+        rows = list(csv.reader(inf))
+
+    assert_batch_matches_rows(reader, RowBatch(rows[0], rows[1:]))
+
+
+@pytest.mark.parametrize(
+    "fieldnames, values",
+    [
+        # Only the required columns.
+        (["ID", "Summary"], [["1", "First"], ["2", "Second"]]),
+        # Several description columns, some blank, and blank cells.
+        (
+            ["ID", "Summary", "Story", "Notes", "Size", "Labels", "Depends"],
+            [
+                ["1", "First", "As a user", "", "2.5", " a  b ", ""],
+                ["2", "Second", "", "Later", "", "", "1,,EXT-1"],
+                ["3", "Third", "", "", "3", "", "1,2"],
+            ],
+        ),
+        # Keys, and issue types left blank.
+        (
+            ["ID", "Summary", "Issuetype", "__jira_id__"],
+            [["1", "First", "", "PROJ-1"], ["2", "Second", "Bug", ""]],
+        ),
+    ],
+)
+def test_process_batch_matches_process_row(reader, fieldnames, values):
+    assert_batch_matches_rows(reader, RowBatch(fieldnames, values))
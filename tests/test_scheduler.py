@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+from csv_to_jira.exceptions import DependencyCycleError
+from csv_to_jira.graph import DependencyGraph
+from csv_to_jira.scheduler import Scheduler
+
+
+@pytest.fixture
+def diamond() -> DependencyGraph:
+    return DependencyGraph({"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"]})
+
+
+def test_nodes_run_once_their_dependencies_complete(diamond):
+    completed = []
+    # `b` and `c` only both get past the barrier if they run at once.
+    barrier = threading.Barrier(2, timeout=5)
+
+    def task(node):
+        assert all(dependency in completed for dependency in diamond.dependencies(node))
+        if node in ("b", "c"):
+            barrier.wait()
+        return node.upper()
+
+    result = Scheduler(diamond, concurrency=2).run(
+        task, on_complete=lambda node, _: completed.append(node)
+    )
+
+    assert result.results == {"a": "A", "b": "B", "c": "C", "d": "D"}
+    assert not result.errors and not result.skipped
+    assert completed[0] == "a" and completed[-1] == "d"
+
+
+def test_dependents_of_failed_nodes_are_skipped():
+    graph = DependencyGraph({"a": [], "b": ["a"], "c": ["b"], "d": []})
+
+    def task(node):
+        if node == "a":
+            raise RuntimeError("a failed")
+        return node
+
+    result = Scheduler(graph, concurrency=2).run(task)
+
+    assert result.results == {"d": "d"}
+    assert list(result.errors) == ["a"]
+    assert result.skipped == {"b", "c"}
+
+
+def test_cycles_are_refused_before_running_anything():
+    ran = []
+
+    with pytest.raises(DependencyCycleError):
+        Scheduler(DependencyGraph({"a": ["b"], "b": ["a"], "c": []})).run(ran.append)
+    assert not ran
@@ -0,0 +1,92 @@
+import argparse
+
+import pytest
+
+from csv_to_jira.exceptions import SheetChanged, UserError
+from csv_to_jira.readers.agile import Reader
+from csv_to_jira.sheet import SheetSet, get_temporary_path
+
+from .utils import ROWS, get_links, read_keys, run_command, write_sheet
+
+
+@pytest.fixture
+def sheets(home):
+    backend = write_sheet(home / "backend.csv")
+    # Rows refer to their own sheet's rows by ID, and to other sheets'
+    # rows by "<sheet>:<ID>".
+    frontend = write_sheet(
+        home / "frontend.csv",
+        [
+            {**ROWS[0], "Depends": "backend:3"},
+            {**ROWS[1], "Depends": "1"},
+        ],
+    )
+    return backend, frontend
+
+
+def get_sheet_set(sheets) -> SheetSet:
+    return SheetSet(sheets, Reader({}, argparse.Namespace()))
+
+
+def test_row_ids_are_prefixed_by_sheet(sheets):
+    backend, frontend = sheets
+    sheet_set = get_sheet_set(sheets)
+
+    dependencies = {
+        record.id: record.dependency_ids for record in sheet_set.records()
+    }
+    assert dependencies == {
+        "backend:1": [],
+        "backend:2": ["backend:1"],
+        "backend:3": ["backend:1", "backend:2"],
+        "frontend:1": ["backend:3"],
+        "frontend:2": ["frontend:1"],
+    }
+    assert sheet_set.get_path("frontend:2") == frontend
+    assert sheet_set.split({"backend:1": "a", "frontend:1": "b"}) == {
+        backend: {"backend:1": "a"},
+        frontend: {"frontend:1": "b"},
+    }
+
+
+def test_sheets_must_have_distinct_names(home):
+    (home / "a").mkdir()
+    (home / "b").mkdir()
+    paths = [write_sheet(home / name / "plan.csv") for name in ("a", "b")]
+
+    with pytest.raises(UserError, match="More than one sheet"):
+        get_sheet_set(paths)
+
+
+def test_sheets_are_synced_as_one(monkeypatch, fake_jira, sheets):
+    backend, frontend = sheets
+    run_command(
+        monkeypatch,
+        fake_jira,
+        "create-issues",
+        str(backend),
+        str(frontend),
+        "PROJ",
+        "--bulk",
+    )
+
+    backend_keys, frontend_keys = read_keys(backend), read_keys(frontend)
+    assert len({*backend_keys.values(), *frontend_keys.values()}) == 5
+    links = get_links(fake_jira)
+    assert ("Blocks", backend_keys["3"], frontend_keys["1"]) in links
+    assert ("Blocks", frontend_keys["1"], frontend_keys["2"]) in links
+
+
+def test_keys_are_written_to_all_sheets_or_none(sheets):
+    backend, frontend = sheets
+    sheet_set = get_sheet_set(sheets)
+    sheet_set.read_all()
+    # Saved after it was read, but before the keys were written back.
+    frontend.write_text(frontend.read_text() + "3,Third,,Task,\n")
+    contents = {path: path.read_text() for path in sheets}
+
+    with pytest.raises(SheetChanged):
+        sheet_set.write_keys(lambda record: ["PROJ-1"])
+
+    assert {path: path.read_text() for path in sheets} == contents
+    assert not any(get_temporary_path(path).exists() for path in sheets)
@@ -0,0 +1,91 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from csv_to_jira.plugin import get_source
+
+from .utils import ROWS, create_issues, get_links, write_sheet
+
+
+def read_keys(path: Path) -> Dict[str, str]:
+    return {
+        row["ID"]: row.get("__jira_id__") or ""
+        for batch in get_source(path).read(path, 2)
+        for row in batch.rows()
+    }
+
+
+def sync(monkeypatch, fake_jira, path: Path) -> None:
+    create_issues(monkeypatch, fake_jira, path)
+
+    keys = read_keys(path)
+    assert sorted(keys.values()) == ["PROJ-1", "PROJ-2", "PROJ-3"]
+    assert ("Blocks", keys["1"], keys["3"]) in get_links(fake_jira)
+
+
+def test_jsonl_keys_are_written_back(monkeypatch, fake_jira, home):
+    path = home / "plan.jsonl"
+    # Objects needn't all have the same fields, nor string values.
+    path.write_text(
+        "".join(
+            json.dumps({**row, "ID": int(row["ID"])} if row["Depends"] else row)
+            + "\n"
+            for row in ROWS
+        )
+    )
+
+    sync(monkeypatch, fake_jira, path)
+    assert [json.loads(line)["ID"] for line in path.read_text().splitlines()] == [
+        "1",
+        2,
+        3,
+    ]
+
+
+def test_parquet_keys_are_written_back(monkeypatch, fake_jira, home):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+
+    path = home / "plan.parquet"
+    pyarrow.parquet.write_table(pyarrow.Table.from_pylist(ROWS), path)
+
+    sync(monkeypatch, fake_jira, path)
+    assert pyarrow.parquet.read_schema(path).field("__jira_id__").type == "string"
+
+
+def test_xlsx_keys_are_written_back(monkeypatch, fake_jira, home):
+    openpyxl = pytest.importorskip("openpyxl")
+
+    path = home / "plan.xlsx"
+    workbook = openpyxl.Workbook()
+    workbook.active.append(list(ROWS[0]))
+    for row in ROWS:
+        workbook.active.append(list(row.values()))
+    workbook.create_sheet("Notes")["A1"] = "Kept"
+    workbook.save(path)
+
+    sync(monkeypatch, fake_jira, path)
+    assert openpyxl.load_workbook(path)["Notes"]["A1"].value == "Kept"
+
+
+def test_csv_sheets_do_not_import_other_formats_libraries(home):
+    argv = ["csv-to-jira", "digraph", str(write_sheet(home / "plan.csv")), "out.dot"]
+    code = (
+        "import sys\n"
+        "from csv_to_jira.cmdline import main\n"
+        f"sys.argv = {argv!r}\n"
+        "main()\n"
+        "print(sorted({'pyarrow', 'openpyxl'} & set(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=home,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.splitlines()[-1] == "[]"
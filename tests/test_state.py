@@ -0,0 +1,46 @@
+from pathlib import Path
+
+from csv_to_jira.state import SyncState, get_row_digest, get_state_path
+
+
+def test_get_state_path():
+    assert get_state_path(Path("sheets/plan.csv")) == Path("sheets/plan.csv.state")
+    assert get_state_path(Path("sheets/plan.csv"), "staging") == Path(
+        "sheets/plan.csv.staging.state"
+    )
+
+
+def test_row_digest_covers_what_is_synced():
+    fields = {"summary": "A", "labels": ["x"]}
+    digest = get_row_digest("PROJ-1", fields, ["2"], "Blocks")
+
+    assert digest == get_row_digest(
+        "PROJ-1", {"labels": ["x"], "summary": "A"}, iter(["2"]), "Blocks"
+    )
+    assert digest != get_row_digest("PROJ-2", fields, ["2"], "Blocks")
+    assert digest != get_row_digest(
+        "PROJ-1", {**fields, "summary": "B"}, ["2"], "Blocks"
+    )
+    assert digest != get_row_digest("PROJ-1", fields, ["3"], "Blocks")
+    assert digest != get_row_digest("PROJ-1", fields, ["2"], "Relates")
+
+
+def test_round_trip(tmp_path):
+    state = SyncState(tmp_path / "plan.csv.state")
+    assert state.load() == {}
+
+    state.save({"1": "aaa", "2": "bbb"})
+    assert SyncState(state.path).load() == {"1": "aaa", "2": "bbb"}
+    assert not (tmp_path / "plan.csv.state.tmp").exists()
+
+    state.save({"1": "ccc"})
+    assert state.load() == {"1": "ccc"}
+
+
+def test_unreadable_state_is_ignored(tmp_path):
+    path = tmp_path / "plan.csv.state"
+    path.write_text('{"version": 1, "rows": {"1": ')
+    assert SyncState(path).load() == {}
+
+    path.write_text('{"version": 0, "rows": {"1": "aaa"}}')
+    assert SyncState(path).load() == {}
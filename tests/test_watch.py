@@ -0,0 +1,77 @@
+import csv
+import time
+from typing import List
+
+from csv_to_jira.commands import watch
+from csv_to_jira.commands.create_issues import Command as CreateIssuesCommand
+
+from .utils import ROWS, read_keys, run_command, write_sheet
+
+ROW = {"ID": "4", "Summary": "Fourth", "Size": "", "Issuetype": "Task", "Depends": ""}
+
+
+class Clock:
+    """Stands in for the `time` module of `watch`, and stops watching
+    after `sleeps` sleeps."""
+
+    strftime = staticmethod(time.strftime)
+
+    def __init__(self, sleeps: int):
+        self.now = 0.0
+        self.sleeps = sleeps
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        if not self.sleeps:
+            raise KeyboardInterrupt
+        self.sleeps -= 1
+        self.now += seconds
+
+
+def run_watch(monkeypatch, fake_jira, sheet, clock: Clock) -> None:
+    monkeypatch.setattr(watch, "time", clock)
+    run_command(
+        monkeypatch, fake_jira, "watch", str(sheet), "PROJ", "--debounce", "0"
+    )
+
+
+def count_issues(fake_jira) -> int:
+    # Issues are indexed by both their ID and their key.
+    return len({issue["key"] for issue in fake_jira.issues.values()})
+
+
+def test_watch_syncs_sheets_saved_while_syncing(monkeypatch, fake_jira, sheet):
+    def sync_rows(self, issue_reader):
+        CreateIssuesCommand.sync_rows(self, issue_reader)
+        with open(sheet, newline="") as inf:
+            rows = list(csv.DictReader(inf))
+        if len(rows) == len(ROWS):
+            # Saved once the sheet was read and its keys written back.
+            write_sheet(sheet, [*rows, {**ROW, "__jira_id__": ""}])
+
+    monkeypatch.setattr(watch.Command, "sync_rows", sync_rows)
+    run_watch(monkeypatch, fake_jira, sheet, Clock(sleeps=4))
+
+    assert count_issues(fake_jira) == 4
+    assert read_keys(sheet)["4"] == "PROJ-4"
+
+
+def test_watch_retries_failed_syncs(monkeypatch, fake_jira, sheet):
+    clock = Clock(sleeps=40)
+    attempts: List[float] = []
+
+    def sync_rows(self, issue_reader):
+        attempts.append(clock.now)
+        if len(attempts) < 3:
+            raise RuntimeError("Jira is unreachable")
+        CreateIssuesCommand.sync_rows(self, issue_reader)
+
+    monkeypatch.setattr(watch.Command, "sync_rows", sync_rows)
+    run_watch(monkeypatch, fake_jira, sheet, clock)
+
+    # The sheet is unchanged, yet synced again after 1s, then 2s later.
+    assert attempts == [0, 1, 3]
+    assert count_issues(fake_jira) == 3
+    assert all(read_keys(sheet).values())
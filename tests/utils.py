@@ -0,0 +1,76 @@
+import csv
+import sys
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from benchmarks.fake_jira import FakeJira
+from csv_to_jira.cmdline import main
+
+ROWS = [
+    {"ID": "1", "Summary": "First", "Size": "3", "Issuetype": "Story", "Depends": ""},
+    {"ID": "2", "Summary": "Second", "Size": "", "Issuetype": "Task", "Depends": "1"},
+    {
+        "ID": "3",
+        "Summary": "Third",
+        "Size": "1",
+        "Issuetype": "Story",
+        "Depends": "1,2",
+    },
+]
+
+# Options of create-issues that choose how to sync, of which one is given.
+MODES = {"--bulk", "--parallel", "--plan", "--apply", "--yes"}
+
+
+def write_sheet(path: Path, rows: List[Dict[str, str]] = ROWS) -> Path:
+    with open(path, "w", newline="") as outf:
+        writer = csv.DictWriter(outf, list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def read_keys(sheet: Path, key_field: str = "__jira_id__") -> Dict[str, str]:
+    with open(sheet, newline="") as inf:
+        return {row["ID"]: row[key_field] for row in csv.DictReader(inf)}
+
+
+def run_command(monkeypatch, fake_jira: FakeJira, *args: str) -> None:
+    """Runs csv-to-jira with `args`, connected to `fake_jira`."""
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "csv-to-jira",
+            "--instance-url",
+            fake_jira.url,
+            "-u",
+            "user",
+            "-p",
+            "password",
+            "--rate-limit",
+            "0",
+            "--no-cache",
+            *args,
+        ],
+    )
+    fake_jira.requests.clear()
+    main()
+
+
+def create_issues(monkeypatch, fake_jira: FakeJira, sheet: Path, *args: str) -> None:
+    """Syncs `sheet` to project PROJ; in bulk unless `args` pick a mode."""
+    if not any(arg.split("=")[0] in MODES for arg in args):
+        args = ("--bulk", *args)
+    run_command(monkeypatch, fake_jira, "create-issues", str(sheet), "PROJ", *args)
+
+
+def get_links(fake_jira: FakeJira) -> Set[Tuple[str, str, str]]:
+    # Issues are indexed by both their ID and their key.
+    issues = {issue["key"]: issue for issue in fake_jira.issues.values()}
+    return {
+        (link["type"]["name"], link["inwardIssue"]["key"], issue["key"])
+        for issue in issues.values()
+        for link in issue["fields"]["issuelinks"]
+        if "inwardIssue" in link
+    }